@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import deque
+
+from telemetry import METRICS
+
+
+class AdmissionRejected(Exception):
+    """A debate was turned away because the wait queue is full"""
+
+
+class Ticket:
+    """One debate's place in the admission queue"""
+
+    __slots__ = ("keys", "enqueued", "admitted_at", "event")
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.enqueued = time.monotonic()
+        self.admitted_at = None
+        self.event = asyncio.Event()
+
+
+def key_id(api_key):
+    """Stable id of an API key, so the controller never holds the key itself"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class AdmissionController:
+    """Caps concurrent debates globally and per API key, with a bounded FIFO wait queue.
+
+    A debate takes a Ticket with enqueue(), which raises AdmissionRejected at
+    once when the queue is full, when its keys already have
+    `max_queued_per_key` debates waiting, or when the estimated wait exceeds
+    `max_wait` seconds. wait() yields (position, eta_seconds) while queued and
+    returns once the debate may start; release() frees its slot (or its place
+    in the queue) and must always be called.
+
+    A queued debate starts as soon as there is a free global slot and each of
+    its keys is under `max_per_key`; one held back by its key cap does not
+    hold up the debates behind it. ETAs come from a moving average of recent
+    debate durations.
+
+    Tickets wake through asyncio events, so use one controller from one event
+    loop (e.g. Gradio's server loop).
+    """
+
+    def __init__(self, max_active=8, max_per_key=2, max_queue=32, max_queued_per_key=4, max_wait=None,
+                 initial_duration=90.0):
+        self.max_active = max_active
+        self.max_per_key = max_per_key
+        self.max_queue = max_queue
+        self.max_queued_per_key = max_queued_per_key
+        self.max_wait = max_wait
+        # Moving average of debate duration, for ETAs
+        self.average_duration = initial_duration
+        self._queue = deque()
+        self._active = set()
+        self._active_per_key = {}
+        self.admitted = 0
+        self.rejected = 0
+
+    def enqueue(self, api_keys):
+        """Queue a debate using `api_keys` and return its Ticket, or raise AdmissionRejected"""
+        ticket = Ticket(frozenset(key_id(api_key) for api_key in api_keys if api_key))
+        if len(self._queue) >= self.max_queue:
+            self._reject("full")
+            raise AdmissionRejected(f"The debate queue is full ({self.max_queue} waiting). Please try again in a minute.")
+        queued_for_key = max((sum(1 for queued in self._queue if key in queued.keys) for key in ticket.keys), default=0)
+        if queued_for_key >= self.max_queued_per_key:
+            self._reject("per_key")
+            raise AdmissionRejected(f"This API key already has {queued_for_key} debates waiting. "
+                                    "Please wait for one of them to start.")
+        eta = self.eta(len(self._queue) + 1)
+        if self.max_wait is not None and eta > self.max_wait:
+            self._reject("wait")
+            raise AdmissionRejected(f"The debate queue is too long right now (about {eta:.0f}s). Please try again later.")
+        self._queue.append(ticket)
+        self._dispatch()
+        return ticket
+
+    async def wait(self, ticket, update_interval=1.0):
+        """Yield (position, eta_seconds) while `ticket` is queued; returns once it is admitted"""
+        last = None
+        while not ticket.event.is_set():
+            position = self.position(ticket)
+            status = (position, self.eta(position))
+            if status != last:
+                last = status
+                yield status
+            try:
+                await asyncio.wait_for(ticket.event.wait(), update_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, ticket):
+        """Free the ticket's slot, or take it out of the queue if it never started"""
+        if ticket in self._active:
+            self._active.discard(ticket)
+            for key in ticket.keys:
+                self._active_per_key[key] -= 1
+                if not self._active_per_key[key]:
+                    del self._active_per_key[key]
+            duration = time.monotonic() - ticket.admitted_at
+            self.average_duration += 0.2 * (duration - self.average_duration)
+        elif ticket in self._queue:
+            self._queue.remove(ticket)
+        self._dispatch()
+
+    def position(self, ticket):
+        """1-based place in the queue (0 once admitted)"""
+        try:
+            return self._queue.index(ticket) + 1
+        except ValueError:
+            return 0
+
+    def eta(self, position):
+        """Rough seconds until the debate at `position` starts"""
+        if position <= 0:
+            return 0.0
+        # With every slot busy, one frees up about every average_duration / max_active seconds
+        return position * self.average_duration / self.max_active
+
+    def _fits(self, ticket):
+        return (len(self._active) < self.max_active
+                and all(self._active_per_key.get(key, 0) < self.max_per_key for key in ticket.keys))
+
+    def _dispatch(self):
+        """Admit every queued ticket that fits, oldest first"""
+        for ticket in list(self._queue):
+            if len(self._active) >= self.max_active:
+                break
+            if not self._fits(ticket):
+                continue
+            self._queue.remove(ticket)
+            self._active.add(ticket)
+            for key in ticket.keys:
+                self._active_per_key[key] = self._active_per_key.get(key, 0) + 1
+            ticket.admitted_at = time.monotonic()
+            self.admitted += 1
+            METRICS.observe("debate_admission_wait_seconds", {}, ticket.admitted_at - ticket.enqueued)
+            ticket.event.set()
+
+    def _reject(self, reason):
+        self.rejected += 1
+        METRICS.inc("debate_admission_rejected_total", {'reason': reason})
+
+    def stats(self):
+        """Queue counters for monitoring"""
+        return {
+            'active': len(self._active),
+            'queued': len(self._queue),
+            'max_active': self.max_active,
+            'max_queue': self.max_queue,
+            'admitted': self.admitted,
+            'rejected': self.rejected,
+            'average_duration': self.average_duration,
+        }
+
+
+# Used by the web app. DEBATE_MAX_ACTIVE caps debates running at once, DEBATE_MAX_PER_KEY those per API key,
+# DEBATE_MAX_QUEUE the debates waiting for a slot, and DEBATE_MAX_WAIT (seconds) the estimated wait accepted.
+ADMISSION = AdmissionController(
+    max_active=int(os.getenv("DEBATE_MAX_ACTIVE") or 8),
+    max_per_key=int(os.getenv("DEBATE_MAX_PER_KEY") or 2),
+    max_queue=int(os.getenv("DEBATE_MAX_QUEUE") or 32),
+    max_wait=float(os.getenv("DEBATE_MAX_WAIT")) if os.getenv("DEBATE_MAX_WAIT") else None)
@@ -1,8 +1,10 @@
 import gradio as gr
 import os
-from anthropic import Anthropic
 from dotenv import load_dotenv
-from debate_engine import DebateOrchestrator
+from admission import ADMISSION, AdmissionRejected
+from async_debate_engine import AsyncDebateOrchestrator
+from debate_views import Panes
+from telemetry import METRICS_PORT, serve_metrics
 
 PROVIDER_MODELS = {
     "Claude": [
@@ -23,8 +25,8 @@ def update_model_dropdown(provider):
     models = PROVIDER_MODELS.get(provider, [])
     return gr.Dropdown(choices=models, value=models[0] if models else None)
 
-def run_debate(topic, pro_provider, pro_model, pro_api_key,
-                             con_provider, con_model, con_api_key):
+async def run_debate(topic, pro_provider, pro_model, pro_api_key,
+                             con_provider, con_model, con_api_key, fresh_output=False):
     """Run debate with user-provided API keys and return the debate log."""
      # Validate inputs
     if not topic or len(topic.strip()) < 5:
@@ -40,29 +42,49 @@ def run_debate(topic, pro_provider, pro_model, pro_api_key,
         yield f"Please provide API key for Agent Con ({con_provider})"
         return
     
-       # Show initialization
-    config_msg = f"Using: {pro_provider}/{pro_model}\nInitializing..."
-    yield config_msg, config_msg.replace("Pro", "Con"), ""
-    
-    print(f"Running: {pro_provider}/{pro_model} vs {con_provider}/{con_model}")
+    # Wait for a free debate slot, or turn the request away at once if the queue is full
+    try:
+        ticket = ADMISSION.enqueue([pro_api_key.strip(), con_api_key.strip()])
+    except AdmissionRejected as e:
+        yield str(e), str(e), ""
+        return
     
     try:
-        orchestrator = DebateOrchestrator(
+        async for position, eta in ADMISSION.wait(ticket):
+            queue_msg = f"Waiting for a free debate slot: #{position} in queue, about {eta:.0f}s"
+            yield queue_msg, queue_msg, ""
+        
+        # Show initialization
+        config_msg = f"Using: {pro_provider}/{pro_model}\nInitializing..."
+        yield config_msg, config_msg.replace("Pro", "Con"), ""
+        
+        print(f"Running: {pro_provider}/{pro_model} vs {con_provider}/{con_model}")
+        orchestrator = AsyncDebateOrchestrator(
             pro_provider=pro_provider,
             pro_model=pro_model,
             pro_api_key=pro_api_key.strip(),
             con_provider=con_provider,
             con_model=con_model,
-            con_api_key=con_api_key.strip()
+            con_api_key=con_api_key.strip(),
+            concurrent=True,
+            stream=True,
+            use_cache=not fresh_output,
+            replay=not fresh_output
         )
         
-        # Stream results - now yields 3 values!
-        for pro_text, con_text, verdict_text in orchestrator.run_split_screen_debate(topic=topic.strip()):
-            yield pro_text, con_text, verdict_text
+        # Stream results as appends, coalesced per UI_FLUSH_INTERVAL (async: no worker thread is held while waiting on providers).
+        # The panes only grow, so Gradio's streaming diff sends just the appended text to the browser.
+        panes = Panes()
+        async for update in orchestrator.run_split_screen_deltas(topic=topic.strip()):
+            yield panes.apply(update)
+        print(f"Debate {orchestrator.debate_id} trace {orchestrator.last_trace.trace_id}: {orchestrator.last_trace.totals()}")
             
     except Exception as e:
         error_msg = f"Error: {str(e)}"
         yield error_msg, error_msg, ""
+    finally:
+        # Also runs when the browser disconnects and Gradio closes this generator
+        ADMISSION.release(ticket)
         
 with gr.Blocks(title="AI Debate Arena") as interface:
     gr.Markdown("## AI Debate Arena")
@@ -128,7 +150,13 @@ with gr.Blocks(title="AI Debate Arena") as interface:
         outputs=[con_model]
     )               
     
-    submit_btn = gr.Button("Start Debate", variant="primary", size="lg")
+    fresh_output = gr.Checkbox(
+        label="Fresh output (don't reuse cached responses or past debates)",
+        value=False
+    )
+    with gr.Row():
+        submit_btn = gr.Button("Start Debate", variant="primary", size="lg")
+        stop_btn = gr.Button("Stop", variant="stop", size="lg")
     
     gr.Examples(
         examples=[
@@ -173,15 +201,22 @@ with gr.Blocks(title="AI Debate Arena") as interface:
             show_label=False
         )
         
-    submit_btn.click(
+    debate_event = submit_btn.click(
         fn=run_debate,
         inputs=[
             topic_input,
             pro_provider, pro_model, pro_api_key,
-            con_provider, con_model, con_api_key
+            con_provider, con_model, con_api_key,
+            fresh_output
         ],
         outputs=[pro_output, con_output, verdict_output],
+        # Admission control caps and queues debates, so Gradio shouldn't serialize them too
+        concurrency_limit=None,
     )
+    # Cancelling the debate's task aborts its provider calls in flight and frees its admission slot
+    stop_btn.click(fn=None, cancels=[debate_event])
     
 if __name__ == "__main__":
+    if METRICS_PORT:
+        serve_metrics(METRICS_PORT)
     interface.launch()
\ No newline at end of file
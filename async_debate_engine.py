@@ -0,0 +1,330 @@
+import asyncio
+import time
+
+from debate_engine import (PHASES, BaseDebateOrchestrator, DebateAgent, DebateEvent, PhaseRun, StoreCall,
+                           debate_result, structured_output_failed)
+from debate_pipeline import AsyncDebatePipeline
+from debate_views import FLUSH_EVENTS, UI_FLUSH_INTERVAL, Panes, SplitScreenView, UpdateBuffer
+from scheduler import request_tokens
+from telemetry import CURRENT_STEP
+
+_STREAM_DONE = object()
+
+
+async def _once(call):
+    """Wrap a blocking-style coroutine as an async stream with a single chunk"""
+    yield await call()
+
+
+async def _text_stream(text):
+    """An async stream of one chunk of already known text"""
+    yield text
+
+
+async def _in_step(label, stream):
+    """Run async `stream` with its provider calls attributed to step `label` in the DebateTrace"""
+    previous = CURRENT_STEP.get()
+    CURRENT_STEP.set(label)
+    try:
+        async for delta in stream():
+            yield delta
+    finally:
+        CURRENT_STEP.set(previous)
+
+
+async def _paced(events, buffer):
+    """Yield the items of async iterator `events`, and None whenever `buffer` falls due while waiting for one.
+
+    The iterator runs in a task of its own, so buffered text is flushed on
+    time even while the next event is seconds away (e.g. Con's first token).
+    """
+    items = asyncio.Queue(maxsize=1)
+
+    async def pump():
+        try:
+            async for item in events:
+                await items.put(item)
+        except Exception as e:
+            await items.put(e)
+            return
+        await items.put(_STREAM_DONE)
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(items.get(), buffer.due_in())
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if item is _STREAM_DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        # Stops the debate too if the consumer went away (its generator closes as the task is cancelled)
+        task.cancel()
+
+
+class AsyncDebateAgent(DebateAgent):
+    """asyncio counterpart of DebateAgent, built on AsyncAnthropic / AsyncOpenAI.
+
+    Prompts, caching and usage bookkeeping come from DebateAgent, so both engines
+    argue identically; only the transport differs. Every call awaits network I/O
+    instead of blocking a thread.
+    """
+
+    def _client(self):
+        return self.client_pool.get(self.clientType, api_key=self.api_key, base_url=self.base_url, use_async=True)
+
+    @staticmethod
+    def _closer(stream):
+        """A thread-safe callback that closes an async SDK stream on the running loop"""
+        loop = asyncio.get_running_loop()
+        return lambda: loop.call_soon_threadsafe(lambda: asyncio.ensure_future(stream.close()))
+
+    @staticmethod
+    async def _cache_io(fn, cache_key, *args):
+        """fn(*args), on a worker thread when it touches the cache (whose SQLite tier would block the loop)"""
+        if cache_key is None:
+            return fn(*args)
+        return await asyncio.to_thread(fn, *args)
+
+    async def get_message(self, prompt, system_prompt="", use_cache=None):
+        """Helper to get message from appropriate async client"""
+        if self.router is not None:
+            text, routed = await self.router.acall(self, lambda agent: agent.get_message(prompt, system_prompt, use_cache))
+            self.last_usage = routed.last_usage
+            return text
+        if self._cancel_token() is not None:
+            # Streamed, so cancelling the debate can close the request in flight
+            return "".join([delta async for delta in self.get_message_stream(prompt, system_prompt, use_cache)])
+        started = time.perf_counter()
+        cache_key = self._cache_key(prompt, system_prompt, use_cache)
+        cached = await self._cache_io(self._cached_answer, cache_key, cache_key, started)
+        if cached is not None:
+            return cached
+        params = self._request_params(prompt, system_prompt)
+        message = await self.scheduler.acall(self.clientType, self.api_key, request_tokens(params), self._send(params))
+        return await self._cache_io(self._finish_message, cache_key, message, started, cache_key)
+
+    async def get_message_stream(self, prompt, system_prompt="", use_cache=None):
+        """Like get_message, but yields text deltas as the provider streams them"""
+        if self.router is not None:
+            served = []
+            async for delta in self.router.astream(self, lambda agent: agent.get_message_stream(prompt, system_prompt, use_cache), served):
+                yield delta
+            self.last_usage = served[0].last_usage
+            return
+        started = time.perf_counter()
+        cache_key = self._cache_key(prompt, system_prompt, use_cache)
+        cached = await self._cache_io(self._cached_answer, cache_key, cache_key, started, True)
+        if cached is not None:
+            yield cached
+            return
+        params = self._request_params(prompt, system_prompt)
+
+        chunks = []
+        first_token = None
+        self.last_usage = None
+        async for delta in self.scheduler.astream(self.clientType, self.api_key, request_tokens(params),
+                                                  lambda: self._provider_stream(params)):
+            if first_token is None:
+                first_token = time.perf_counter() - started
+            chunks.append(delta)
+            yield delta
+        await self._cache_io(self._finish_stream, cache_key, started, first_token, cache_key, chunks)
+
+    async def get_structured(self, prompt, system_prompt, schema, use_cache=None):
+        """Like get_message, but returns a validated `schema` instance via tool use (Anthropic) or JSON mode (OpenAI)"""
+        if self.router is not None:
+            result, routed = await self.router.acall(self, lambda agent: agent.get_structured(prompt, system_prompt, schema, use_cache))
+            self.last_usage = routed.last_usage
+            return result
+        started = time.perf_counter()
+        cache_key = self._cache_key(f"{prompt}\n[{schema.__name__}]", system_prompt, use_cache)
+        cached = await self._cache_io(self._cached_answer, cache_key, cache_key, started)
+        if cached is not None:
+            return schema.model_validate_json(cached)
+        params = self._structured_params(prompt, system_prompt, schema)
+        token = self._cancel_token()
+        if token is not None:
+            token.check()
+        message = await self.scheduler.acall(self.clientType, self.api_key, request_tokens(params), self._send(params))
+        return await self._cache_io(self._finish_message, cache_key, message, started, cache_key, schema)
+
+    async def _provider_stream(self, params):
+        """Open one provider stream and yield its text deltas, recording usage at the end"""
+        client = self._client()
+        if self.clientType.lower() == "openai":
+            stream = await client.chat.completions.create(**params, stream=True, stream_options={"include_usage": True})
+            try:
+                with self._cancellable(self._closer(stream)):
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                        if getattr(chunk, "usage", None) is not None:
+                            self._record_usage(chunk.usage)
+            finally:
+                await stream.close()
+        else:
+            async with client.messages.stream(**params) as stream:
+                with self._cancellable(self._closer(stream)):
+                    async for text in stream.text_stream:
+                        yield text
+                    self._record_usage((await stream.get_final_message()).usage)
+
+    async def reflect_with_summary(self, own_argument):
+        """Self-critique and improvement summary in one structured call, falling back to two calls"""
+        from debate_schemas import ReflectionOutput
+        system_prompt, reflection_prompt = self.fused_reflection_prompts(own_argument)
+        try:
+            result = await self.get_structured(reflection_prompt, system_prompt, ReflectionOutput)
+        except Exception as e:
+            if not structured_output_failed(e):
+                raise
+            critique = await self.reflect_on_argument(own_argument)
+            self.last_summary = await self.extract_reflection_summary(critique)
+            return critique
+        self.last_summary = result.summary
+        return result.critique
+
+
+class AsyncDebateOrchestrator(BaseDebateOrchestrator):
+    """asyncio counterpart of DebateOrchestrator.
+
+    `run_split_screen_debate` is an async generator that Gradio consumes on its
+    event loop, so a running debate holds no worker thread while it waits on the providers.
+    The debate itself (BaseDebateOrchestrator._debate_steps) is shared with the sync
+    engine; only streaming and merging the phases is done here.
+    """
+
+    agent_class = AsyncDebateAgent
+    _once = staticmethod(_once)
+    _text_stream = staticmethod(_text_stream)
+    _in_step = staticmethod(_in_step)
+
+    def _new_pipeline(self, topic, plan):
+        return AsyncDebatePipeline(self, topic, plan)
+
+    async def _debate_events(self, topic, total_rounds=3, phases=PHASES, debate_id=None):
+        """Run the phase plan, yielding DebateEvents; the final state is kept in last_debate"""
+        steps = self._debate_steps(topic, total_rounds, phases, debate_id)
+        try:
+            item = next(steps)
+            while True:
+                if isinstance(item, PhaseRun):
+                    texts = {}
+                    try:
+                        async for event in self._stream_phase(*item, texts):
+                            yield event
+                    except Exception as e:
+                        # Let the state machine record the failure; it raises `e` again
+                        item = steps.throw(e)
+                    else:
+                        item = steps.send(texts)
+                elif isinstance(item, StoreCall):
+                    # SQLite I/O on a worker thread, so other debates on the loop keep running meanwhile
+                    try:
+                        result = await asyncio.to_thread(item.fn, *item.args)
+                    except Exception as e:
+                        item = steps.throw(e)
+                    else:
+                        item = steps.send(result)
+                else:
+                    yield item
+                    item = next(steps)
+        except StopIteration:
+            pass
+        finally:
+            # Also reached when the consumer goes away or its task is cancelled (Gradio's Stop / disconnect)
+            steps.close()
+
+    async def _stream_phase(self, phase, round_num, streams, texts):
+        """Drive one phase's streams, yielding a "delta" DebateEvent as text arrives.
+
+        Async generators cannot return a value, so the full texts are written
+        into the caller's `texts` dict once every stream is done.
+        """
+        opened = self._open_phase(phase, round_num)
+        first_token = None
+        chunks = {side: [] for side, _ in streams}
+        if self.concurrent and len(streams) > 1:
+            events = self._merge_streams(streams)
+        else:
+            events = self._chain_streams(streams)
+        async for side, delta in events:
+            if delta is _STREAM_DONE:
+                yield DebateEvent("stream_done", phase, round_num, side)
+                continue
+            if first_token is None:
+                first_token = time.perf_counter() - opened[1]
+            chunks[side].append(delta)
+            yield DebateEvent("delta", phase, round_num, side, delta)
+        self._close_phase(phase, round_num, opened, first_token)
+        texts.update({side: "".join(parts) for side, parts in chunks.items()})
+
+    async def _chain_streams(self, streams):
+        """Each stream's (side, delta) events in turn, each stream ending with (side, _STREAM_DONE)"""
+        for side, stream in streams:
+            async for delta in stream():
+                yield side, delta
+            yield side, _STREAM_DONE
+
+    async def _merge_streams(self, streams):
+        """Consume several streams as tasks and yield their (side, delta) events in arrival order, then (side, _STREAM_DONE)"""
+        events = asyncio.Queue()
+
+        async def pump(side, stream):
+            try:
+                async for delta in stream():
+                    await events.put((side, delta))
+                await events.put((side, _STREAM_DONE))
+            except Exception as e:
+                await events.put((side, e))
+
+        tasks = [asyncio.create_task(pump(side, stream)) for side, stream in streams]
+        try:
+            pending = len(tasks)
+            while pending:
+                side, item = await events.get()
+                if item is _STREAM_DONE:
+                    pending -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                yield side, item
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def run_multiround_debate(self, topic, total_rounds=3, phases=PHASES, debate_id=None):
+        """Run a multi-round debate and return every argument, reflection and the verdict"""
+        async for _ in self._debate_events(topic, total_rounds, phases, debate_id):
+            pass
+        return debate_result(self.last_debate, self.phase_timings, self.last_trace, self.debate_id)
+
+    async def run_split_screen_deltas(self, topic, total_rounds=3, phases=PHASES, flush_interval=UI_FLUSH_INTERVAL, debate_id=None):
+        """Run debate with split-screen output, as an async generator of PaneAppends coalesced per `flush_interval`.
+
+        Async generators cannot return a value; the DebateTrace is left in last_trace.
+        """
+        view = SplitScreenView(self, topic, total_rounds)
+        buffer = UpdateBuffer(flush_interval)
+        for update in buffer.add(view.start(), urgent=True):
+            yield update
+        async for event in _paced(self._debate_events(topic, total_rounds, phases, debate_id), buffer):
+            if event is None:
+                updates = buffer.flush()
+            else:
+                updates = buffer.add(view.feed(event), urgent=event.kind in FLUSH_EVENTS)
+            for update in updates:
+                yield update
+        for update in buffer.flush():
+            yield update
+
+    async def run_split_screen_debate(self, topic, total_rounds=3, phases=PHASES, flush_interval=UI_FLUSH_INTERVAL, debate_id=None):
+        """Run debate with split-screen outputs, as an async generator of whole (pro, con, verdict) texts"""
+        panes = Panes()
+        async for update in self.run_split_screen_deltas(topic, total_rounds, phases, flush_interval, debate_id):
+            yield panes.apply(update)
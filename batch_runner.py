@@ -0,0 +1,333 @@
+import argparse
+import io
+import json
+import os
+import time
+
+from client_pool import get_client, normalize_provider
+from debate_records import record_from_dict, record_to_dict
+from debate_engine import (PHASES, DebateOrchestrator, build_phase_plan, convergence_reason, new_debate_state,
+                           record_phase, side_scores, side_texts)
+from scheduler import SCHEDULER
+
+
+class AnthropicBatchBackend:
+    """Submits one phase as an Anthropic Message Batch"""
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+        self.client = get_client("claude", api_key=api_key)
+
+    def _call(self, request):
+        # Batch management calls share the key's request budget and retry policy
+        return SCHEDULER.call("claude", self.api_key, 0, request)
+
+    def submit(self, requests):
+        """Start a batch job for [(custom_id, params)]; returns the job id"""
+        batch = self._call(lambda: self.client.messages.batches.create(
+            requests=[{"custom_id": custom_id, "params": params} for custom_id, params in requests]))
+        return batch.id
+
+    def poll(self, job_id):
+        """True once the job has finished"""
+        return self._call(lambda: self.client.messages.batches.retrieve(job_id)).processing_status == "ended"
+
+    def results(self, job_id):
+        """{custom_id: text, or an Exception for a failed request}"""
+        results = {}
+        for entry in self._call(lambda: list(self.client.messages.batches.results(job_id))):
+            if entry.result.type == "succeeded":
+                results[entry.custom_id] = entry.result.message.content[0].text
+            else:
+                error = getattr(entry.result, "error", None)
+                results[entry.custom_id] = RuntimeError(f"Batch request {entry.result.type}: {error}")
+        return results
+
+
+class OpenAIBatchBackend:
+    """Submits one phase as an OpenAI Batch job over /v1/chat/completions"""
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+        self.client = get_client("openai", api_key=api_key)
+
+    def _call(self, request):
+        return SCHEDULER.call("openai", self.api_key, 0, request)
+
+    def submit(self, requests):
+        """Upload the requests as JSONL and start a batch job; returns the job id"""
+        lines = [json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/chat/completions", "body": params})
+                 for custom_id, params in requests]
+        batch_file = self._call(lambda: self.client.files.create(
+            file=("debate_batch.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))),
+            purpose="batch"))
+        batch = self._call(lambda: self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"))
+        return batch.id
+
+    def poll(self, job_id):
+        """True once the job has finished"""
+        return self._call(lambda: self.client.batches.retrieve(job_id)).status in ("completed", "failed", "expired", "cancelled")
+
+    def results(self, job_id):
+        """{custom_id: text, or an Exception for a failed request}"""
+        batch = self._call(lambda: self.client.batches.retrieve(job_id))
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self._call(lambda: self.client.files.content(file_id)).text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get("response") or {}
+                if response.get("status_code") == 200:
+                    results[entry["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+                else:
+                    results[entry["custom_id"]] = RuntimeError(f"Batch request failed: {entry.get('error') or response}")
+        return results
+
+
+class LocalBatchBackend:
+    """In-process stand-in for a provider batch API, for tests and dry runs.
+
+    `responder(params)` produces each reply (by default a short deterministic
+    echo of the prompt), and a job reports finished after `delay` seconds.
+    """
+
+    def __init__(self, responder=None, delay=0.0):
+        self.responder = responder or self._echo
+        self.delay = delay
+        self.jobs = {}
+        self.submitted = 0
+
+    @staticmethod
+    def _echo(params):
+        prompt = params['messages'][-1]['content']
+        return f"[{params['model']}] " + " ".join(prompt.split()[:40])
+
+    def submit(self, requests):
+        self.submitted += 1
+        job_id = f"local-{self.submitted}"
+        self.jobs[job_id] = (time.monotonic(), list(requests))
+        return job_id
+
+    def poll(self, job_id):
+        return time.monotonic() - self.jobs[job_id][0] >= self.delay
+
+    def results(self, job_id):
+        results = {}
+        for custom_id, params in self.jobs[job_id][1]:
+            try:
+                results[custom_id] = self.responder(params)
+            except Exception as e:
+                results[custom_id] = e
+        return results
+
+
+class BatchDebateRunner:
+    """Runs many debates offline, one provider batch job per provider per phase.
+
+    Every debate walks the same phase plan in lockstep: all round-1 arguments go
+    out together, then all reflections, and so on. After each phase the full
+    state, including any jobs still in flight, is checkpointed to `state_path`,
+    so a restarted runner resumes by polling the outstanding jobs instead of
+    resubmitting them. Debates whose requests fail are dropped from later phases
+    and reported with their error.
+    """
+
+    def __init__(self, backends=None, total_rounds=3, phases=PHASES, state_path=None,
+                 poll_interval=30, adaptive=False, max_tokens=1024):
+        self.backends = backends
+        self.total_rounds = total_rounds
+        self.phases = phases
+        self.state_path = state_path
+        self.poll_interval = poll_interval
+        self.adaptive = adaptive
+        self.max_tokens = max_tokens
+
+    @staticmethod
+    def load_topics(path):
+        """Read debate configs from JSONL: topic plus optional id and pro/con provider and model"""
+        configs = []
+        with open(path, encoding="utf-8") as f:
+            for line_num, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                config = json.loads(line)
+                if not config.get("topic"):
+                    raise ValueError(f"{path}:{line_num}: missing 'topic'")
+                config.setdefault("id", str(line_num))
+                configs.append(config)
+        return configs
+
+    def _backend(self, provider):
+        if self.backends is None:
+            self.backends = {}
+        if isinstance(self.backends, dict):
+            if provider not in self.backends:
+                self.backends[provider] = OpenAIBatchBackend() if provider == "openai" else AnthropicBatchBackend()
+            return self.backends[provider]
+        # A single backend object serves every provider
+        return self.backends
+
+    def _orchestrator(self, config, state):
+        orchestrator = DebateOrchestrator(
+            pro_provider=config.get("pro_provider", "claude"),
+            pro_model=config.get("pro_model", "claude-sonnet-4-20250514"),
+            con_provider=config.get("con_provider", "claude"),
+            con_model=config.get("con_model", "claude-sonnet-4-20250514"))
+        orchestrator.agent_pro.max_tokens = orchestrator.agent_con.max_tokens = self.max_tokens
+        # On resume, rebuild each agent's context from the arguments made so far, as the refinements that
+        # produced them did, so later refine prompts match an uninterrupted run
+        for side, agent in (('pro', orchestrator.agent_pro), ('con', orchestrator.agent_con)):
+            for argument in side_texts(state, side, 'arguments'):
+                agent.context.advance(argument)
+        return orchestrator
+
+    def _load_checkpoint(self, configs):
+        if self.state_path and os.path.exists(self.state_path):
+            with open(self.state_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+            for debate in checkpoint['debates'].values():
+                state = debate['state']
+                state['records'] = [record_from_dict(record) for record in state['records']]
+            return checkpoint
+        return {
+            'step': 0,
+            'jobs': {},
+            'debates': {config['id']: {'config': config, 'state': new_debate_state(config['topic']), 'error': None}
+                        for config in configs},
+        }
+
+    def _save_checkpoint(self, checkpoint):
+        if not self.state_path:
+            return
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, default=record_to_dict)
+        os.replace(tmp_path, self.state_path)
+
+    def run(self, topics_path, output_path):
+        """Run every debate in `topics_path` and write one JSON result per line to `output_path`"""
+        configs = self.load_topics(topics_path)
+        checkpoint = self._load_checkpoint(configs)
+        orchestrators = {debate_id: self._orchestrator(debate['config'], debate['state'])
+                         for debate_id, debate in checkpoint['debates'].items()}
+        plan = build_phase_plan(self.total_rounds, self.phases)
+
+        while checkpoint['step'] < len(plan):
+            phase, round_num = plan[checkpoint['step']]
+            print(f"[batch] step {checkpoint['step'] + 1}/{len(plan)}: {phase} (round {round_num})")
+            if not checkpoint['jobs']:
+                checkpoint['jobs'] = self._submit_phase(phase, round_num, checkpoint, orchestrators)
+                self._save_checkpoint(checkpoint)
+            results = self._collect(checkpoint['jobs'])
+            self._record_results(phase, checkpoint, results)
+            checkpoint['step'] += 1
+            checkpoint['jobs'] = {}
+            self._save_checkpoint(checkpoint)
+
+        self._write_results(checkpoint, orchestrators, output_path)
+        return checkpoint
+
+    def _active(self, checkpoint, phase):
+        for debate_id, debate in checkpoint['debates'].items():
+            if debate['error']:
+                continue
+            if debate['state']['stopped_early'] and phase != "verdict":
+                continue
+            yield debate_id, debate
+
+    def _submit_phase(self, phase, round_num, checkpoint, orchestrators):
+        """Submit one batch job per provider for this phase; returns {provider: job_id}"""
+        requests = {}
+        for debate_id, debate in self._active(checkpoint, phase):
+            orchestrator = orchestrators[debate_id]
+            for side, agent, system_prompt, user_prompt in orchestrator.phase_prompts(
+                    phase, round_num, debate['config']['topic'], debate['state']):
+                provider = normalize_provider(agent.clientType)
+                custom_id = f"{debate_id}-{side}"
+                requests.setdefault(provider, []).append((custom_id, agent._request_params(user_prompt, system_prompt)))
+        return {provider: self._backend(provider).submit(provider_requests)
+                for provider, provider_requests in requests.items()}
+
+    def _collect(self, jobs):
+        """Poll until every job of the phase has finished, then merge their results"""
+        pending = dict(jobs)
+        results = {}
+        while pending:
+            for provider, job_id in list(pending.items()):
+                backend = self._backend(provider)
+                if backend.poll(job_id):
+                    results.update(backend.results(job_id))
+                    del pending[provider]
+            if pending:
+                time.sleep(self.poll_interval)
+        return results
+
+    def _record_results(self, phase, checkpoint, results):
+        sides = ('verdict',) if phase == "verdict" else ('pro', 'con')
+        for debate_id, debate in self._active(checkpoint, phase):
+            texts = {side: results.get(f"{debate_id}-{side}", RuntimeError("No result returned")) for side in sides}
+            failed = [text for text in texts.values() if isinstance(text, Exception)]
+            if failed:
+                debate['error'] = f"{phase}: {failed[0]}"
+                continue
+            record_phase(debate['state'], phase, texts)
+            if self.adaptive:
+                reason = convergence_reason(debate['state'], phase)
+                if reason:
+                    debate['state']['stopped_early'] = reason
+
+    def _write_results(self, checkpoint, orchestrators, output_path):
+        with open(output_path, "w", encoding="utf-8") as f:
+            for debate_id, debate in checkpoint['debates'].items():
+                orchestrator = orchestrators[debate_id]
+                state = debate['state']
+                record = {
+                    'id': debate_id,
+                    'topic': state['topic'],
+                    'pro_model': orchestrator.agent_pro.model,
+                    'con_model': orchestrator.agent_con.model,
+                    'pro_arguments': side_texts(state, 'pro', 'arguments'),
+                    'con_arguments': side_texts(state, 'con', 'arguments'),
+                    'pro_reflections': side_texts(state, 'pro', 'reflections'),
+                    'con_reflections': side_texts(state, 'con', 'reflections'),
+                    'pro_scores': [scores._asdict() for scores in side_scores(state, 'pro')],
+                    'con_scores': [scores._asdict() for scores in side_scores(state, 'con')],
+                    'verdict': state['verdict'],
+                    'stopped_early': state['stopped_early'],
+                    'error': debate['error'],
+                }
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run debates for a JSONL topic list through provider batch APIs")
+    parser.add_argument("topics", help="JSONL with one {\"topic\": ..., optional id/pro_model/con_model/...} per line")
+    parser.add_argument("output", help="where to write one JSON result per debate")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--skip", nargs="*", default=[], choices=["reflect", "summarize"], help="phases to drop")
+    parser.add_argument("--state", help="checkpoint file; rerun with the same path to resume")
+    parser.add_argument("--poll-interval", type=float, default=30)
+    parser.add_argument("--adaptive", action="store_true", help="stop refining debates that have converged")
+    parser.add_argument("--local", action="store_true", help="use the local fake batch backend (no API calls)")
+    args = parser.parse_args(argv)
+
+    runner = BatchDebateRunner(
+        backends=LocalBatchBackend() if args.local else None,
+        total_rounds=args.rounds,
+        phases=tuple(phase for phase in PHASES if phase not in args.skip),
+        state_path=args.state,
+        poll_interval=0 if args.local else args.poll_interval,
+        adaptive=args.adaptive)
+    runner.run(args.topics, args.output)
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    main()
@@ -0,0 +1,237 @@
+import argparse
+import asyncio
+import json
+import math
+import resource
+import subprocess
+import sys
+import threading
+import time
+
+import fake_provider
+from async_debate_engine import AsyncDebateOrchestrator
+from debate_engine import PHASES, DebateOrchestrator
+from debate_views import UI_FLUSH_INTERVAL
+from scheduler import SCHEDULER
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class _Session:
+    """Timings of one benchmarked debate, measured from the consumer's side"""
+
+    def __init__(self, index):
+        self.index = index
+        self.start = None
+        self.first_delta = None
+        self.first_output = None
+        self.end = None
+        self.updates = 0
+        self.chars = 0
+        self.error = None
+
+    def watch(self, events):
+        """Pass the orchestrator's events through, noting when the first model text arrives"""
+        for event in events:
+            if self.first_delta is None and event.kind == "delta":
+                self.first_delta = time.perf_counter()
+            yield event
+
+    async def awatch(self, events):
+        async for event in events:
+            if self.first_delta is None and event.kind == "delta":
+                self.first_delta = time.perf_counter()
+            yield event
+
+    def on_update(self, update):
+        """Count one UI update (the text appended to the three panes)"""
+        self.updates += 1
+        self.chars += sum(len(pane) for pane in update)
+        if self.first_output is None and self.first_delta is not None:
+            self.first_output = time.perf_counter() - self.start
+
+
+def _orchestrator(args, orchestrator_class):
+    return orchestrator_class(
+        pro_provider="fake", pro_model="fake-pro", con_provider="fake", con_model="fake-con",
+        pro_api_key="bench", con_api_key="bench", concurrent=not args.sequential, stream=True,
+        use_cache=False, fused_reflection=args.fused, pipelined=args.pipelined,
+        pro_fallbacks=[("fake", "fake-pro-backup")] if args.hedge else None,
+        con_fallbacks=[("fake", "fake-con-backup")] if args.hedge else None)
+
+
+def _run_sync_session(session, args, phases):
+    orchestrator = _orchestrator(args, DebateOrchestrator)
+    events = orchestrator._debate_events
+    orchestrator._debate_events = lambda *a, **kw: session.watch(events(*a, **kw))
+    session.start = time.perf_counter()
+    try:
+        for update in orchestrator.run_split_screen_deltas(f"Benchmark topic {session.index}", args.rounds, phases, args.flush_interval):
+            session.on_update(update)
+    except Exception as e:
+        session.error = repr(e)
+    session.end = time.perf_counter()
+
+
+async def _run_async_session(session, args, phases):
+    orchestrator = _orchestrator(args, AsyncDebateOrchestrator)
+    events = orchestrator._debate_events
+    orchestrator._debate_events = lambda *a, **kw: session.awatch(events(*a, **kw))
+    session.start = time.perf_counter()
+    try:
+        async for update in orchestrator.run_split_screen_deltas(f"Benchmark topic {session.index}", args.rounds, phases, args.flush_interval):
+            session.on_update(update)
+    except Exception as e:
+        session.error = repr(e)
+    session.end = time.perf_counter()
+
+
+def run_benchmark(args):
+    """Run `args.sessions` concurrent split-screen debates against the fake provider; returns the report dict"""
+    fake_provider.configure(
+        latency=args.latency, tokens_per_second=args.tokens_per_second, output_tokens=args.output_tokens,
+        rate_limit_rate=args.rate_limit_rate, overload_rate=args.overload_rate, tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency, seed=args.seed)
+    phases = tuple(phase for phase in PHASES if phase not in args.skip)
+    sessions = [_Session(i) for i in range(args.sessions)]
+
+    started = time.perf_counter()
+    if args.use_async:
+        async def run_all():
+            await asyncio.gather(*(_run_async_session(session, args, phases) for session in sessions))
+        asyncio.run(run_all())
+    else:
+        threads = [threading.Thread(target=_run_sync_session, args=(session, args, phases)) for session in sessions]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    wall = time.perf_counter() - started
+
+    finished = [session for session in sessions if session.error is None]
+    latencies = [session.end - session.start for session in finished]
+    first_outputs = [session.first_output for session in finished if session.first_output is not None]
+    report = {
+        'engine': "async" if args.use_async else "sync",
+        'sessions': args.sessions,
+        'failed': len(sessions) - len(finished),
+        'errors': sorted({session.error for session in sessions if session.error})[:5],
+        'wall_seconds': wall,
+        'debates_per_minute': len(finished) / wall * 60 if wall else 0.0,
+        'updates_per_second': sum(session.updates for session in sessions) / wall if wall else 0.0,
+        'ui_chars_per_update': (sum(session.chars for session in sessions) / max(1, sum(session.updates for session in sessions))),
+        'scheduler_retries': SCHEDULER.stats()['retries'],
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    for name, values in (('latency', latencies), ('first_output', first_outputs)):
+        for pct in (50, 95, 99):
+            report[f'{name}_p{pct}'] = percentile(values, pct) if values else None
+    return report
+
+
+# Third-party packages whose import dominates cold start
+HEAVY_MODULES = ("anthropic", "openai", "gradio", "numpy", "pydantic")
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{'seconds': time.perf_counter() - start,
+                  'loaded': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure_import_time(module, repeats=5):
+    """Median time to import `module` in a fresh interpreter, and which heavy packages it pulled in"""
+    runs = []
+    for _ in range(repeats):
+        probe = subprocess.run([sys.executable, "-c", _IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                               capture_output=True, text=True)
+        if probe.returncode != 0:
+            return {'module': module, 'seconds': None, 'loaded': [], 'error': probe.stderr.strip().splitlines()[-1]}
+        runs.append(json.loads(probe.stdout))
+    return {'module': module, 'seconds': percentile([run['seconds'] for run in runs], 50),
+            'loaded': runs[-1]['loaded'], 'error': None}
+
+
+def format_import_times(results):
+    lines = ["Cold import times (median of fresh interpreters)"]
+    for result in results:
+        if result['error']:
+            lines.append(f"  {result['module']:<20} failed: {result['error']}")
+        else:
+            lines.append(f"  {result['module']:<20} {result['seconds'] * 1000:7.1f} ms  "
+                         f"loads: {', '.join(result['loaded']) or '-'}")
+    return "\n".join(lines)
+
+
+def format_report(report):
+    lines = [f"{report['sessions']} concurrent {report['engine']} debates, {report['failed']} failed, "
+             f"{report['wall_seconds']:.2f}s wall"]
+    for name, label in (('latency', "end-to-end"), ('first_output', "first output")):
+        values = [report[f'{name}_p{pct}'] for pct in (50, 95, 99)]
+        if values[0] is not None:
+            lines.append(f"  {label:<14} p50 {values[0]:7.3f}s  p95 {values[1]:7.3f}s  p99 {values[2]:7.3f}s")
+    lines.append(f"  throughput     {report['debates_per_minute']:.1f} debates/min, {report['updates_per_second']:.0f} UI updates/s")
+    lines.append(f"  UI payload     {report['ui_chars_per_update']:.0f} chars per update")
+    lines.append(f"  retries        {report['scheduler_retries']}")
+    lines.append(f"  peak RSS       {report['peak_rss_mb']:.1f} MB")
+    for error in report['errors']:
+        lines.append(f"  error: {error}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark concurrent split-screen debates against the offline fake provider")
+    parser.add_argument("--sessions", type=int, default=8, help="debates to run at once")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--skip", nargs="*", default=[], choices=["reflect", "summarize"], help="phases to drop")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="benchmark the asyncio engine")
+    parser.add_argument("--sequential", action="store_true", help="run Pro and Con one after the other")
+    parser.add_argument("--fused", action="store_true", help="reflect and summarize in one structured call")
+    parser.add_argument("--pipelined", action="store_true", help="start each agent's next step as soon as its inputs are ready")
+    parser.add_argument("--flush-interval", type=float, default=UI_FLUSH_INTERVAL, help="seconds between UI updates")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake time to first token, seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=150)
+    parser.add_argument("--output-tokens", type=int, default=200)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of calls failing with 429")
+    parser.add_argument("--overload-rate", type=float, default=0.0, help="fraction of calls failing with 529")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="fraction of calls that are slow outliers")
+    parser.add_argument("--tail-latency", type=float, default=5.0, help="time to first token of an outlier, seconds")
+    parser.add_argument("--hedge", action="store_true", help="route each agent through a backup fake model, hedging slow calls")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="append the report as one JSON line to this file")
+    parser.add_argument("--import-time", nargs="*", metavar="MODULE",
+                        help="instead of debates, time cold imports of these modules (default: the entry points)")
+    args = parser.parse_args(argv)
+
+    if args.import_time is not None:
+        modules = args.import_time or ["debate_engine", "async_debate_engine", "debate_cli", "batch_runner", "app"]
+        results = [measure_import_time(module) for module in modules]
+        print(format_import_times(results))
+        if args.json:
+            with open(args.json, "a", encoding="utf-8") as f:
+                f.write(json.dumps({'import_times': results}) + "\n")
+        return results
+
+    report = run_benchmark(args)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report) + "\n")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import contextvars
+import threading
+from contextlib import contextmanager
+
+# Token of the phase whose calls run in this context, when the phase can be aborted on its own (e.g. one
+# side of a merged phase failed); agents use it instead of the debate's token
+PHASE_TOKEN = contextvars.ContextVar("phase_cancel_token", default=None)
+
+
+class DebateCancelled(Exception):
+    """The debate was stopped through its CancelToken"""
+
+
+class CancelToken:
+    """Cooperative cancellation for one debate, shared by its orchestrator, agents and in-flight calls.
+
+    cancel() marks the token and runs the abort callbacks of every call in
+    flight once (e.g. closing its HTTP stream, which makes the call raise
+    DebateCancelled); check() raises DebateCancelled once cancelled, between
+    phases and before a call starts. Any thread may cancel.
+    """
+
+    def __init__(self):
+        self._cancelled = threading.Event()
+        self._callbacks = {}
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        """Cancel, aborting the calls in flight; later calls are a no-op"""
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self._cancelled.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                # Aborting is best effort; the call notices the token when it next checks
+                pass
+
+    def check(self):
+        """Raise DebateCancelled if the token has been cancelled"""
+        if self._cancelled.is_set():
+            raise DebateCancelled("Debate cancelled")
+
+    @contextmanager
+    def on_cancel(self, callback):
+        """Run `callback` if the token is cancelled while the block runs (at once if it already is)"""
+        key = object()
+        with self._lock:
+            registered = not self._cancelled.is_set()
+            if registered:
+                self._callbacks[key] = callback
+        if not registered:
+            callback()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._callbacks.pop(key, None)
@@ -0,0 +1,132 @@
+import importlib
+import threading
+import time
+from collections import OrderedDict
+
+from fake_provider import AsyncFakeClient, FakeClient
+
+# (module, sync class, async class) of each provider's SDK. The SDKs take a
+# noticeable share of cold start, so each is imported on its first client.
+SDK_CLIENTS = {
+    "anthropic": ("anthropic", "Anthropic", "AsyncAnthropic"),
+    "openai": ("openai", "OpenAI", "AsyncOpenAI"),
+}
+
+
+def normalize_provider(clientType):
+    """Map a UI/engine provider name onto the SDK that serves it"""
+    name = (clientType or "").lower()
+    if name in ("openai", "fake"):
+        return name
+    return "anthropic"
+
+
+def client_class(provider, use_async=False):
+    """The SDK client class for a normalized provider, importing its SDK on first use"""
+    if provider == "fake":
+        return AsyncFakeClient if use_async else FakeClient
+    module, sync_class, async_class = SDK_CLIENTS[provider]
+    return getattr(importlib.import_module(module), async_class if use_async else sync_class)
+
+
+def create_client(provider, api_key=None, base_url=None, use_async=False):
+    """Build a new SDK client for the provider.
+
+    SDK-level retries are off: the scheduler owns retries and backoff, so a
+    rate-limited call is not retried twice over.
+    """
+    return client_class(provider, use_async)(api_key=api_key, base_url=base_url, max_retries=0)
+
+
+class ClientPool:
+    """Process-wide registry of provider clients, keyed by (provider, api_key, base_url).
+
+    Each SDK client owns an httpx connection pool with keep-alive, so reusing
+    one client across calls skips connection setup and TLS handshakes.
+    The pool is bounded: the least recently used client is dropped when full,
+    and clients idle for longer than `idle_timeout` seconds are dropped too.
+    Dropped clients are not closed explicitly, so a call still holding one
+    finishes normally and the SDK closes it once it is garbage collected.
+
+    Async clients are pooled separately (`use_async=True`). Their connections
+    belong to the event loop that opened them, so share them within one loop
+    (e.g. Gradio's server loop), not across loops.
+    """
+
+    def __init__(self, max_size=32, idle_timeout=600, factory=create_client):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.factory = factory
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, clientType, api_key=None, base_url=None, use_async=False):
+        """Return a pooled client, creating it on first use"""
+        provider = normalize_provider(clientType)
+        key = (provider, api_key, base_url, use_async)
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                self._clients.move_to_end(key)
+                entry[1] = now
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Build outside the lock so a slow SDK constructor doesn't block other sessions
+        client = self.factory(provider, api_key=api_key, base_url=base_url, use_async=use_async)
+
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None:
+                # Another thread created the same client first, keep theirs
+                self._clients.move_to_end(key)
+                entry[1] = now
+                return entry[0]
+            self._clients[key] = [client, now]
+            while len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+                self.evictions += 1
+        return client
+
+    def _evict_idle(self, now):
+        """Drop clients that have not been used within idle_timeout (lock held)"""
+        if not self.idle_timeout:
+            return
+        while self._clients:
+            key, (client, last_used) = next(iter(self._clients.items()))
+            if now - last_used <= self.idle_timeout:
+                break
+            del self._clients[key]
+            self.evictions += 1
+
+    def clear(self):
+        """Forget every pooled client"""
+        with self._lock:
+            self._clients.clear()
+
+    def stats(self):
+        """Pool counters for monitoring"""
+        with self._lock:
+            return {
+                'size': len(self._clients),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+# Shared by every DebateAgent / DebateOrchestrator unless one is passed in explicitly
+CLIENT_POOL = ClientPool()
+
+
+def get_client(clientType, api_key=None, base_url=None, use_async=False):
+    """Fetch a client from the shared process-wide pool"""
+    return CLIENT_POOL.get(clientType, api_key=api_key, base_url=base_url, use_async=use_async)
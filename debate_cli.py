@@ -0,0 +1,119 @@
+import argparse
+import json
+import sys
+
+from batch_runner import BatchDebateRunner
+from debate_engine import PHASES, DebateOrchestrator, debate_result, stored_debate_state
+from debate_records import save_columns
+from debate_store import DEBATE_STORE
+
+
+def result_record(config, orchestrator, result):
+    """One JSONL line for a finished debate (same fields as batch_runner's results, plus usage)"""
+    totals = result['trace'].totals()
+    return {
+        'id': config['id'],
+        'debate_id': result['debate_id'],
+        'topic': config['topic'],
+        'pro_model': orchestrator.agent_pro.model,
+        'con_model': orchestrator.agent_con.model,
+        'pro_arguments': result['pro_arguments'],
+        'con_arguments': result['con_arguments'],
+        'pro_reflections': result['pro_reflections'],
+        'con_reflections': result['con_reflections'],
+        'pro_scores': [scores._asdict() for scores in result['pro_scores']],
+        'con_scores': [scores._asdict() for scores in result['con_scores']],
+        'verdict': result['verdict'],
+        'stopped_early': result['stopped_early'],
+        'phase_timings': result['phase_timings'],
+        'usage': {key: totals[key] for key in ('input_tokens', 'output_tokens', 'calls', 'cost_usd', 'seconds')},
+    }
+
+
+def run_debate(config, args, out):
+    """Run one debate, writing its transcript (text) or its result record (jsonl) to `out`"""
+    orchestrator = DebateOrchestrator(
+        pro_provider=config.get("pro_provider", args.pro_provider),
+        pro_model=config.get("pro_model", args.pro_model),
+        con_provider=config.get("con_provider", args.con_provider),
+        con_model=config.get("con_model", args.con_model),
+        concurrent=not args.sequential,
+        stream=args.stream,
+        adaptive=args.adaptive,
+        fused_reflection=args.fused,
+        pipelined=args.pipelined,
+        replay=not args.fresh)
+    phases = tuple(phase for phase in PHASES if phase not in args.skip)
+    if args.format == "text":
+        for text in orchestrator.run_multiround_debate_deltas(config['topic'], args.rounds, phases):
+            out.write(text)
+            out.flush()
+        out.write("\n")
+    else:
+        # No transcript to render, so consume the events directly
+        for _ in orchestrator._debate_events(config['topic'], args.rounds, phases):
+            pass
+    result = debate_result(orchestrator.last_debate, orchestrator.phase_timings, orchestrator.last_trace,
+                           orchestrator.debate_id)
+    if args.format == "jsonl":
+        out.write(json.dumps(result_record(config, orchestrator, result), ensure_ascii=False) + "\n")
+        out.flush()
+    return result
+
+
+def export_store(store, path):
+    """Write the records of every finished debate in `store` to `path` as one numpy structured array"""
+    debates = ((debate_id, stored['topic'], stored_debate_state(stored)['records'])
+               for debate_id, stored in ((debate_id, store.load(debate_id)) for debate_id in store.debate_ids()))
+    return save_columns(path, debates)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run debates from the command line, without the web UI")
+    parser.add_argument("topic", nargs="?", help="topic to debate")
+    parser.add_argument("--topics", help="JSONL with one {\"topic\": ..., optional id/pro_model/con_model/...} per line")
+    parser.add_argument("--pro-provider", default="claude")
+    parser.add_argument("--pro-model", default="claude-sonnet-4-20250514")
+    parser.add_argument("--con-provider", default="claude")
+    parser.add_argument("--con-model", default="claude-sonnet-4-20250514")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--skip", nargs="*", default=[], choices=["reflect", "summarize"], help="phases to drop")
+    parser.add_argument("--format", default="text", choices=["text", "jsonl"],
+                        help="live transcript, or one JSON result per debate")
+    parser.add_argument("--output", help="file to write to instead of stdout")
+    parser.add_argument("--stream", action="store_true", help="stream tokens as they arrive (text format)")
+    parser.add_argument("--sequential", action="store_true", help="run Pro and Con one after the other")
+    parser.add_argument("--fused", action="store_true", help="reflect and summarize in one structured call")
+    parser.add_argument("--pipelined", action="store_true", help="start each agent's next step as soon as its inputs are ready")
+    parser.add_argument("--adaptive", action="store_true", help="stop refining once the debate has converged")
+    parser.add_argument("--fresh", action="store_true", help="don't replay a stored debate on the same topic")
+    parser.add_argument("--export", metavar="PATH",
+                        help="instead of debating, write every finished debate in DEBATE_STORE_DB to PATH (.npy)")
+    args = parser.parse_args(argv)
+
+    if args.export:
+        if DEBATE_STORE is None:
+            parser.error("--export needs DEBATE_STORE_DB set")
+        print(f"Exported {export_store(DEBATE_STORE, args.export)} records to {args.export}")
+        return
+
+    if args.topics:
+        configs = BatchDebateRunner.load_topics(args.topics)
+    elif args.topic:
+        configs = [{'id': "1", 'topic': args.topic}]
+    else:
+        parser.error("give a topic or --topics")
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for config in configs:
+            run_debate(config, args, out)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    main()
@@ -0,0 +1,79 @@
+import re
+
+from scheduler import estimate_tokens
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def trim_to_tokens(text, budget):
+    """Cut `text` to about `budget` tokens, preferring a sentence (else word) boundary"""
+    text = text or ""
+    if estimate_tokens(text) <= budget:
+        return text
+    head = text[:max(0, budget * 4)]
+    ends = [match.end() for match in _SENTENCE_END.finditer(head)]
+    if ends and ends[-1] >= len(head) // 2:
+        return head[:ends[-1]].rstrip()
+    words = head.rsplit(None, 1)
+    return (words[0] if len(words) > 1 else head) + " ..."
+
+
+def lead_sentence(text):
+    """First sentence of a turn, used as its one-line digest"""
+    text = " ".join((text or "").split())
+    return _SENTENCE_END.split(text, 1)[0] if text else ""
+
+
+class DebateContext:
+    """Bounded memory of one agent's side of a debate.
+
+    Keeps the agent's last argument verbatim and folds every older argument
+    into a running summary of one line per round (its lead sentence). Each part
+    of a refinement prompt is trimmed to a share of `token_budget`, so the
+    prompt stays the same size however many rounds the debate runs.
+    """
+
+    # Share of the budget for each part of the refinement context
+    SHARES = {'summary': 0.15, 'previous_argument': 0.35, 'reflection_summary': 0.2, 'opponent_argument': 0.3}
+
+    def __init__(self, token_budget=900):
+        self.token_budget = token_budget
+        self.summary_lines = []
+        self.last_turn = None
+        self.rounds = 0
+
+    def reset(self):
+        """Forget everything, for a new debate"""
+        self.summary_lines = []
+        self.last_turn = None
+        self.rounds = 0
+
+    def advance(self, argument):
+        """Record the agent's latest argument, folding the one it replaces into the summary"""
+        if argument == self.last_turn:
+            return
+        if self.last_turn is not None:
+            self.summary_lines.append(f"Round {self.rounds}: {trim_to_tokens(lead_sentence(self.last_turn), 40)}")
+        self.last_turn = argument
+        self.rounds += 1
+        budget = self._budget('summary')
+        while len(self.summary_lines) > 1 and estimate_tokens("\n".join(self.summary_lines)) > budget:
+            # Oldest rounds go first; the summary keeps the most recent ones
+            self.summary_lines.pop(0)
+
+    def _budget(self, part):
+        return int(self.token_budget * self.SHARES[part])
+
+    def fit(self, previous_argument, reflection_summary, opponent_argument):
+        """The refinement context, every part trimmed to its share of the budget"""
+        self.advance(previous_argument)
+        return {
+            'summary': trim_to_tokens("\n".join(self.summary_lines), self._budget('summary')),
+            'previous_argument': trim_to_tokens(previous_argument, self._budget('previous_argument')),
+            'reflection_summary': trim_to_tokens(reflection_summary, self._budget('reflection_summary')),
+            'opponent_argument': trim_to_tokens(opponent_argument, self._budget('opponent_argument')),
+        }
+
+    def tokens(self):
+        """Estimated size of the current context"""
+        return estimate_tokens("\n".join(self.summary_lines) + (self.last_turn or ""))
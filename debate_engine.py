@@ -1,166 +1,1178 @@
-import os
-from anthropic import Anthropic
-from dotenv import load_dotenv
-from openai import OpenAI
+import contextvars
+import json
+import queue
+import re
+import time
+import uuid
+from collections import namedtuple
+from contextlib import contextmanager
+from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor
+from cancellation import PHASE_TOKEN, CancelToken, DebateCancelled
+from provider_router import shared_router
+from client_pool import CLIENT_POOL, normalize_provider
+from debate_context import DebateContext, trim_to_tokens
+from debate_pipeline import ThreadedDebatePipeline
+from debate_records import PHASE_RECORDS, Verdict, side_usage
+from debate_store import DEBATE_STORE
+from debate_views import FLUSH_EVENTS, UI_FLUSH_INTERVAL, Panes, SplitScreenView, TranscriptView, UpdateBuffer
+from response_cache import RESPONSE_CACHE, make_cache_key
+from scheduler import SCHEDULER, request_tokens
+from telemetry import CURRENT_STEP, METRICS, DebateTrace, estimate_cost
+
+# Shared worker pool for concurrent phases: Con (or both streams) run here, blocking Pro on the caller's thread
+_PHASE_EXECUTOR = ThreadPoolExecutor(max_workers=64, thread_name_prefix="debate-phase")
+# Pipelined debates run their steps here; kept apart from the phase pool, whose workers block reading step output
+_PIPELINE_EXECUTOR = ThreadPoolExecutor(max_workers=64, thread_name_prefix="debate-step")
+
+_STREAM_DONE = object()
+
+
+def _once(call):
+    """Wrap a blocking call as a stream with a single chunk"""
+    yield call()
+
+
+def _text_stream(text):
+    """A stream of one chunk of already known text"""
+    yield text
+
+
+def _in_step(label, stream):
+    """Run `stream` with its provider calls attributed to step `label` in the DebateTrace"""
+    previous = CURRENT_STEP.get()
+    CURRENT_STEP.set(label)
+    try:
+        yield from stream()
+    finally:
+        CURRENT_STEP.set(previous)
+
+# Per-round phases of a debate, in order. "argue" opens round 1 and "refine" opens every later
+# round; "reflect" and "summarize" are optional and can be dropped to trade quality for latency.
+PHASES = ("argue", "reflect", "summarize", "refine")
+
+_PHASE_LABELS = {"argue": "round", "reflect": "reflection", "summarize": "summary", "refine": "round", "verdict": "verdict"}
+
+DebateEvent = namedtuple("DebateEvent", ["kind", "phase", "round_num", "side", "text", "texts"], defaults=(None, "", None))
+DebateEvent.__doc__ = """One step of a running debate: "phase_start", "delta" (text from `side`), "stream_done" (`side`'s
+stream ended) or "phase_done" (full `texts` per side)"""
+
+
+def build_phase_plan(total_rounds=3, phases=PHASES):
+    """Ordered (phase, round_num) steps for an N-round debate, ending with the verdict.
+
+    Reflection and summary steps belong to the round they critique, so round N's
+    reflect/summarize steps run just before the refine step of round N + 1.
+    """
+    unknown = set(phases) - set(PHASES)
+    if unknown:
+        raise ValueError(f"Unknown debate phases: {', '.join(sorted(unknown))}")
+    if "argue" not in phases or "refine" not in phases:
+        raise ValueError("A debate needs both the 'argue' and 'refine' phases")
+    total_rounds = int(total_rounds)
+    if total_rounds < 1:
+        raise ValueError("total_rounds must be at least 1")
+
+    plan = [("argue", 1)]
+    for round_num in range(2, total_rounds + 1):
+        if "reflect" in phases:
+            plan.append(("reflect", round_num - 1))
+            if "summarize" in phases:
+                plan.append(("summarize", round_num - 1))
+        plan.append(("refine", round_num))
+    plan.append(("verdict", total_rounds))
+    return plan
+
+
+def phase_label(phase, round_num):
+    """Name used for a step in phase timings, e.g. round_2 or summary_1"""
+    if phase == "verdict":
+        return "verdict"
+    return f"{_PHASE_LABELS[phase]}_{round_num}"
+
+
+def new_debate_state(topic):
+    """Empty record of everything a debate produces.
+
+    Every text lands once, as a typed record (debate_records) in `records`;
+    the per-side views (side_texts, side_scores, side_digests) are read from
+    them when needed rather than kept alongside.
+    """
+    return {
+        'topic': topic,
+        'records': [],
+        'verdict': None,
+        'stopped_early': None,
+    }
+
+
+# Record kind behind each per-side view of a debate state
+_VIEW_KINDS = {'arguments': "turn", 'reflections': "reflection", 'summaries': "summary"}
+
+
+def side_texts(state, side, view):
+    """One side's 'arguments', 'reflections' or 'summaries' so far, oldest first"""
+    kind = _VIEW_KINDS[view]
+    return [record.text for record in state['records'] if record.side == side and record.kind == kind]
+
+
+def side_scores(state, side):
+    """The SelfRatings of each of one side's reflections"""
+    return [parse_self_ratings(text) for text in side_texts(state, side, 'reflections')]
+
+
+def side_digests(state, side):
+    """An ArgumentDigest of each of one side's arguments, with the self-ratings its reflection gave it"""
+    return scored_digests(side_texts(state, side, 'arguments'), side_scores(state, side))
+
+
+def record_phase(state, phase, texts, usage=None, replayed=False):
+    """Store a finished phase's texts in the debate state.
+
+    `usage` ({side: usage}, see debate_records.side_usage) goes into the
+    phase's records; `replayed` marks texts that came from the store.
+    """
+    usage = usage or {}
+    if phase == "verdict":
+        state['verdict'] = texts['verdict']
+        state['records'].append(Verdict("judge", len(side_texts(state, 'pro', 'arguments')), texts['verdict'],
+                                        replayed=replayed, **usage.get('verdict', {})))
+        return
+    record_type = PHASE_RECORDS[phase]
+    for side in ('pro', 'con'):
+        round_num = 1 + sum(1 for record in state['records'] if record.side == side and record.kind == record_type.kind)
+        extra = {'score': rating_score(parse_self_ratings(texts[side]))} if phase == "reflect" else {}
+        state['records'].append(record_type(side, round_num, texts[side], replayed=replayed,
+                                            **usage.get(side, {}), **extra))
+
+
+def stored_debate_state(stored):
+    """Rebuild the debate state, records included, of a DebateStore.load() result"""
+    state = new_debate_state(stored['topic'])
+    for step in sorted(stored['steps']):
+        saved = stored['steps'][step]
+        record_phase(state, saved['phase'], saved['texts'], saved['usage'])
+        if saved['summaries']:
+            record_phase(state, "summarize", saved['summaries'])
+    state['stopped_early'] = stored['stopped_early']
+    return state
+
+
+SelfRatings = namedtuple("SelfRatings", ["logical_rigor", "evidence_quality", "objectivity", "overall"])
+SelfRatings.__doc__ = """X/10 scores from the SELF-RATING section of a reflection (None where missing)"""
+
+_RATING_PATTERNS = {
+    'logical_rigor': r"logical\s+rigou?r",
+    'evidence_quality': r"evidence\s+quality",
+    'objectivity': r"objectivity",
+    'overall': r"overall",
+}
+
+
+def parse_self_ratings(text):
+    """Pull the X/10 self-rating scores out of a reflection or summary"""
+    scores = {}
+    for name, label in _RATING_PATTERNS.items():
+        match = re.search(label + r"[^0-9\n]{0,20}?(\d+(?:\.\d+)?)\s*/\s*10", text or "", re.IGNORECASE)
+        scores[name] = float(match.group(1)) if match else None
+    return SelfRatings(**scores)
+
+
+def rating_score(ratings):
+    """Single score for a SelfRatings: the overall rating, else the mean of the others"""
+    if ratings.overall is not None:
+        return ratings.overall
+    parts = [score for score in ratings[:3] if score is not None]
+    return sum(parts) / len(parts) if parts else None
+
+
+ArgumentDigest = namedtuple("ArgumentDigest", ["round_num", "claims", "evidence", "rebuttals", "scores"], defaults=(None,))
+ArgumentDigest.__doc__ = """Compact record of one argument for the judge: key sentences by role, plus the self-ratings its reflection gave it"""
+
+_EVIDENCE = re.compile(r"\d|%|\b(stud(?:y|ies)|research|data|survey|evidence|according|report|statistic|for example|for instance|e\.g\.)", re.IGNORECASE)
+_REBUTTAL = re.compile(r"\b(opponent|opposing|other side|counter|critics?|rebut|they (?:say|argue|claim)|admittedly|however|even if)\b", re.IGNORECASE)
+
+
+def digest_argument(text, round_num, max_items=2, sentence_tokens=30):
+    """Sort an argument's sentences into claims, evidence and rebuttals (at most `max_items` each)"""
+    digest = {'claims': [], 'evidence': [], 'rebuttals': []}
+    for sentence in re.split(r"(?<=[.!?])\s+|\n+", text or ""):
+        sentence = re.sub(r"\*\*|__", "", sentence).strip(" -*#>\t")
+        if len(sentence.split()) < 4:
+            continue
+        if _REBUTTAL.search(sentence):
+            role = 'rebuttals'
+        elif _EVIDENCE.search(sentence):
+            role = 'evidence'
+        else:
+            role = 'claims'
+        if len(digest[role]) < max_items:
+            digest[role].append(trim_to_tokens(sentence, sentence_tokens))
+    return ArgumentDigest(round_num, tuple(digest['claims']), tuple(digest['evidence']), tuple(digest['rebuttals']))
+
+
+def scored_digests(arguments, scores):
+    """Digest a side's arguments, giving round N the Nth SelfRatings of `scores` where there is one"""
+    return [digest_argument(text, round_num)._replace(scores=scores[round_num - 1] if round_num <= len(scores) else None)
+            for round_num, text in enumerate(arguments, 1)]
+
+
+# Most of a final-round argument the judge reads verbatim; arguments aim for 100-150 words, so this only cuts runaways
+VERDICT_ARGUMENT_TOKENS = 400
+
+
+def format_digest(digest, max_items=None):
+    """Render a digest as a few indented lines of the judge prompt, keeping up to `max_items` sentences per role"""
+    score = rating_score(digest.scores) if digest.scores else None
+    lines = [f"        Round {digest.round_num}" + (f" (self-rated {score:g}/10):" if score is not None else ":")]
+    for label, items in (("Claims", digest.claims), ("Evidence", digest.evidence), ("Rebuttals", digest.rebuttals)):
+        if items:
+            lines.append(f"          {label}: " + " | ".join(items[:max_items]))
+    return "\n".join(lines)
+
+
+def text_similarity(a, b):
+    """Cheap 0..1 word-level similarity between two arguments"""
+    return SequenceMatcher(None, (a or "").split(), (b or "").split(), autojunk=False).ratio()
+
+
+def convergence_reason(state, phase, score_plateau=0.5, similarity_threshold=0.9):
+    """Why an adaptive debate should stop refining after this phase, or None to keep going.
+
+    Stops once both agents' self-ratings gained no more than `score_plateau` over
+    the previous reflection, or once both refined arguments are at least
+    `similarity_threshold` similar to the arguments they replaced.
+    """
+    scores = {side: side_scores(state, side) for side in ('pro', 'con')} if phase == "reflect" else None
+    if scores and len(scores['pro']) >= 2:
+        gains = []
+        for side in ('pro', 'con'):
+            current, previous = (rating_score(ratings) for ratings in scores[side][-1:-3:-1])
+            if current is None or previous is None:
+                return None
+            gains.append(current - previous)
+        if all(gain <= score_plateau for gain in gains):
+            return f"self-ratings plateaued (Pro {gains[0]:+.1f}, Con {gains[1]:+.1f})"
+    if phase == "refine":
+        similarities = [text_similarity(*side_texts(state, side, 'arguments')[-1:-3:-1]) for side in ('pro', 'con')]
+        if all(similarity >= similarity_threshold for similarity in similarities):
+            return f"arguments stopped changing (Pro {similarities[0]:.0%}, Con {similarities[1]:.0%} similar)"
+    return None
+
+
+def improvement_notes(state, side):
+    """What an agent carries into its next argument: the summary, else the full reflection, else nothing"""
+    round_num = len(side_texts(state, side, 'arguments'))
+    for view in ('summaries', 'reflections'):
+        notes = side_texts(state, side, view)
+        if len(notes) == round_num:
+            return notes[-1]
+    return ""
+
+
+def debate_result(state, phase_timings, trace=None, debate_id=None):
+    """The dict returned by run_multiround_debate; its per-side lists are read from the state's records"""
+    return {
+        'debate_id': debate_id,
+        'pro_arguments': side_texts(state, 'pro', 'arguments'),
+        'con_arguments': side_texts(state, 'con', 'arguments'),
+        'pro_reflections': side_texts(state, 'pro', 'reflections'),
+        'con_reflections': side_texts(state, 'con', 'reflections'),
+        'verdict': state['verdict'],
+        'pro_scores': side_scores(state, 'pro'),
+        'con_scores': side_scores(state, 'con'),
+        'pro_digests': side_digests(state, 'pro'),
+        'con_digests': side_digests(state, 'con'),
+        'stopped_early': state['stopped_early'],
+        'records': state['records'],
+        'phase_timings': phase_timings,
+        'trace': trace,
+    }
+
+
+# Static instruction blocks, shared by every agent. The argument and refinement rules open
+# their system prompts, ahead of anything per-agent or per-round; the reflection rubric and
+# summary instructions follow the text they work on in the user turn.
+ARGUMENT_RULES = """You are an agent in a debate.
+
+IMPORTANT RULES:
+1. You MUST take a clear position
+2. Do NOT suggest third options or compromises
+3. Do NOT give neutral "it depends" advice
+4. Commit fully to your assigned side
+5. Argue as if you genuinely believe your position is correct
+
+Be persuasive, logical and specific.
+Keep it conversational and fun - aim for 100-150 words."""
+
+REFLECTION_RUBRIC = """Now perform SURGICAL SELF-CRITIQUE. Be brutally specific:
+1. LOGICAL FALLACIES (quote the exact sentences):
+- Which specific sentences contain fallacies?
+- Quote them and name the fallacy
+- Why is it a fallacy in this context?
+
+2. BIASES DETECTED (be specific):
+- What assumptions did you make about the person?
+- What personal preferences leaked into your argument?
+- What did you assume was universal that's actually subjective?
+
+3. MANIPULATION TACTICS (quote examples):
+- Which phrases were designed to pressure rather than persuade?
+- Where did you use emotion instead of logic?
+- What words were chosen to manipulate? (CAPS, "trust me", etc.)
+
+4. MISSING CRITICAL QUESTIONS:
+- What should you have asked first before arguing?
+- What context is missing that would change everything?
+- What alternatives did you ignore?
+
+5. COUNTER-EXAMPLES TO YOUR OWN CLAIMS:
+- Find 2-3 scenarios where your advice would be BAD
+- What if your assumptions are wrong?
+
+6. WERE YOU FACTUALLY CORRECT IN SOME OR ALL PARTS?
+- Identify any factual claims you made
+- Were they accurate? If not, what should the correct facts be?
+
+7. IMPROVEMENT PLAN FOR NEXT ROUND:
+- Specifically, what will you change?
+- What information do you need?
+- How will you avoid these same mistakes?
+
+8. SELF-RATING:
+- Logical rigor: X/10 (why?)
+- Evidence quality: X/10 (why?)
+- Objectivity: X/10 (why?)
+- Overall: X/10
+
+Be harsher than you think necessary. Finding flaws is success. Keep crisp in your observations. Keep it to 100 to 150 words."""
+
+SUMMARY_INSTRUCTIONS = """Provide a concise summary (100-150 words) with:
+  1. Top 3 Specific flaws identified
+  2. Key improvement actions for the next round
+  3. Self-rating scores
+
+Keep it brief and actionable. This will guide the next argument round."""
+
+FUSED_REFLECTION_FORMAT = """Answer with a JSON object with two fields:
+- "critique": your full self-critique following the steps above, including the SELF-RATING section.
+- "summary": ONLY the essential points for improvement (100-150 words): the top 3 specific flaws,
+  the key improvement actions for the next round, and the self-rating scores."""
+
+
+def structured_output_failed(error):
+    """True if `error` means the structured answer was unusable (bad JSON, or the model rejected the format)"""
+    return isinstance(error, ValueError) or getattr(error, "status_code", None) in (400, 422)
+
+
+REFINEMENT_RULES = """You are an agent in a multi-round debate.
+You previously argued and reflected on your flaws.
+Now IMPROVE your argument by:
+1. Fixing the flaws you identified
+2. Responding to opponent's strongest points
+3. Being more rigorous and less biased.
+
+Make a BETTER argument that:
+- Fixes your identified flaws
+- Addresses opponent's strong points
+- Is more logical, evidence-based
+- Avoids manipulation tactics you caught yourself using.
+
+Keep it conversational and compelling - aim for 100-150 words."""
+
+
+def usage_record(clientType, usage):
+    """Normalise Anthropic/OpenAI usage into input/output/cache-read/cache-write token counts.
+
+    input_tokens counts only uncached input on both providers.
+    """
+    if usage is None:
+        return None
+    if (clientType or "").lower() == "openai":
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", 0) or 0
+        return {
+            'input_tokens': (getattr(usage, "prompt_tokens", 0) or 0) - cached,
+            'output_tokens': getattr(usage, "completion_tokens", 0) or 0,
+            'cache_read_tokens': cached,
+            'cache_write_tokens': 0,
+        }
+    return {
+        'input_tokens': getattr(usage, "input_tokens", 0) or 0,
+        'output_tokens': getattr(usage, "output_tokens", 0) or 0,
+        'cache_read_tokens': getattr(usage, "cache_read_input_tokens", 0) or 0,
+        'cache_write_tokens': getattr(usage, "cache_creation_input_tokens", 0) or 0,
+    }
+
 
 class DebateAgent:
-    """An agent that can argue for or against a position"""
+    """An agent that can argue for or against a position.
+
+    The argue/reflect/summarize/refine methods build prompts and return what
+    get_message / get_message_stream return, so they serve AsyncDebateAgent,
+    which only swaps those transport methods, unchanged.
+    """
     
-    def __init__(self, position, clientType="claude", model="claude-sonnet-4-20250514", api_key=None, max_tokens=1024):
+    def __init__(self, position, clientType="claude", model="claude-sonnet-4-20250514", api_key=None, max_tokens=1024, base_url=None, client_pool=None, temperature=None, cache=None, use_cache=True, scheduler=None, context_tokens=900, router=None):
         self.position = position
         self.clientType = clientType.lower()
         self.model = model
         self.api_key = api_key
         self.max_tokens = max_tokens
-        self.argument_history = []
-        
-    def generate_argument(self, topic, context="", round_num=1):
-        """Generate an argument for the given topic and context"""
-        
-        system_prompt = f"""You are an Agent {self.position.upper()} in a debate.
-        
-        IMPORTANT RULES:
-        1. You MUST take a clear position
-        2. Do NOT suggest third options or compromises
-        3. Do NOT give neutral "it depends" advice
-        4. Commit fully to your assigned side
-        5. Argue as if you genuinely believe your position is correct
-
-        Your job: Argue {self.position.upper()} for the decision at hand.
-        Be persuasive, logical and specific. 
-        Keep it conversational and fun - aim for 100-150 words."""
+        self.base_url = base_url
+        self.client_pool = client_pool or CLIENT_POOL
+        self.temperature = temperature
+        self.cache = cache or RESPONSE_CACHE
+        self.use_cache = use_cache
+        # Every provider call goes through the scheduler for rate limits and retries
+        self.scheduler = scheduler or SCHEDULER
+        # Optional ProviderRouter: picks the (provider, model) per call, with fallback and hedging
+        self.router = router
+        # DebateTrace and CancelToken of the debate in progress, set by the orchestrator
+        self.trace = None
+        self.cancel_token = None
+        self.last_usage = None
+        self.usage_totals = {}
+        # Improvement summary from the last reflect_with_summary call
+        self.last_summary = None
+        # Rolling summary + last turn, trimmed so refinement prompts stay the same size every round
+        self.context = DebateContext(context_tokens)
+        
+    def argument_prompts(self, topic, context="", round_num=1):
+        """Build the (system, user) prompts for an opening argument"""
+        system_prompt = f"""{ARGUMENT_RULES}
+
+You are Agent {self.position.upper()}. Your job: Argue {self.position.upper()} for the decision at hand."""
         
         user_prompt = f"""Topic: {topic} 
         {context}
         This is Round {round_num}. Make your best argument {'FOR' if self.position.lower() == 'pro' else 'AGAINST'} this decision.
         """
+        return system_prompt, user_prompt
+        
+    def generate_argument(self, topic, context="", round_num=1):
+        """Generate an argument for the given topic and context"""
+        system_prompt, user_prompt = self.argument_prompts(topic, context, round_num)
+        return self.get_message(prompt=user_prompt, system_prompt=system_prompt)
+    
+    def generate_argument_stream(self, topic, context="", round_num=1):
+        """Stream an argument as text deltas"""
+        system_prompt, user_prompt = self.argument_prompts(topic, context, round_num)
+        return self.get_message_stream(prompt=user_prompt, system_prompt=system_prompt)
     
-        argument = self.get_message(prompt=user_prompt, system_prompt=system_prompt)
-        self.argument_history.append(argument)
-        return argument
+    def reflection_prompts(self, own_argument):
+        """Build the (system, user) prompts for a self-critique"""
+        reflection_prompt = f"""You just made this argument: {own_argument}
+{REFLECTION_RUBRIC}"""
+        return "", reflection_prompt
     
     def reflect_on_argument(self, own_argument):
         """Agent critiques its own argument"""
-        reflection_prompt = f"""You just made this argument: {own_argument}"
-        Now perform SURGICAL SELF-CRITIQUE. Be brutally specific:
-        1. LOGICAL FALLACIES (quote the exact sentences):
-        - Which specific sentences contain fallacies?
-        - Quote them and name the fallacy
-        - Why is it a fallacy in this context?
-
-        2. BIASES DETECTED (be specific):
-        - What assumptions did you make about the person?
-        - What personal preferences leaked into your argument?
-        - What did you assume was universal that's actually subjective?
-
-        3. MANIPULATION TACTICS (quote examples):
-        - Which phrases were designed to pressure rather than persuade?
-        - Where did you use emotion instead of logic?
-        - What words were chosen to manipulate? (CAPS, "trust me", etc.)
-
-        4. MISSING CRITICAL QUESTIONS:
-        - What should you have asked first before arguing?
-        - What context is missing that would change everything?
-        - What alternatives did you ignore?
-
-        5. COUNTER-EXAMPLES TO YOUR OWN CLAIMS:
-        - Find 2-3 scenarios where your advice would be BAD
-        - What if your assumptions are wrong?
-
-        6. WERE YOU FACTUALLY CORRECT IN SOME OR ALL PARTS?
-        - Identify any factual claims you made
-        - Were they accurate? If not, what should the correct facts be?
-
-        7. IMPROVEMENT PLAN FOR NEXT ROUND:
-        - Specifically, what will you change?
-        - What information do you need?
-        - How will you avoid these same mistakes?
-
-        8. SELF-RATING:
-        - Logical rigor: X/10 (why?)
-        - Evidence quality: X/10 (why?)
-        - Objectivity: X/10 (why?)
-        - Overall: X/10
-
-        Be harsher than you think necessary. Finding flaws is success. Keep crisp in your observations. Keep it to 100 to 150 words.
+        system_prompt, reflection_prompt = self.reflection_prompts(own_argument)
+        return self.get_message(prompt=reflection_prompt, system_prompt=system_prompt)
+    
+    def reflect_on_argument_stream(self, own_argument):
+        """Stream a self-critique as text deltas"""
+        system_prompt, reflection_prompt = self.reflection_prompts(own_argument)
+        return self.get_message_stream(prompt=reflection_prompt, system_prompt=system_prompt)
+    
+    def fused_reflection_prompts(self, own_argument):
+        """Build the (system, user) prompts for a self-critique that also returns its summary"""
+        system_prompt, reflection_prompt = self.reflection_prompts(own_argument)
+        return system_prompt, f"{reflection_prompt}\n\n{FUSED_REFLECTION_FORMAT}"
+    
+    def reflect_with_summary(self, own_argument):
+        """Self-critique and improvement summary in one structured call.
+
+        Returns the critique and keeps the summary in last_summary. If the
+        provider's answer does not validate, falls back to reflect_on_argument
+        followed by extract_reflection_summary.
         """
-        reflection = self.get_message(prompt=reflection_prompt)
-        return reflection
-        
-    def get_message(self, prompt, system_prompt=""):
-        """Helper to get message from appropriate client"""
+        # Imported here so pydantic only loads once a debate fuses its reflections
+        from debate_schemas import ReflectionOutput
+        system_prompt, reflection_prompt = self.fused_reflection_prompts(own_argument)
+        try:
+            result = self.get_structured(reflection_prompt, system_prompt, ReflectionOutput)
+        except Exception as e:
+            if not structured_output_failed(e):
+                raise
+            critique = self.reflect_on_argument(own_argument)
+            self.last_summary = self.extract_reflection_summary(critique)
+            return critique
+        self.last_summary = result.summary
+        return result.critique
+    
+    def _build_messages(self, prompt, system_prompt=""):
+        """Chat messages for the provider (OpenAI carries the system prompt inline)"""
         messages = []
         if system_prompt != "" and self.clientType.lower() == "openai":
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
+        return messages
+        
+    def _request_params(self, prompt, system_prompt=""):
+        """Keyword arguments for the provider's create/stream call"""
+        params = {
+            'model': self.model,
+            'max_tokens': self.max_tokens,
+            'messages': self._build_messages(prompt, system_prompt),
+        }
+        if self.clientType.lower() != "openai":
+            params['system'] = system_prompt
+        if self.temperature is not None:
+            params['temperature'] = self.temperature
+        return params
+    
+    def _cache_key(self, prompt, system_prompt="", use_cache=None):
+        """Response-cache key for this request, or None when caching is off for the call"""
+        if not (self.use_cache if use_cache is None else use_cache):
+            return None
+        return make_cache_key(normalize_provider(self.clientType), self.model, system_prompt, prompt, self.max_tokens, self.temperature)
+    
+    def _record_usage(self, usage):
+        """Keep the token usage (including prompt-cache reads/writes) of the last call and the running totals"""
+        self.last_usage = usage_record(self.clientType, usage)
+        if self.last_usage is None:
+            return
+        for name, tokens in self.last_usage.items():
+            self.usage_totals[name] = self.usage_totals.get(name, 0) + tokens
+    
+    def _record_call(self, started, first_token=None, cached=False):
+        """Report a finished call (wall time, TTFT, tokens, cost) to the metrics and the current trace"""
+        seconds = time.perf_counter() - started
+        usage = None if cached else self.last_usage
+        call = {
+            'provider': normalize_provider(self.clientType),
+            'model': self.model,
+            'side': self.position,
+            # The step that made the call, which under pipelining need not be the phase on screen
+            'phase': CURRENT_STEP.get(),
+            'start': time.time() - seconds,
+            'seconds': seconds,
+            'first_token_seconds': first_token,
+            'cached': cached,
+            **(usage or {}),
+            'cost_usd': estimate_cost(self.model, usage),
+        }
+        METRICS.observe_call(call)
+        if self.trace is not None:
+            self.trace.add_call(call)
         
+    @contextmanager
+    def _cancellable(self, close):
+        """Run a provider stream that `close()` aborts if the debate is cancelled meanwhile.
+
+        A stream cut off that way raises DebateCancelled, whether the SDK
+        reports the closed connection as an error or just stops.
+        """
+        token = self._cancel_token()
+        if token is None:
+            yield
+            return
+        token.check()
+        try:
+            with token.on_cancel(close):
+                yield
+        except Exception as e:
+            if token.cancelled:
+                raise DebateCancelled("Debate cancelled") from e
+            raise
+        token.check()
+
+    def _cancel_token(self):
+        """The CancelToken a call made now answers to: its phase's own (PHASE_TOKEN) if set, else the debate's"""
+        return PHASE_TOKEN.get() or self.cancel_token
+    
+    def _client(self):
+        """The pooled SDK client for this agent (shared, so keep-alive connections survive across calls)"""
+        return self.client_pool.get(self.clientType, api_key=self.api_key, base_url=self.base_url)
+    
+    def _cached_answer(self, cache_key, started, stream=False):
+        """The cached answer for `cache_key`, recorded as a cached call, or None on a miss"""
+        cached = self.cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            self.last_usage = None
+            self._record_call(started, first_token=time.perf_counter() - started if stream else None, cached=True)
+        return cached
+    
+    def _send(self, params):
+        """The SDK call that sends `params` as one request (a coroutine function on an async client)"""
+        client = self._client()
+        create = client.chat.completions.create if self.clientType.lower() == "openai" else client.messages.create
+        return lambda: create(**params)
+    
+    def _finish_message(self, message, started, cache_key, schema=None):
+        """Record a finished request and return its text, or its validated `schema` instance, caching it"""
+        self._record_usage(getattr(message, "usage", None))
+        self._record_call(started)
+        if schema is not None:
+            result = self._parse_structured(message, schema)
+            if cache_key:
+                self.cache.set(cache_key, result.model_dump_json())
+            return result
+        text = message.choices[0].message.content if self.clientType.lower() == "openai" else message.content[0].text
+        if cache_key and text:
+            self.cache.set(cache_key, text)
+        return text
+    
+    def _finish_stream(self, started, first_token, cache_key, chunks):
+        """Record a finished stream and cache its text"""
+        self._record_call(started, first_token)
+        # Only completed streams are cached
+        if cache_key and chunks:
+            self.cache.set(cache_key, "".join(chunks))
+    
+    def get_message(self, prompt, system_prompt="", use_cache=None):
+        """Helper to get message from appropriate client"""
+        if self.router is not None:
+            text, routed = self.router.call(self, lambda agent: agent.get_message(prompt, system_prompt, use_cache))
+            self.last_usage = routed.last_usage
+            return text
+        if self._cancel_token() is not None:
+            # An open stream can be closed from another thread to abort the call; a blocking request can't
+            return "".join(self.get_message_stream(prompt, system_prompt, use_cache))
+        started = time.perf_counter()
+        cache_key = self._cache_key(prompt, system_prompt, use_cache)
+        cached = self._cached_answer(cache_key, started)
+        if cached is not None:
+            return cached
+        params = self._request_params(prompt, system_prompt)
+        message = self.scheduler.call(self.clientType, self.api_key, request_tokens(params), self._send(params))
+        return self._finish_message(message, started, cache_key)
+    
+    def get_message_stream(self, prompt, system_prompt="", use_cache=None):
+        """Like get_message, but yields text deltas as the provider streams them"""
+        if self.router is not None:
+            routed = yield from self.router.stream(self, lambda agent: agent.get_message_stream(prompt, system_prompt, use_cache))
+            self.last_usage = routed.last_usage
+            return
+        started = time.perf_counter()
+        cache_key = self._cache_key(prompt, system_prompt, use_cache)
+        cached = self._cached_answer(cache_key, started, stream=True)
+        if cached is not None:
+            yield cached
+            return
+        params = self._request_params(prompt, system_prompt)
+        
+        chunks = []
+        first_token = None
+        self.last_usage = None
+        for delta in self.scheduler.stream(self.clientType, self.api_key, request_tokens(params),
+                                           lambda: self._provider_stream(params)):
+            if first_token is None:
+                first_token = time.perf_counter() - started
+            chunks.append(delta)
+            yield delta
+        self._finish_stream(started, first_token, cache_key, chunks)
+    
+    def _structured_params(self, prompt, system_prompt, schema):
+        """Request params that make the provider answer with a JSON object matching `schema`"""
+        params = self._request_params(prompt, system_prompt)
         if self.clientType.lower() == "openai":
-            client = OpenAI(api_key=self.api_key)
-            message = client.chat.completions.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                messages=messages)
-            return message.choices[0].message.content
+            # JSON mode works on every chat model; the fields are spelled out in the prompt
+            fields = json.dumps(schema.model_json_schema()['properties'])
+            params['messages'][-1]['content'] += f"\n\nRespond with a JSON object with these fields: {fields}"
+            params['response_format'] = {"type": "json_object"}
         else:
-            client = Anthropic(api_key=self.api_key)
-            message = client.messages.create(
-                model=self.model,
-                system=system_prompt,
-                max_tokens=self.max_tokens,
-                messages=messages)
-            return message.content[0].text
+            params['tools'] = [{"name": schema.__name__, "description": schema.__doc__,
+                                "input_schema": schema.model_json_schema()}]
+            params['tool_choice'] = {"type": "tool", "name": schema.__name__}
+        return params
+    
+    def _parse_structured(self, message, schema):
+        """Validate the provider's structured answer; raises ValueError (pydantic's ValidationError included) if unusable"""
+        if self.clientType.lower() == "openai":
+            return schema.model_validate_json(message.choices[0].message.content or "")
+        for block in message.content:
+            if getattr(block, "type", None) == "tool_use":
+                return schema.model_validate(block.input)
+        raise ValueError(f"No {schema.__name__} tool call in the response")
+    
+    def get_structured(self, prompt, system_prompt, schema, use_cache=None):
+        """Like get_message, but returns a validated `schema` instance via tool use (Anthropic) or JSON mode (OpenAI)"""
+        if self.router is not None:
+            result, routed = self.router.call(self, lambda agent: agent.get_structured(prompt, system_prompt, schema, use_cache))
+            self.last_usage = routed.last_usage
+            return result
+        started = time.perf_counter()
+        cache_key = self._cache_key(f"{prompt}\n[{schema.__name__}]", system_prompt, use_cache)
+        cached = self._cached_answer(cache_key, started)
+        if cached is not None:
+            return schema.model_validate_json(cached)
+        params = self._structured_params(prompt, system_prompt, schema)
+        token = self._cancel_token()
+        if token is not None:
+            # Structured calls are not streamed, so cancellation only stops them from starting
+            token.check()
+        message = self.scheduler.call(self.clientType, self.api_key, request_tokens(params), self._send(params))
+        return self._finish_message(message, started, cache_key, schema)
+    
+    def _provider_stream(self, params):
+        """Open one provider stream and yield its text deltas, recording usage at the end"""
+        client = self._client()
+        if self.clientType.lower() == "openai":
+            stream = client.chat.completions.create(**params, stream=True, stream_options={"include_usage": True})
+            try:
+                with self._cancellable(stream.close):
+                    for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+                        if getattr(chunk, "usage", None) is not None:
+                            self._record_usage(chunk.usage)
+            finally:
+                stream.close()
+        else:
+            with client.messages.stream(**params) as stream, self._cancellable(stream.close):
+                yield from stream.text_stream
+                self._record_usage(stream.get_final_message().usage)
+    
+    def summary_prompts(self, full_reflection):
+        """Build the (system, user) prompts for condensing a reflection"""
+        summary_prompt = f"""From this detailed self-critique, extract ONLY the essential points for improvement:
+{full_reflection}
+{SUMMARY_INSTRUCTIONS}"""
+        return "", summary_prompt
     
     def extract_reflection_summary(self, full_reflection):
         """Extract key points from reflection for next round context"""
-        summary_prompt = f"""From this detailed self-critique, extract ONLY the essential points for improvement:
-        {full_reflection}
-        Provide a concise summary (100-150 words) with:
-          1. Top 3 Specific flaws identified
-          2. Key improvement actions for the next round
-          3. Self-rating scores
-        
-        Keep it brief and actionable. This will guide the next argument round."""
-        message = self.get_message(prompt=summary_prompt)
-        return message
+        system_prompt, summary_prompt = self.summary_prompts(full_reflection)
+        return self.get_message(prompt=summary_prompt, system_prompt=system_prompt)
     
-    def refine_argument(self, topic, previous_argument, reflection_summary, opponent_argument, round_num):
-        """Generate improved argument based on reflection and opponent's points"""
-        
-        system_prompt = f"""You are Agent {self.position.upper()} in Round {round_num} of a debate.
-        You previously argued and reflected on your flaws. 
-        Now IMPROVE your argument by:
-        1. Fixing the flaws you identified
-        2. Responding to opponent's strongest points
-        3. Being more rigorous and less biased.
-        Keep it conversational and compelling - aim for 100-150 words.
-        """
-        
-        user_prompt = f"""Topic: {topic}
-        YOUR PREVIOUS ARGUMENT: (Round {round_num - 1}): {previous_argument}
-        YOUR SELF-REFLECTION IDENTIFIED THESE ISSUES: {reflection_summary}
+    def refinement_prompts(self, topic, previous_argument, reflection_summary, opponent_argument, round_num):
+        """Build the (system, user) prompts for an improved argument, with the context trimmed to budget"""
+        system_prompt = f"""{REFINEMENT_RULES}
+
+You are Agent {self.position.upper()} in Round {round_num} of a debate."""
+        context = self.context.fit(previous_argument, reflection_summary, opponent_argument)
+        earlier = f"\n        YOUR EARLIER ROUNDS IN BRIEF:\n{context['summary']}\n" if context['summary'] else ""
         
-        OPPONENT'S ARGUMENT: {opponent_argument}
+        user_prompt = f"""Topic: {topic}{earlier}
+        YOUR PREVIOUS ARGUMENT: (Round {round_num - 1}): {context['previous_argument']}
+        YOUR SELF-REFLECTION IDENTIFIED THESE ISSUES: {context['reflection_summary']}
         
-        Now make a BETTER argument that:
-        - Fixes your identified flaws
-        - Addresses opponent's strong points
-        - Is more logical, evidence-based
-        - Avoids manipulation tactics you caught yourself using.
+        OPPONENT'S ARGUMENT: {context['opponent_argument']}
         
         Make your best case for {'supporting' if self.position.lower() == 'pro' else 'opposing'} this decision. Aim for 100 to 150 words."""
-        
-        argument = self.get_message(prompt=user_prompt, system_prompt=system_prompt)
-        self.argument_history.append(argument)
-        return argument
+        return system_prompt, user_prompt
+    
+    def refine_argument(self, topic, previous_argument, reflection_summary, opponent_argument, round_num):
+        """Generate improved argument based on reflection and opponent's points"""
+        system_prompt, user_prompt = self.refinement_prompts(topic, previous_argument, reflection_summary, opponent_argument, round_num)
+        return self.get_message(prompt=user_prompt, system_prompt=system_prompt)
     
+    def refine_argument_stream(self, topic, previous_argument, reflection_summary, opponent_argument, round_num):
+        """Stream an improved argument as text deltas"""
+        system_prompt, user_prompt = self.refinement_prompts(topic, previous_argument, reflection_summary, opponent_argument, round_num)
+        return self.get_message_stream(prompt=user_prompt, system_prompt=system_prompt)
     
-class DebateOrchestrator:
-    """Manages the full debate between two agents"""
-        
-    def __init__(self, pro_provider="claude", pro_model="claude-sonnet-4-20250514", con_provider="claude", con_model="claude-sonnet-4-20250514", pro_api_key=None, con_api_key=None): 
-        self.agent_pro = DebateAgent(position="pro", clientType=pro_provider, model=pro_model, api_key=pro_api_key)
-        self.agent_con = DebateAgent(position="con", clientType=con_provider, model=con_model, api_key=con_api_key)
+    
+# A live step for the engine to run: stream it, yielding its deltas, and send back {side: text}
+PhaseRun = namedtuple("PhaseRun", ["phase", "round_num", "streams"])
+
+# Blocking store I/O for the engine to run (the async one on a worker thread): send back fn(*args), or throw its error
+StoreCall = namedtuple("StoreCall", ["fn", "args"])
+
+
+class BaseDebateOrchestrator:
+    """Everything about a debate except how its calls are made.
+
+    Phase planning, prompts, the debate state, checkpointing and replay,
+    convergence and reporting live here, along with the phase state machine
+    (_debate_steps). Subclasses supply the transport: the agent class, the
+    pipeline, and how a phase's streams are driven and merged, on threads
+    (DebateOrchestrator) or asyncio tasks (AsyncDebateOrchestrator).
+    """
+    
+    agent_class = DebateAgent
+        
+    def __init__(self, pro_provider="claude", pro_model="claude-sonnet-4-20250514", con_provider="claude", con_model="claude-sonnet-4-20250514", pro_api_key=None, con_api_key=None, client_pool=None, concurrent=False, stream=False, cache=None, use_cache=True, adaptive=False, score_plateau=0.5, similarity_threshold=0.9, scheduler=None, context_tokens=900, fused_reflection=False, pipelined=False, store=None, replay=True, pro_fallbacks=None, con_fallbacks=None, judge=None, cancel_token=None): 
+        self.client_pool = client_pool or CLIENT_POOL
+        self.concurrent = concurrent
+        self.stream = stream
+        # Adaptive mode stops refining once reflections or arguments converge (see convergence_reason)
+        self.adaptive = adaptive
+        self.score_plateau = score_plateau
+        self.similarity_threshold = similarity_threshold
+        # Fused mode gets each reflection and its summary from one structured call, dropping the summary phase
+        self.fused_reflection = fused_reflection
+        # Pipelined mode starts each agent's next step as soon as its own inputs are ready (see DebatePipeline)
+        self.pipelined = pipelined
+        self.pipeline = None
+        # With a DebateStore every completed phase is checkpointed; `replay` resumes or replays the latest debate on the same topic
+        self.store = store if store is not None else DEBATE_STORE
+        self.replay = replay
+        self.debate_id = None
+        self.phase_timings = []
+        self.last_debate = None
+        self.last_trace = None
+        # Fallbacks are extra (provider, model[, api_key]) options, used only while the agent's own model is
+        # resting after failures or to hedge a slow call; records name the model that actually answered
+        pro_router = shared_router([(pro_provider, pro_model, pro_api_key), *pro_fallbacks]) if pro_fallbacks else None
+        con_router = shared_router([(con_provider, con_model, con_api_key), *con_fallbacks]) if con_fallbacks else None
+        self.agent_pro = self.agent_class(position="pro", clientType=pro_provider, model=pro_model, api_key=pro_api_key, client_pool=self.client_pool, cache=cache, use_cache=use_cache, scheduler=scheduler, context_tokens=context_tokens, router=pro_router)
+        self.agent_con = self.agent_class(position="con", clientType=con_provider, model=con_model, api_key=con_api_key, client_pool=self.client_pool, cache=cache, use_cache=use_cache, scheduler=scheduler, context_tokens=context_tokens, router=con_router)
+        # The verdict is written by `judge` if given (e.g. a fixed model for a tournament), else by Pro's client
+        self.judge = judge or self.agent_pro
+        # Opening arguments already generated elsewhere, by side; used instead of calling the agent
+        self.openings = {}
+        # Stops the debate between phases and aborts its calls in flight; see cancel()
+        self.cancel_token = cancel_token or CancelToken()
             
+    def _phase_streams(self, phase, round_num, topic, state):
+        """(side, stream) pairs for one phase, built from the debate state so far"""
+        if phase == "verdict":
+            verdict_args = self._verdict_args(topic, state)
+            return [
+                ('verdict', self._step_stream(phase, round_num, self._agent_stream(
+                    lambda: self.generate_verdict_stream(*verdict_args),
+                    lambda: self.generate_verdict(*verdict_args)))),
+            ]
+        return [(side, self._step_stream(phase, round_num, self._side_stream(phase, round_num, side, topic, state)))
+                for side in ('pro', 'con')]
+
+    def _step_stream(self, phase, round_num, stream):
+        """`stream` with the calls it makes tagged with its step, for per-step usage in the trace"""
+        in_step, label = self._in_step, phase_label(phase, round_num)
+        return lambda: in_step(label, stream)
+
+    def _agent_stream(self, stream_call, blocking_call):
+        """Token stream when streaming is on, otherwise the blocking call as one chunk"""
+        if self.stream:
+            return stream_call
+        once = self._once
+        return lambda: once(blocking_call)
+
+    def _side_stream(self, phase, round_num, side, topic, state):
+        """Stream for one agent's step, reading only that step's inputs from `state`"""
+        agent, opponent = (self.agent_pro, 'con') if side == 'pro' else (self.agent_con, 'pro')
+        once = self._once
+        if phase == "argue":
+            if side in self.openings:
+                text_stream, opening = self._text_stream, self.openings[side]
+                return lambda: text_stream(opening)
+            return self._agent_stream(lambda: agent.generate_argument_stream(topic, round_num=round_num),
+                                      lambda: agent.generate_argument(topic, round_num=round_num))
+        if phase == "reflect":
+            argument = side_texts(state, side, 'arguments')[-1]
+            if self.fused_reflection:
+                # Structured output arrives whole, so a fused reflection is one chunk
+                return lambda: once(lambda: agent.reflect_with_summary(argument))
+            return self._agent_stream(lambda: agent.reflect_on_argument_stream(argument),
+                                      lambda: agent.reflect_on_argument(argument))
+        if phase == "summarize":
+            # Summaries only feed the next round, so there is nothing to stream
+            reflection = side_texts(state, side, 'reflections')[-1]
+            return lambda: once(lambda: agent.extract_reflection_summary(reflection))
+        refine = dict(topic=topic, previous_argument=side_texts(state, side, 'arguments')[-1],
+                      reflection_summary=improvement_notes(state, side),
+                      opponent_argument=side_texts(state, opponent, 'arguments')[-1], round_num=round_num)
+        return self._agent_stream(lambda: agent.refine_argument_stream(**refine),
+                                  lambda: agent.refine_argument(**refine))
+
+
+    def phase_prompts(self, phase, round_num, topic, state):
+        """(side, agent, system_prompt, user_prompt) for every call of one phase, without sending them"""
+        if phase == "verdict":
+            return [('verdict', self.judge, "", self.verdict_prompt(*self._verdict_args(topic, state)))]
+        prompts = []
+        for side, agent, opponent in (('pro', self.agent_pro, 'con'), ('con', self.agent_con, 'pro')):
+            if phase == "argue":
+                system_prompt, user_prompt = agent.argument_prompts(topic, round_num=round_num)
+            elif phase == "reflect":
+                system_prompt, user_prompt = agent.reflection_prompts(side_texts(state, side, 'arguments')[-1])
+            elif phase == "summarize":
+                system_prompt, user_prompt = agent.summary_prompts(side_texts(state, side, 'reflections')[-1])
+            else:
+                system_prompt, user_prompt = agent.refinement_prompts(
+                    topic, side_texts(state, side, 'arguments')[-1], improvement_notes(state, side),
+                    side_texts(state, opponent, 'arguments')[-1], round_num)
+            prompts.append((side, agent, system_prompt, user_prompt))
+        return prompts
+
+    def _debate_steps(self, topic, total_rounds, phases, debate_id=None):
+        """The phase state machine shared by both engines; returns the final debate state.
+
+        Yields DebateEvents for the engine to pass on, a PhaseRun for each
+        step that has to run live, which the engine streams before sending back
+        the {side: text} it produced, and a StoreCall for each checkpoint read
+        or write. An exception the engine throws in (e.g. a failed call) or
+        closing the generator (the consumer went away) stops the debate;
+        closing also aborts its calls in flight.
+        """
+        self.phase_timings = []
+        self._start_debate(topic)
+        state = new_debate_state(topic)
+        plan = self._phase_plan(total_rounds, phases)
+        saved = yield StoreCall(self._open_record, (topic, total_rounds, phases, debate_id))
+        self.pipeline = None
+        if self.pipelined and not saved:
+            self.pipeline = self._new_pipeline(topic, plan)
+            self.pipeline.start()
+        try:
+            for step, (phase, round_num) in enumerate(plan):
+                if state['stopped_early'] and phase != "verdict":
+                    continue
+                self.cancel_token.check()
+                yield DebateEvent("phase_start", phase, round_num)
+                if step in saved:
+                    texts = saved[step]['texts']
+                    yield from self._replay_phase(state, phase, round_num, saved[step])
+                else:
+                    texts = yield PhaseRun(phase, round_num, self._streams(phase, round_num, topic, state))
+                    self._record_phase(state, phase, round_num, texts)
+                    yield StoreCall(self._save_phase, (step, phase, round_num, texts, state))
+                yield DebateEvent("phase_done", phase, round_num, texts=texts)
+                stop_event = self._check_convergence(phase, round_num, state)
+                if stop_event:
+                    yield stop_event
+        except GeneratorExit:
+            # Nobody is reading any more (e.g. the browser tab closed, or Stop was pressed): abort the calls in flight
+            self.cancel_token.cancel()
+            if self.store is not None:
+                # Nor running StoreCalls, so this one blocks
+                self.store.interrupt(self.debate_id)
+            raise
+        except Exception:
+            if self.store is not None:
+                # Resumable by the next session on this topic at once, rather than after the lease runs out
+                yield StoreCall(self.store.interrupt, (self.debate_id,))
+            raise
+        finally:
+            if self.pipeline:
+                self.pipeline.cancel()
+        self.last_trace.finish()
+        if self.store is not None:
+            yield StoreCall(self.store.finish, (self.debate_id, state['stopped_early']))
+        self.last_debate = state
+        return state
+
+    def cancel(self):
+        """Stop the debate: no further phase starts and the provider calls in flight are aborted.
+
+        The running debate raises DebateCancelled; its completed phases stay in
+        the store, so it can be resumed. Cancelling is final for this
+        orchestrator, so start a new one for the next debate.
+        """
+        self.cancel_token.cancel()
+
+    def debate_config(self, total_rounds, phases):
+        """Everything a stored debate must match to be resumed or replayed"""
+        config = {
+            'pro_provider': self.agent_pro.clientType, 'pro_model': self.agent_pro.model,
+            'con_provider': self.agent_con.clientType, 'con_model': self.agent_con.model,
+            'total_rounds': total_rounds, 'phases': list(phases),
+            'adaptive': self.adaptive, 'score_plateau': self.score_plateau,
+            'similarity_threshold': self.similarity_threshold, 'fused_reflection': self.fused_reflection,
+            'judge_provider': self.judge.clientType, 'judge_model': self.judge.model,
+        }
+        for side, agent in (('pro', self.agent_pro), ('con', self.agent_con)):
+            if agent.router is not None:
+                # Models that may have answered for the side (without their keys)
+                config[f'{side}_fallbacks'] = [[option.provider, option.model] for option in agent.router.options[1:]]
+        return config
+
+    def _open_record(self, topic, total_rounds, phases, debate_id=None):
+        """Pick this debate's id and return the stored steps to replay ({step: phase record}, empty when new).
+
+        A given `debate_id` is resumed if the store has it. Otherwise, with
+        `replay` on, the latest debate on the same topic and configuration is
+        picked up: a finished one replays whole, an interrupted one resumes.
+        One still running in another session is left alone.
+        """
+        self.debate_id = debate_id or uuid.uuid4().hex
+        if self.store is None:
+            return {}
+        config = self.debate_config(total_rounds, phases)
+        if debate_id is None and self.replay:
+            found = self.store.find(topic, config)
+            if found and self.store.claim(found):
+                self.debate_id = found
+        record = self.store.load(self.debate_id)
+        if record is None:
+            self.store.start(self.debate_id, topic, config)
+            return {}
+        if record['config'] != config:
+            raise ValueError(f"Debate {self.debate_id} was stored with a different configuration")
+        return record['steps']
+
+    def _replay_phase(self, state, phase, round_num, saved):
+        """Record a stored step as if it had just run; returns its texts as delta events"""
+        if phase == "refine":
+            # A live refinement folds the argument it replaces into the agent's context
+            for side, agent in (('pro', self.agent_pro), ('con', self.agent_con)):
+                agent.context.advance(side_texts(state, side, 'arguments')[-1])
+        record_phase(state, phase, saved['texts'], saved['usage'], replayed=True)
+        if saved['summaries']:
+            record_phase(state, "summarize", saved['summaries'], replayed=True)
+        self.phase_timings.append({'phase': phase_label(phase, round_num), 'seconds': 0.0,
+                                   'first_token_seconds': None, 'replayed': True})
+        return [DebateEvent("delta", phase, round_num, side, text) for side, text in saved['texts'].items()]
+
+    def _save_phase(self, step, phase, round_num, texts, state):
+        """Checkpoint a completed step, with its usage and any fused summaries"""
+        if self.store is None:
+            return
+        summaries = None
+        if phase == "reflect" and self.fused_reflection:
+            summaries = {side: side_texts(state, side, 'summaries')[-1] for side in ('pro', 'con')}
+        usage = side_usage(self.last_trace, phase_label(phase, round_num), tuple(texts), self._models())
+        self.store.save_phase(self.debate_id, step, phase, round_num, texts, summaries, usage)
+
+    def _start_debate(self, topic):
+        """Reset the agents' context and open a DebateTrace shared with both agents, so their calls land in it"""
+        self.agent_pro.context.reset()
+        self.agent_con.context.reset()
+        self.last_trace = DebateTrace(topic, {
+            'debate.pro_model': self.agent_pro.model,
+            'debate.con_model': self.agent_con.model,
+            'debate.concurrent': self.concurrent,
+            'debate.stream': self.stream,
+        })
+        self.agent_pro.trace = self.agent_con.trace = self.judge.trace = self.last_trace
+        self.agent_pro.cancel_token = self.agent_con.cancel_token = self.judge.cancel_token = self.cancel_token
+        return self.last_trace
+
+    def _phase_plan(self, total_rounds, phases):
+        """The debate's phase plan; fused reflections already carry their summary"""
+        if self.fused_reflection:
+            phases = tuple(phase for phase in phases if phase != "summarize")
+        return build_phase_plan(total_rounds, phases)
+
+    def _streams(self, phase, round_num, topic, state):
+        """A step's streams: read from the pipeline when pipelined, else started now from `state`"""
+        if self.pipeline and phase != "verdict":
+            return self.pipeline.phase_streams(phase, round_num)
+        return self._phase_streams(phase, round_num, topic, state)
+
+    def _models(self):
+        """Model of each side, for records of steps that made no calls"""
+        return {'pro': self.agent_pro.model, 'con': self.agent_con.model, 'verdict': self.judge.model}
+
+    def _record_phase(self, state, phase, round_num, texts):
+        """Store a finished phase, plus the summaries a fused reflection produced alongside it"""
+        models = self._models()
+        record_phase(state, phase, texts, side_usage(self.last_trace, phase_label(phase, round_num), tuple(texts), models))
+        if phase == "reflect" and self.fused_reflection:
+            if self.pipeline:
+                # The agents may have moved on to later reflections already
+                summaries = self.pipeline.summaries(len(side_texts(state, 'pro', 'reflections')))
+            else:
+                summaries = {'pro': self.agent_pro.last_summary, 'con': self.agent_con.last_summary}
+            # Written by the reflection calls, whose usage the reflection records carry
+            record_phase(state, "summarize", summaries, {side: {'model': models[side]} for side in summaries})
+
+    def _check_convergence(self, phase, round_num, state):
+        """In adaptive mode, mark the debate as converged and return an early_stop event"""
+        if not self.adaptive:
+            return None
+        reason = convergence_reason(state, phase, self.score_plateau, self.similarity_threshold)
+        if not reason:
+            return None
+        state['stopped_early'] = reason
+        if self.pipeline:
+            self.pipeline.cancel()
+        return DebateEvent("early_stop", phase, round_num, text=reason)
+
+    def _open_phase(self, phase, round_num):
+        """Start timing a live phase: (trace span, start time)"""
+        return self.last_trace.start_phase(phase_label(phase, round_num)), time.perf_counter()
+
+    def _close_phase(self, phase, round_num, opened, first_token):
+        """Record the timing of a live phase opened with _open_phase"""
+        span, start = opened
+        timing = {
+            'phase': phase_label(phase, round_num),
+            'seconds': time.perf_counter() - start,
+            'first_token_seconds': first_token if self.stream else None,
+        }
+        self.phase_timings.append(timing)
+        self.last_trace.end_phase(span, timing)
+
+    def usage_totals(self):
+        """Token usage so far per agent, including prompt-cache reads and writes"""
+        return {'pro': dict(self.agent_pro.usage_totals), 'con': dict(self.agent_con.usage_totals)}
+
+    def format_phase_timings(self):
+        """Render per-phase latency of the last debate"""
+        lines = [f"Phase timings ({'concurrent' if self.concurrent else 'sequential'}):"]
+        for timing in self.phase_timings:
+            line = f"  {timing['phase']:<14} {timing['seconds']:6.2f}s"
+            if timing.get('first_token_seconds') is not None:
+                line += f"  (first token {timing['first_token_seconds']:.2f}s)"
+            if timing.get('replayed'):
+                line += "  (replayed from store)"
+            lines.append(line)
+        total = sum(timing['seconds'] for timing in self.phase_timings)
+        lines.append(f"  {'total':<14} {total:6.2f}s")
+        if self.last_trace is not None:
+            totals = self.last_trace.totals()
+            lines.append(f"  {totals['input_tokens'] + totals['cache_read_tokens']} input / {totals['output_tokens']} output tokens"
+                         f" over {totals['calls']} calls, est. ${totals['cost_usd']:.4f}")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _verdict_args(topic, state):
+        """The generate_verdict arguments for a finished debate state"""
+        return (topic, side_texts(state, 'pro', 'arguments'), side_texts(state, 'con', 'arguments'),
+                side_scores(state, 'pro'), side_scores(state, 'con'))
+
+    def verdict_prompt(self, topic, pro_arguments, con_arguments, pro_scores=(), con_scores=()):
+        """Build the judge prompt for the finished debate.
+
+        Each side's final argument is given verbatim (up to
+        VERDICT_ARGUMENT_TOKENS); earlier rounds only show how the case
+        evolved, as digests with the self-ratings (`*_scores`, SelfRatings per
+        round) their reflections gave them.
+        """
+        total_rounds = len(pro_arguments)
+
+        def side_case(name, arguments, scores):
+            lines = []
+            if len(arguments) > 1:
+                lines.append(f"        AGENT {name}'S EARLIER ROUNDS:")
+                lines.extend(format_digest(digest) for digest in scored_digests(arguments[:-1], scores))
+                lines.append("")
+            lines.append(f"        AGENT {name}'S FINAL ARGUMENT (Round {len(arguments)}):")
+            lines.append(trim_to_tokens(arguments[-1], VERDICT_ARGUMENT_TOKENS))
+            return "\n".join(lines)
+
+        improvement = (f"How did arguments improve from Round 1 to Round {total_rounds}?" if total_rounds > 1
+                       else "How do the two opening arguments compare?")
+    
+        verdict_prompt = f"""Analyze this complete {total_rounds}-round debate:
+
+        TOPIC: {topic}
+
+{side_case("PRO", pro_arguments, pro_scores)}
+
+{side_case("CON", con_arguments, con_scores)}
+
+        Provide final verdict:
+        1. Which agent argued more effectively overall? (Not about being right, about argument quality)
+        2. {improvement}
+        3. What key insights emerged from this debate?
+        4. What recommendation would you make for the decision?
+
+        Be balanced and insightful. 100-150 words."""
+        return verdict_prompt
+
+    def generate_verdict(self, topic, pro_arguments, con_arguments, pro_scores=(), con_scores=()):
+        """Synthesize the full debate and provide final analysis"""
+        # Pro agent's client by default (neutral task)
+        return self.judge.get_message(prompt=self.verdict_prompt(topic, pro_arguments, con_arguments, pro_scores, con_scores))
+
+    def generate_verdict_stream(self, topic, pro_arguments, con_arguments, pro_scores=(), con_scores=()):
+        """Stream the final analysis as text deltas"""
+        return self.judge.get_message_stream(prompt=self.verdict_prompt(topic, pro_arguments, con_arguments, pro_scores, con_scores))
+
+
+class DebateOrchestrator(BaseDebateOrchestrator):
+    """Manages the full debate between two agents"""
+
+    _once = staticmethod(_once)
+    _text_stream = staticmethod(_text_stream)
+    _in_step = staticmethod(_in_step)
+
     def run_simple_debate(self, topic): 
         """Run a debate with reflection phase"""
         print("="*60)
@@ -198,504 +1210,162 @@ class DebateOrchestrator:
         print("Debate with reflection complete!")
         print("="*60)
  
-    def run_multiround_debate(self, topic, total_rounds=3):
-        """Run a multi-round debate with reflection and improvement"""
-        print("="*70)
-        print(f"MULTI-ROUND DEBATE : {topic}")
-        print("="*70)
-        
-        pro_arguments = []
-        con_arguments = []
-        pro_reflections = []
-        con_reflections = []
-        
-        # === ROUND 1: Initial Arguments ===
-        print("\n" + "=" * 70)
-        print("ROUND 1: INITIAL ARGUMENTS")
-        print("=" * 70)
-        
-        print("\nAGENT PRO:")
-        print("-" * 70)
-        pro_arg_1 = self.agent_pro.generate_argument(topic, round_num=1)
-        print(pro_arg_1)
-        pro_arguments.append(pro_arg_1)
-        
-        print("\nAGENT CON:")
-        print("-" * 70)
-        con_arg_1 = self.agent_con.generate_argument(topic, round_num=1)
-        print(con_arg_1)
-        con_arguments.append(con_arg_1)
-        
-        # === REFLECTION 1 ===
-        print("\n" + "=" * 70)
-        print("REFLECTION PHASE 1: Self-Critique")
-        print("=" * 70)
-        
-        print("\nAGENT PRO Reflects:")
-        print("-" * 70)
-        pro_refl_1 = self.agent_pro.reflect_on_argument(pro_arg_1)
-        print(pro_refl_1[:500] + "...\n[Reflection continues...]")  # Show partial
-        pro_reflections.append(pro_refl_1)
-        
-        print("\nAGENT CON Reflects:")
-        print("-" * 70)
-        con_refl_1 = self.agent_con.reflect_on_argument(con_arg_1)
-        print(con_refl_1[:500] + "...\n[Reflection continues...]")
-        con_reflections.append(con_refl_1)
-        
-        # Extract summaries for Round 2
-        print("\nExtracting key insights for Round 2...")
-        pro_summary_1 = self.agent_pro.extract_reflection_summary(pro_refl_1)
-        con_summary_1 = self.agent_con.extract_reflection_summary(con_refl_1)
-        
-         
-        # === ROUND 2: Improved Arguments ===
-        print("\n" + "=" * 70)
-        print("ROUND 2: IMPROVED ARGUMENTS (Based on Reflection)")
-        print("=" * 70)
-        
-        print("\nAGENT PRO (Improved):")
-        print("-" * 70)
-        pro_arg_2 = self.agent_pro.refine_argument(
-            topic=topic,
-            previous_argument=pro_arg_1,
-            reflection_summary=pro_summary_1,
-            opponent_argument=con_arg_1,
-            round_num=2
-        )
-        print(pro_arg_2)
-        pro_arguments.append(pro_arg_2)
-        
-        print("\nAGENT CON (Improved):")
-        print("-" * 70)
-        con_arg_2 = self.agent_con.refine_argument(
-            topic=topic,
-            previous_argument=con_arg_1,
-            reflection_summary=con_summary_1,
-            opponent_argument=pro_arg_1,
-            round_num=2
-        )
-        print(con_arg_2)
-        con_arguments.append(con_arg_2)
-        
-        # === REFLECTION 2 (Optional but good to show improvement) ===
-        print("\n" + "=" * 70)
-        print("REFLECTION PHASE 2: Did We Improve?")
-        print("=" * 70)
-        
-        print("\nAGENT PRO Reflects on Round 2:")
-        print("-" * 70)
-        pro_refl_2 = self.agent_pro.reflect_on_argument(pro_arg_2)
-        print(pro_refl_2[:400] + "...\n[Checking for remaining flaws...]")
-        pro_reflections.append(pro_refl_2)
-        
-        print("\nAGENT CON Reflects on Round 2:")
-        print("-" * 70)
-        con_refl_2 = self.agent_con.reflect_on_argument(con_arg_2)
-        print(con_refl_2[:400] + "...\n[Checking for remaining flaws...]")
-        con_reflections.append(con_refl_2)
-        
-        # Extract summaries for Round 3
-        print("\nExtracting insights for final round...")
-        pro_summary_2 = self.agent_pro.extract_reflection_summary(pro_refl_2)
-        con_summary_2 = self.agent_con.extract_reflection_summary(con_refl_2)
-        
-        
-        # === ROUND 3: Final Polish ===
-        print("\n" + "=" * 70)
-        print("ROUND 3: FINAL POLISHED ARGUMENTS")
-        print("=" * 70)
-        
-        print("\nAGENT PRO (Final):")
-        print("-" * 70)
-        pro_arg_3 = self.agent_pro.refine_argument(
-            topic=topic,
-            previous_argument=pro_arg_2,
-            reflection_summary=pro_summary_2,
-            opponent_argument=con_arg_2,
-            round_num=3
-        )
-        print(pro_arg_3)
-        pro_arguments.append(pro_arg_3)
-        
-        print("\nAGENT CON (Final):")
-        print("-" * 70)
-        con_arg_3 = self.agent_con.refine_argument(
-            topic=topic,
-            previous_argument=con_arg_2,
-            reflection_summary=con_summary_2,
-            opponent_argument=pro_arg_2,
-            round_num=3
-        )
-        print(con_arg_3)
-        con_arguments.append(con_arg_3)
-        
-        # === FINAL VERDICT ===
-        print("\n" + "=" * 70)
-        print("FINAL VERDICT")
-        print("=" * 70)
-        
-        verdict = self.generate_verdict(topic, pro_arguments, con_arguments)
-        print(verdict)
-        
-        print("\n" + "=" * 70)
-        print("DEBATE COMPLETE!")
-        print("=" * 70)
-        
-        return {
-            'pro_arguments': pro_arguments,
-            'con_arguments': con_arguments,
-            'pro_reflections': pro_reflections,
-            'con_reflections': con_reflections,
-            'verdict': verdict
-        }
+    def _new_pipeline(self, topic, plan):
+        return ThreadedDebatePipeline(self, topic, plan, _PIPELINE_EXECUTOR)
 
-    def run_split_screen_debate(self, topic, total_rounds=3):
-         """Run debate with split-screen outputs"""
-    
-         pro_output = []
-         con_output = []
-         verdict_output = []
-        
-         def format_pro(text):
-            pro_output.append(text)
-            return "\n".join(pro_output)
-        
-         def format_con(text):
-            con_output.append(text)
-            return "\n".join(con_output)
-        
-         # Initialize with topic header
-         header = "AI DEBATE ARENA\n"
-         header += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-         header += f"**Topic:** {topic}\n"
-         header += "**Pattern:** Reflection (from Andrew Ng's Agentic AI Course)\n"
-         header += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
-         pro_config = f"Agent Pro: {self.agent_pro.clientType.upper()} Model {self.agent_pro.model}\n"
-         con_config = f"Agent Con: {self.agent_con.clientType.upper()} Model {self.agent_con.model}\n"
-         yield format_pro(header + pro_config +"Preparing to debate..."), format_con(header + con_config + "Preparing to debate..."), ""
-        
-         pro_arguments = []
-         con_arguments = []
-        
-         # === ROUND 1 ===
-         yield format_pro("\n" + "="*50), format_con("\n" + "="*50), ""
-         yield format_pro("ROUND 1: OPENING ARGUMENT"), format_con("ROUND 1: OPENING ARGUMENT"), ""
-         yield format_pro("="*50 + "\n"), format_con("="*50 + "\n"), ""
-        
-         # Pro argues
-         pro_arg_1 = self.agent_pro.generate_argument(topic, round_num=1)
-         yield format_pro(pro_arg_1 + "\n"), format_con("Waiting for opponent...\n"), ""
-         pro_arguments.append(pro_arg_1)
-        
-         # Con argues
-         con_arg_1 = self.agent_con.generate_argument(topic, round_num=1)
-         yield "", format_con(con_arg_1 + "\n"), ""
-         con_arguments.append(con_arg_1)
-        
-         # === REFLECTION 1 ===
-         yield format_pro("\n" + "="*50), format_con("\n" + "="*50), ""
-         yield format_pro("REFLECTION: AI Critiques Itself"), format_con("REFLECTION: AI Critiques Itself"), ""
-         yield format_pro("="*50), format_con("="*50), ""
-         yield format_pro("Analyzing my own biases and flaws...\n"), format_con("Analyzing my own biases and flaws...\n"), ""
-        
-         # Pro reflects
-         pro_refl_1 = self.agent_pro.reflect_on_argument(pro_arg_1)
-        
-         # Con reflects
-         con_refl_1 = self.agent_con.reflect_on_argument(con_arg_1)
-         yield format_pro(pro_refl_1 + "\n"), format_con(con_refl_1 + "\n"), ""
-        
-        # Extract summaries
-         yield format_pro("\nLearning from mistakes...\n"), format_con("\nLearning from mistakes...\n"), ""
-         pro_summary_1 = self.agent_pro.extract_reflection_summary(pro_refl_1)
-         con_summary_1 = self.agent_con.extract_reflection_summary(con_refl_1)
-        
-         # === ROUND 2 ===
-         yield format_pro("\n" + "="*50), format_con("\n" + "="*50), ""
-         yield format_pro("ROUND 2: IMPROVED ARGUMENT"), format_con("ROUND 2: IMPROVED ARGUMENT"), ""
-         yield format_pro("="*50), format_con("="*50), ""
-         yield format_pro("Fixing flaws from Round 1...\n"), format_con("Fixing flaws from Round 1...\n"), ""
-        
-         # Pro refines
-         pro_arg_2 = self.agent_pro.refine_argument(
-            topic=topic,
-            previous_argument=pro_arg_1,
-            reflection_summary=pro_summary_1,
-            opponent_argument=con_arg_1,
-            round_num=2
-         )
-    
-         pro_arguments.append(pro_arg_2)
-        
-         # Con refines
-         con_arg_2 = self.agent_con.refine_argument(
-            topic=topic,
-            previous_argument=con_arg_1,
-            reflection_summary=con_summary_1,
-            opponent_argument=pro_arg_1,
-            round_num=2
-         )
-         yield format_pro(pro_arg_2 + "\n"), format_con(con_arg_2 + "\n"), ""
-         con_arguments.append(con_arg_2)
-        
-         # === REFLECTION 2 ===
-         yield format_pro("\n" + "="*50), format_con("\n" + "="*50), ""
-         yield format_pro("REFLECTION 2: Did I Improve?"), format_con("REFLECTION 2: Did I Improve?"), ""
-         yield format_pro("="*50 + "\n"), format_con("="*50 + "\n"), ""
-        
-         pro_refl_2 = self.agent_pro.reflect_on_argument(pro_arg_2)
-         con_refl_2 = self.agent_con.reflect_on_argument(con_arg_2)
-        
-         yield format_pro(pro_refl_2 + "\n"), format_con(con_refl_2 + "\n"), ""
-        
-         pro_summary_2 = self.agent_pro.extract_reflection_summary(pro_refl_2)
-         con_summary_2 = self.agent_con.extract_reflection_summary(con_refl_2)
-        
-         # === ROUND 3 ===
-         yield format_pro("\n" + "="*50), format_con("\n" + "="*50), ""
-         yield format_pro("ROUND 3: FINAL ARGUMENT"), format_con("ROUND 3: FINAL ARGUMENT"), ""
-         yield format_pro("="*50), format_con("="*50), ""
-         yield format_pro("Most refined position...\n"), format_con("Most refined position...\n"), ""
-        
-         pro_arg_3 = self.agent_pro.refine_argument(
-            topic=topic,
-            previous_argument=pro_arg_2,
-            reflection_summary=pro_summary_2,
-            opponent_argument=con_arg_2,
-            round_num=3
-         )
-       
-         pro_arguments.append(pro_arg_3)
-        
-         con_arg_3 = self.agent_con.refine_argument(
-            topic=topic,
-            previous_argument=con_arg_2,
-            reflection_summary=con_summary_2,
-            opponent_argument=pro_arg_2,
-            round_num=3
-         )
-         yield format_pro(pro_arg_3 + "\n"), format_con(con_arg_3 + "\n"), ""
-         con_arguments.append(con_arg_3)
-        
-         # === VERDICT ===
-         verdict_output.append("FINAL VERDICT")
-         verdict_output.append("="*50 + "\n")
-         verdict_output.append(f"Judge: {self.agent_pro.clientType.upper()} Model {self.agent_pro.model} (neutral task)\n")
-         verdict_output.append("Judge is analyzing all arguments...\n")
-        
-         verdict = self.generate_verdict(topic, pro_arguments, con_arguments)
-         verdict_output.append(verdict)
-         verdict_output.append("\n\n" + "="*50)
-         verdict_output.append("\nDebate Complete!")
-        
-         yield format_pro("\nAll rounds complete!"), format_con("\nAll rounds complete!"),  "\n".join(verdict_output)
+    def _debate_events(self, topic, total_rounds=3, phases=PHASES, debate_id=None):
+        """Run the phase plan, yielding DebateEvents; returns the final debate state"""
+        steps = self._debate_steps(topic, total_rounds, phases, debate_id)
+        try:
+            item = next(steps)
+            while True:
+                if isinstance(item, PhaseRun):
+                    try:
+                        texts = yield from self._stream_phase(*item)
+                    except Exception as e:
+                        # Let the state machine record the failure; it raises `e` again
+                        item = steps.throw(e)
+                    else:
+                        item = steps.send(texts)
+                elif isinstance(item, StoreCall):
+                    try:
+                        result = item.fn(*item.args)
+                    except Exception as e:
+                        item = steps.throw(e)
+                    else:
+                        item = steps.send(result)
+                else:
+                    yield item
+                    item = next(steps)
+        except StopIteration as done:
+            return done.value
+        finally:
+            steps.close()
 
+    def _stream_phase(self, phase, round_num, streams):
+        """Drive one phase's streams, yielding a "delta" DebateEvent as text arrives.
 
-    def generate_verdict(self, topic, pro_arguments, con_arguments):
-        """Synthesize the full debate and provide final analysis"""
-    
-        verdict_prompt = f"""Analyze this complete 3-round debate:
+        `streams` is a list of (side, callable returning an iterator of deltas).
+        With concurrent mode the streams run at once and their deltas interleave;
+        otherwise each side is streamed to completion before the next starts.
+        The generator returns a {side: full_text} dict when every stream is done.
+        """
+        opened = self._open_phase(phase, round_num)
+        first_token = None
+        texts = {side: [] for side, _ in streams}
+        if self.concurrent and len(streams) > 1:
+            events = self._merge_streams(streams)
+        else:
+            events = self._chain_streams(streams)
+        for side, delta in events:
+            if delta is _STREAM_DONE:
+                yield DebateEvent("stream_done", phase, round_num, side)
+                continue
+            if first_token is None:
+                first_token = time.perf_counter() - opened[1]
+            texts[side].append(delta)
+            yield DebateEvent("delta", phase, round_num, side, delta)
+        self._close_phase(phase, round_num, opened, first_token)
+        return {side: "".join(chunks) for side, chunks in texts.items()}
 
-        TOPIC: {topic}
+    @staticmethod
+    def _chain_streams(streams):
+        """Each stream's (side, delta) events in turn, each stream ending with (side, _STREAM_DONE)"""
+        for side, stream in streams:
+            for delta in stream():
+                yield side, delta
+            yield side, _STREAM_DONE
 
-        AGENT PRO'S EVOLUTION:
-        Round 1: {pro_arguments[0][:200]}...
-        Round 2: {pro_arguments[1][:200]}...
-        Round 3: {pro_arguments[2][:200]}...
+    def _merge_streams(self, streams):
+        """Consume several streams on worker threads and yield their (side, delta) events in arrival order.
 
-        AGENT CON'S EVOLUTION:
-        Round 1: {con_arguments[0][:200]}...
-        Round 2: {con_arguments[1][:200]}...
-        Round 3: {con_arguments[2][:200]}...
+        Like _chain_streams, each stream's events end with (side, _STREAM_DONE).
 
-        Provide final verdict:
-        1. Which agent argued more effectively overall? (Not about being right, about argument quality)
-        2. How did arguments improve from Round 1 to Round 3?
-        3. What key insights emerged from this debate?
-        4. What recommendation would you make for the decision?
+        The streams' calls answer to a CancelToken of the merge's own, which is
+        cancelled if the merge ends early (a side failed, or the consumer
+        stopped reading), so the other sides' provider calls are aborted
+        rather than run to completion unobserved.
+        """
+        events = queue.Queue()
+        token = CancelToken()
 
-        Be balanced and insightful. 100-150 words."""
+        def pump(side, stream):
+            PHASE_TOKEN.set(token)
+            try:
+                for delta in stream():
+                    events.put((side, delta))
+                events.put((side, _STREAM_DONE))
+            except Exception as e:
+                events.put((side, e))
 
-        # Use Pro agent's client to generate verdict (neutral task)
-        message = self.agent_pro.get_message(prompt=verdict_prompt)
-        return message
+        with self.cancel_token.on_cancel(token.cancel):
+            for side, stream in streams:
+                # In a context of its own, so PHASE_TOKEN does not outlive the pump on the worker thread
+                _PHASE_EXECUTOR.submit(contextvars.copy_context().run, pump, side, stream)
+            pending = len(streams)
+            try:
+                while pending:
+                    side, item = events.get()
+                    if item is _STREAM_DONE:
+                        pending -= 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    yield side, item
+            finally:
+                if pending:
+                    token.cancel()
+
+    def run_multiround_debate(self, topic, total_rounds=3, phases=PHASES, debate_id=None):
+        """Run a multi-round debate with reflection and improvement"""
+        view = TranscriptView(self, topic, total_rounds)
+        for line in view.start():
+            print(line)
+        for event in self._debate_events(topic, total_rounds, phases, debate_id):
+            for line in view.feed(event):
+                print(line)
+        
+        return debate_result(self.last_debate, self.phase_timings, self.last_trace, self.debate_id)
+
+    def run_split_screen_deltas(self, topic, total_rounds=3, phases=PHASES, flush_interval=UI_FLUSH_INTERVAL, debate_id=None):
+        """Run debate with split-screen output as PaneAppends (text to add to each pane).
+
+        Appends are coalesced to at most one per `flush_interval` seconds; the
+        generator returns the DebateTrace.
+        """
+        view = SplitScreenView(self, topic, total_rounds)
+        buffer = UpdateBuffer(flush_interval)
+        yield from buffer.add(view.start(), urgent=True)
+        for event in self._debate_events(topic, total_rounds, phases, debate_id):
+            yield from buffer.add(view.feed(event), urgent=event.kind in FLUSH_EVENTS)
+        yield from buffer.flush()
+        return self.last_trace
+
+    def run_split_screen_debate(self, topic, total_rounds=3, phases=PHASES, flush_interval=UI_FLUSH_INTERVAL, debate_id=None):
+        """Run debate with split-screen outputs as whole (pro, con, verdict) texts; the generator returns the DebateTrace"""
+        panes = Panes()
+        for update in self.run_split_screen_deltas(topic, total_rounds, phases, flush_interval, debate_id):
+            yield panes.apply(update)
+        return self.last_trace
+
+    def run_multiround_debate_deltas(self, topic, total_rounds=3, phases=PHASES, flush_interval=UI_FLUSH_INTERVAL, debate_id=None):
+        """Run debate and YIELD the text appended to the transcript, at most once per `flush_interval`"""
+        view = TranscriptView(self, topic, total_rounds)
+        buffer = UpdateBuffer(flush_interval)
+        yield from buffer.add([view.append(view.start())], urgent=True)
+        for event in self._debate_events(topic, total_rounds, phases, debate_id):
+            text = view.render(event)
+            yield from buffer.add([text] if text else [], urgent=event.kind in FLUSH_EVENTS)
+        yield from buffer.flush()
+        return self.last_trace
+
+    def run_multiround_debate_streaming(self, topic, total_rounds=3, phases=PHASES, flush_interval=UI_FLUSH_INTERVAL, debate_id=None):
+        """Run debate and YIELD the whole transcript so far for live updates"""
+        transcript = ""
+        for text in self.run_multiround_debate_deltas(topic, total_rounds, phases, flush_interval, debate_id):
+            transcript += text
+            yield transcript
+        return self.last_trace
 
-    def run_multiround_debate_streaming(self, topic, total_rounds=3):
-        """Run debate and YIELD results incrementally for live updates"""
-        
-        output = []
-        
-        def add_and_yield(text):
-            """Helper to add text and yield current output"""
-            output.append(text)
-            return "\n".join(output)
-        
-        # Header
-        yield add_and_yield("=" * 70)
-        yield add_and_yield(f"MULTI-ROUND DEBATE: {topic}")
-        yield add_and_yield("=" * 70)
-        yield add_and_yield("")
-        
-        pro_arguments = []
-        con_arguments = []
-        pro_reflections = []
-        con_reflections = []
-        
-        # === ROUND 1 ===
-        yield add_and_yield("=" * 70)
-        yield add_and_yield("ROUND 1: INITIAL ARGUMENTS")
-        yield add_and_yield("=" * 70)
-        yield add_and_yield("")
-        
-        yield add_and_yield("AGENT PRO:")
-        yield add_and_yield("-" * 70)
-        pro_arg_1 = self.agent_pro.generate_argument(topic, round_num=1)
-        yield add_and_yield(pro_arg_1)
-        yield add_and_yield("")
-        pro_arguments.append(pro_arg_1)
-        
-        yield add_and_yield("AGENT CON:")
-        yield add_and_yield("-" * 70)
-        con_arg_1 = self.agent_con.generate_argument(topic, round_num=1)
-        yield add_and_yield(con_arg_1)
-        yield add_and_yield("")
-        con_arguments.append(con_arg_1)
-        
-        # === REFLECTION 1 ===
-        yield add_and_yield("=" * 70)
-        yield add_and_yield("REFLECTION PHASE 1: Self-Critique")
-        yield add_and_yield("=" * 70)
-        yield add_and_yield("")
-        
-        yield add_and_yield("AGENT PRO Reflects:")
-        yield add_and_yield("-" * 70)
-        pro_refl_1 = self.agent_pro.reflect_on_argument(pro_arg_1)
-        yield add_and_yield(pro_refl_1[:500] + "...")
-        yield add_and_yield("[Reflection continues...]")
-        yield add_and_yield("")
-        pro_reflections.append(pro_refl_1)
-        
-        yield add_and_yield("AGENT CON Reflects:")
-        yield add_and_yield("-" * 70)
-        con_refl_1 = self.agent_con.reflect_on_argument(con_arg_1)
-        yield add_and_yield(con_refl_1[:500] + "...")
-        yield add_and_yield("[Reflection continues...]")
-        yield add_and_yield("")
-        con_reflections.append(con_refl_1)
-        
-        # Extract summaries
-        yield add_and_yield("Extracting key insights for Round 2...")
-        yield add_and_yield("")
-        pro_summary_1 = self.agent_pro.extract_reflection_summary(pro_refl_1)
-        con_summary_1 = self.agent_con.extract_reflection_summary(con_refl_1)
-        
-        # === ROUND 2 ===
-        yield add_and_yield("=" * 70)
-        yield add_and_yield("ROUND 2: IMPROVED ARGUMENTS")
-        yield add_and_yield("=" * 70)
-        yield add_and_yield("")
-        
-        yield add_and_yield("AGENT PRO (Improved):")
-        yield add_and_yield("-" * 70)
-        pro_arg_2 = self.agent_pro.refine_argument(
-            topic=topic,
-            previous_argument=pro_arg_1,
-            reflection_summary=pro_summary_1,
-            opponent_argument=con_arg_1,
-            round_num=2
-        )
-        yield add_and_yield(pro_arg_2)
-        yield add_and_yield("")
-        pro_arguments.append(pro_arg_2)
-        
-        yield add_and_yield("AGENT CON (Improved):")
-        yield add_and_yield("-" * 70)
-        con_arg_2 = self.agent_con.refine_argument(
-            topic=topic,
-            previous_argument=con_arg_1,
-            reflection_summary=con_summary_1,
-            opponent_argument=pro_arg_1,
-            round_num=2
-        )
-        yield add_and_yield(con_arg_2)
-        yield add_and_yield("")
-        con_arguments.append(con_arg_2)
-        
-        # === REFLECTION 2 ===
-        yield add_and_yield("=" * 70)
-        yield add_and_yield("REFLECTION PHASE 2: Did We Improve?")
-        yield add_and_yield("=" * 70)
-        yield add_and_yield("")
-        
-        yield add_and_yield("AGENT PRO Reflects on Round 2:")
-        yield add_and_yield("-" * 70)
-        pro_refl_2 = self.agent_pro.reflect_on_argument(pro_arg_2)
-        yield add_and_yield(pro_refl_2[:400] + "...")
-        yield add_and_yield("[Checking for remaining flaws...]")
-        yield add_and_yield("")
-        pro_reflections.append(pro_refl_2)
-        
-        yield add_and_yield("AGENT CON Reflects on Round 2:")
-        yield add_and_yield("-" * 70)
-        con_refl_2 = self.agent_con.reflect_on_argument(con_arg_2)
-        yield add_and_yield(con_refl_2[:400] + "...")
-        yield add_and_yield("[Checking for remaining flaws...]")
-        yield add_and_yield("")
-        con_reflections.append(con_refl_2)
-        
-        # Extract summaries
-        yield add_and_yield("Extracting insights for final round...")
-        yield add_and_yield("")
-        pro_summary_2 = self.agent_pro.extract_reflection_summary(pro_refl_2)
-        con_summary_2 = self.agent_con.extract_reflection_summary(con_refl_2)
-        
-        # === ROUND 3 ===
-        yield add_and_yield("=" * 70)
-        yield add_and_yield("ROUND 3: FINAL POLISHED ARGUMENTS")
-        yield add_and_yield("=" * 70)
-        yield add_and_yield("")
-        
-        yield add_and_yield("AGENT PRO (Final):")
-        yield add_and_yield("-" * 70)
-        pro_arg_3 = self.agent_pro.refine_argument(
-            topic=topic,
-            previous_argument=pro_arg_2,
-            reflection_summary=pro_summary_2,
-            opponent_argument=con_arg_2,
-            round_num=3
-        )
-        yield add_and_yield(pro_arg_3)
-        yield add_and_yield("")
-        pro_arguments.append(pro_arg_3)
-        
-        yield add_and_yield("AGENT CON (Final):")
-        yield add_and_yield("-" * 70)
-        con_arg_3 = self.agent_con.refine_argument(
-            topic=topic,
-            previous_argument=con_arg_2,
-            reflection_summary=con_summary_2,
-            opponent_argument=pro_arg_2,
-            round_num=3
-        )
-        yield add_and_yield(con_arg_3)
-        yield add_and_yield("")
-        con_arguments.append(con_arg_3)
-        
-        # === VERDICT ===
-        yield add_and_yield("=" * 70)
-        yield add_and_yield("FINAL VERDICT")
-        yield add_and_yield("=" * 70)
-        yield add_and_yield("")
-        
-        yield add_and_yield("Generating final analysis...")
-        verdict = self.generate_verdict(topic, pro_arguments, con_arguments)
-        yield add_and_yield(verdict)
-        yield add_and_yield("")
-        
-        yield add_and_yield("=" * 70)
-        yield add_and_yield("DEBATE COMPLETE!")
-        yield add_and_yield("=" * 70)
       
 if __name__ == "__main__":
     orchestrator = DebateOrchestrator()
@@ -0,0 +1,210 @@
+import asyncio
+import contextvars
+import queue
+import threading
+
+from cancellation import PHASE_TOKEN, CancelToken
+from debate_records import PHASE_RECORDS, Summary
+
+_STEP_DONE = object()
+
+_ARGUMENT_PHASES = ("argue", "refine")
+
+
+class DebatePipeline:
+    """Runs each agent's debate steps as soon as their inputs exist.
+
+    The debate is a dependency graph of (step, side) nodes, one per agent per
+    non-verdict step of the phase plan. A node waits only for its own agent's
+    previous step, and a refine step also waits for the opponent's previous
+    argument. Pro can therefore start refining while Con is still reflecting.
+
+    Each node's deltas are buffered in its own channel. The orchestrator still
+    walks the plan in order and reads the channels through phase_streams(), so
+    the display order is the same as an unpipelined debate; only the waiting
+    shrinks. `live` holds every finished node's text as a record, so later
+    nodes build their prompts from it. Subclasses supply the execution: threads or
+    asyncio tasks.
+    """
+
+    def __init__(self, orchestrator, topic, plan):
+        self.orchestrator = orchestrator
+        self.topic = topic
+        self.steps = [step for step in plan if step[0] != "verdict"]
+        self._index = {step: i for i, step in enumerate(self.steps)}
+        self.live = []
+        self._started = set()
+        self._finished = set()
+        self._cancelled = False
+        self._lock = threading.Lock()
+        self.channels = {(i, side): self._channel() for i in range(len(self.steps)) for side in ('pro', 'con')}
+
+    def dependencies(self, index, side):
+        """Nodes that must finish before (index, side) can start"""
+        deps = [(index - 1, side)] if index else []
+        if self.steps[index][0] == "refine":
+            previous = max(i for i in range(index) if self.steps[i][0] in _ARGUMENT_PHASES)
+            deps.append((previous, 'con' if side == 'pro' else 'pro'))
+        return deps
+
+    def _ready(self):
+        """Claim every node whose inputs are all finished (lock held)"""
+        if self._cancelled:
+            return []
+        ready = [node for node in self.channels
+                 if node not in self._started and all(dep in self._finished for dep in self.dependencies(*node))]
+        self._started.update(ready)
+        return ready
+
+    def _inputs(self, index):
+        """The debate state a step may read: `live` up to its round (refine reads the round before)"""
+        phase, round_num = self.steps[index]
+        limit = round_num - 1 if phase == "refine" else round_num
+        return {'records': [record for record in self.live if record.round_num <= limit]}
+
+    def _node_stream(self, node):
+        index, side = node
+        phase, round_num = self.steps[index]
+        with self._lock:
+            inputs = self._inputs(index)
+        return self.orchestrator._step_stream(phase, round_num,
+                                              self.orchestrator._side_stream(phase, round_num, side, self.topic, inputs))
+
+    def _finish(self, node, text):
+        """Record a finished node in `live`; returns the nodes it unblocked"""
+        index, side = node
+        phase, round_num = self.steps[index]
+        with self._lock:
+            self.live.append(PHASE_RECORDS[phase](side, round_num, text))
+            if phase == "reflect" and self.orchestrator.fused_reflection:
+                agent = self.orchestrator.agent_pro if side == 'pro' else self.orchestrator.agent_con
+                self.live.append(Summary(side, round_num, agent.last_summary))
+            self._finished.add(node)
+            return self._ready()
+
+    def summaries(self, round_num):
+        """{side: summary} for a round, once both agents produced it"""
+        with self._lock:
+            return {record.side: record.text for record in self.live
+                    if record.kind == "summary" and record.round_num == round_num}
+
+    def cancel(self):
+        """Start no further nodes (e.g. the debate stopped early); subclasses also stop the running ones"""
+        with self._lock:
+            self._cancelled = True
+
+    def phase_streams(self, phase, round_num):
+        """(side, stream) pairs reading the buffered output of one step's nodes"""
+        index = self._index[(phase, round_num)]
+        return [(side, self._reader(self.channels[(index, side)])) for side in ('pro', 'con')]
+
+
+class ThreadedDebatePipeline(DebatePipeline):
+    """DebatePipeline whose nodes run on a thread pool.
+
+    A thread cannot be cancelled, so the nodes' calls answer to a CancelToken
+    of the pipeline's own (PHASE_TOKEN), which cancel() and the debate's token
+    cancel to abort the requests in flight.
+    """
+
+    def __init__(self, orchestrator, topic, plan, executor):
+        super().__init__(orchestrator, topic, plan)
+        self.executor = executor
+        self.cancel_token = CancelToken()
+
+    @staticmethod
+    def _channel():
+        return queue.Queue()
+
+    def start(self):
+        with self._lock:
+            ready = self._ready()
+        self._launch(ready)
+
+    def _launch(self, nodes):
+        for node in nodes:
+            # In a context of its own, so PHASE_TOKEN does not outlive the node on the worker thread
+            self.executor.submit(contextvars.copy_context().run, self._run, node)
+
+    def _run(self, node):
+        channel = self.channels[node]
+        chunks = []
+        PHASE_TOKEN.set(self.cancel_token)
+        try:
+            with self.orchestrator.cancel_token.on_cancel(self.cancel_token.cancel):
+                for delta in self._node_stream(node)():
+                    chunks.append(delta)
+                    channel.put(delta)
+        except Exception as e:
+            channel.put(e)
+            return
+        self._launch(self._finish(node, "".join(chunks)))
+        channel.put(_STEP_DONE)
+
+    def cancel(self):
+        """Stop starting nodes and abort the calls of the ones still running"""
+        super().cancel()
+        self.cancel_token.cancel()
+
+    @staticmethod
+    def _reader(channel):
+        def read():
+            while True:
+                item = channel.get()
+                if item is _STEP_DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        return read
+
+
+class AsyncDebatePipeline(DebatePipeline):
+    """DebatePipeline whose nodes run as asyncio tasks"""
+
+    def __init__(self, orchestrator, topic, plan):
+        super().__init__(orchestrator, topic, plan)
+        self.tasks = []
+
+    @staticmethod
+    def _channel():
+        return asyncio.Queue()
+
+    def start(self):
+        with self._lock:
+            ready = self._ready()
+        self._launch(ready)
+
+    def _launch(self, nodes):
+        self.tasks.extend(asyncio.create_task(self._run(node)) for node in nodes)
+
+    async def _run(self, node):
+        channel = self.channels[node]
+        chunks = []
+        try:
+            async for delta in self._node_stream(node)():
+                chunks.append(delta)
+                await channel.put(delta)
+        except Exception as e:
+            await channel.put(e)
+            return
+        self._launch(self._finish(node, "".join(chunks)))
+        await channel.put(_STEP_DONE)
+
+    def cancel(self):
+        """Stop starting nodes and cancel the ones still running"""
+        super().cancel()
+        for task in self.tasks:
+            task.cancel()
+
+    @staticmethod
+    def _reader(channel):
+        async def read():
+            while True:
+                item = await channel.get()
+                if item is _STEP_DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        return read
@@ -0,0 +1,151 @@
+from dataclasses import asdict, dataclass
+from typing import ClassVar, Optional
+
+# Per-side usage and timing carried by every record (and checkpointed with each stored phase)
+USAGE_FIELDS = ("model", "input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens",
+                "cost_usd", "seconds", "first_token_seconds")
+
+
+@dataclass(frozen=True, slots=True)
+class DebateRecord:
+    """One text a debate produced, with the usage and timing of the calls behind it.
+
+    Records are immutable and slotted, and are the only place the debate state
+    keeps its texts: the per-side views (debate_engine.side_texts and friends)
+    are read from them, so a debate's texts exist once. `seconds` is the summed wall time of the side's calls in
+    the phase (0 when served from the cache or replayed from the store).
+    """
+
+    kind: ClassVar[str] = "record"
+
+    side: str
+    round_num: int
+    text: str
+    model: Optional[str] = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    cost_usd: float = 0.0
+    seconds: float = 0.0
+    first_token_seconds: Optional[float] = None
+    replayed: bool = False
+
+    @property
+    def usage(self):
+        """The USAGE_FIELDS of this record as a dict"""
+        return {name: getattr(self, name) for name in USAGE_FIELDS}
+
+
+@dataclass(frozen=True, slots=True)
+class Turn(DebateRecord):
+    """An argument: the opening one (round 1) or a refinement"""
+
+    kind: ClassVar[str] = "turn"
+
+
+@dataclass(frozen=True, slots=True)
+class Reflection(DebateRecord):
+    """A self-critique, with the single score its self-ratings give (see rating_score)"""
+
+    kind: ClassVar[str] = "reflection"
+
+    score: Optional[float] = None
+
+
+@dataclass(frozen=True, slots=True)
+class Summary(DebateRecord):
+    """The improvement notes condensed from a reflection"""
+
+    kind: ClassVar[str] = "summary"
+
+
+@dataclass(frozen=True, slots=True)
+class Verdict(DebateRecord):
+    """The judge's analysis of the finished debate (side "judge")"""
+
+    kind: ClassVar[str] = "verdict"
+
+
+RECORD_TYPES = {record_type.kind: record_type for record_type in (Turn, Reflection, Summary, Verdict)}
+
+# Record type of each phase's output
+PHASE_RECORDS = {"argue": Turn, "refine": Turn, "reflect": Reflection, "summarize": Summary, "verdict": Verdict}
+
+
+def side_usage(trace, label, sides, models=None):
+    """{side: usage} of the calls a DebateTrace recorded during phase `label`.
+
+    Calls are matched to a side by the agent position that made them; the
+    verdict has a single side, which takes every call of its phase. `models`
+    ({side: model}) names the model of a side that made no calls.
+    """
+    calls = [call for call in (trace.calls if trace is not None else ()) if call['phase'] == label]
+    usage = {}
+    for side in sides:
+        side_calls = calls if len(sides) == 1 else [call for call in calls if call['side'] == side]
+        usage[side] = {
+            'model': side_calls[-1]['model'] if side_calls else (models or {}).get(side),
+            **{kind: sum(call.get(kind) or 0 for call in side_calls)
+               for kind in ("input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens")},
+            'cost_usd': sum(call['cost_usd'] or 0 for call in side_calls),
+            'seconds': sum(call['seconds'] for call in side_calls if not call['cached']),
+            'first_token_seconds': next((call['first_token_seconds'] for call in side_calls
+                                         if call['first_token_seconds'] is not None), None),
+        }
+    return usage
+
+
+def record_to_dict(record):
+    """A JSON-ready dict of a record, tagged with its kind"""
+    return {'kind': record.kind, **asdict(record)}
+
+
+def record_from_dict(data):
+    """Inverse of record_to_dict"""
+    data = dict(data)
+    return RECORD_TYPES[data.pop('kind')](**data)
+
+
+# Columns of the analytics export: one row per record, fixed-width so it saves without pickling
+COLUMNS = (
+    ('debate_id', 'U32'), ('topic', 'U128'), ('kind', 'U10'), ('side', 'U5'), ('round_num', 'i2'), ('model', 'U48'),
+    ('chars', 'i4'), ('words', 'i4'), ('input_tokens', 'i4'), ('output_tokens', 'i4'), ('cache_read_tokens', 'i4'),
+    ('cache_write_tokens', 'i4'), ('cost_usd', 'f8'), ('seconds', 'f4'), ('first_token_seconds', 'f4'),
+    ('score', 'f4'), ('replayed', '?'),
+)
+
+
+def to_columns(debates):
+    """A numpy structured array with one row per record of many debates.
+
+    `debates` yields (debate_id, topic, records). Missing timings and scores
+    are NaN; texts are reduced to their length, so a column scan (e.g. mean
+    cost per model) touches only numbers.
+    """
+    # numpy loads only when an export is made
+    import numpy as np
+
+    rows = []
+    for debate_id, topic, records in debates:
+        for record in records:
+            rows.append((
+                debate_id or "", (topic or "")[:128], record.kind, record.side, record.round_num or 0,
+                record.model or "", len(record.text or ""), len((record.text or "").split()),
+                record.input_tokens, record.output_tokens, record.cache_read_tokens, record.cache_write_tokens,
+                record.cost_usd, record.seconds,
+                float("nan") if record.first_token_seconds is None else record.first_token_seconds,
+                float("nan") if getattr(record, "score", None) is None else record.score,
+                record.replayed,
+            ))
+    return np.array(rows, dtype=np.dtype(list(COLUMNS)))
+
+
+def save_columns(path, debates):
+    """Write to_columns(debates) to `path` as .npy (load with numpy.load) and return the row count"""
+    import numpy as np
+
+    columns = to_columns(debates)
+    np.save(path, columns)
+    return len(columns)
+
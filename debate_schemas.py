@@ -0,0 +1,8 @@
+from pydantic import BaseModel, Field
+
+
+class ReflectionOutput(BaseModel):
+    """A self-critique and its condensed improvement summary, from one call"""
+
+    critique: str = Field(min_length=1)
+    summary: str = Field(min_length=1)
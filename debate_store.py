@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+
+def topic_key(topic):
+    """Normalised topic used for lookups: case, spacing and trailing punctuation don't matter"""
+    return re.sub(r"\s+", " ", (topic or "").strip().lower()).rstrip(" ?!.")
+
+
+def config_key(config):
+    """Content address of a debate configuration (models, rounds, phases, modes)"""
+    payload = json.dumps(config, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DebateStore:
+    """SQLite record of debates, checkpointed one completed phase at a time.
+
+    Each debate row holds its topic and configuration; each phase row holds a
+    step of the phase plan with the texts it produced (plus the summaries of a
+    fused reflection) and its token usage. An orchestrator resumes a debate by
+    replaying its stored phases and running only the rest, and a finished
+    debate can be replayed whole without calling a provider.
+
+    A debate is 'running' while a session works on it, 'interrupted' once that
+    session fails or is cancelled, and 'complete' when done. Only interrupted
+    debates, and running ones whose session has written nothing for
+    `lease_seconds` (it died without saying so), are picked up for resumption
+    by topic; claim() hands each to one session only.
+
+    Finished debates can also be found by near-duplicate topics: a TopicIndex
+    per configuration, built on first use, serves the closest finished debate
+    that poses the same decision and whose topic similarity reaches
+    `topic_threshold`. A match is replayed whole, so this is off (None) unless
+    a threshold is given.
+    """
+
+    def __init__(self, db_path, topic_threshold=None, lease_seconds=300.0):
+        self.db_path = db_path
+        self.topic_threshold = topic_threshold
+        self.lease_seconds = lease_seconds
+        self._indexes = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS debates ("
+            "debate_id TEXT PRIMARY KEY, topic TEXT NOT NULL, topic_key TEXT NOT NULL, config TEXT NOT NULL, "
+            "config_key TEXT NOT NULL, status TEXT NOT NULL, stopped_early TEXT, created REAL NOT NULL, updated REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS debates_lookup ON debates (topic_key, config_key, updated)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS phases ("
+            "debate_id TEXT NOT NULL, step INTEGER NOT NULL, phase TEXT NOT NULL, round_num INTEGER NOT NULL, "
+            "texts TEXT NOT NULL, summaries TEXT, usage TEXT, created REAL NOT NULL, PRIMARY KEY (debate_id, step))")
+        self._db.commit()
+
+    def start(self, debate_id, topic, config):
+        """Register a debate (a no-op if it already exists)"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO debates (debate_id, topic, topic_key, config, config_key, status, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, 'running', ?, ?)",
+                (debate_id, topic, topic_key(topic), json.dumps(config, sort_keys=True), config_key(config), now, now))
+            self._db.commit()
+
+    def save_phase(self, debate_id, step, phase, round_num, texts, summaries=None, usage=None):
+        """Checkpoint one completed step of the phase plan"""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO phases (debate_id, step, phase, round_num, texts, summaries, usage, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (debate_id, step, phase, round_num, json.dumps(texts, ensure_ascii=False),
+                 json.dumps(summaries, ensure_ascii=False) if summaries else None, json.dumps(usage) if usage else None, now))
+            self._db.execute("UPDATE debates SET updated = ? WHERE debate_id = ?", (now, debate_id))
+            self._db.commit()
+
+    def finish(self, debate_id, stopped_early=None):
+        """Mark a debate complete"""
+        with self._lock:
+            row = self._db.execute("SELECT topic, config_key, status FROM debates WHERE debate_id = ?", (debate_id,)).fetchone()
+            self._db.execute("UPDATE debates SET status = 'complete', stopped_early = ?, updated = ? WHERE debate_id = ?",
+                             (stopped_early, time.time(), debate_id))
+            self._db.commit()
+            if row is not None and row[2] != 'complete' and row[1] in self._indexes:
+                self._indexes[row[1]].add(debate_id, row[0])
+
+    def interrupt(self, debate_id):
+        """Mark a running debate as interrupted, so the next session on its topic resumes it"""
+        with self._lock:
+            self._db.execute("UPDATE debates SET status = 'interrupted', updated = ? WHERE debate_id = ? AND status = 'running'",
+                             (time.time(), debate_id))
+            self._db.commit()
+
+    def claim(self, debate_id):
+        """Take a found debate for this session: False if another session is still running it.
+
+        A finished debate is only read, so it can always be claimed; an
+        interrupted or abandoned one is marked running again.
+        """
+        now = time.time()
+        with self._lock:
+            taken = self._db.execute(
+                "UPDATE debates SET status = 'running', updated = ? WHERE debate_id = ? "
+                "AND (status = 'interrupted' OR (status = 'running' AND updated < ?))",
+                (now, debate_id, now - self.lease_seconds)).rowcount
+            self._db.commit()
+            if taken:
+                return True
+            row = self._db.execute("SELECT status FROM debates WHERE debate_id = ?", (debate_id,)).fetchone()
+        return row is not None and row[0] == 'complete'
+
+    def load(self, debate_id):
+        """A stored debate with its completed steps ({step: phase record}), or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT topic, config, status, stopped_early, created, updated FROM debates WHERE debate_id = ?",
+                (debate_id,)).fetchone()
+            if row is None:
+                return None
+            phases = self._db.execute(
+                "SELECT step, phase, round_num, texts, summaries, usage FROM phases WHERE debate_id = ? ORDER BY step",
+                (debate_id,)).fetchall()
+        topic, config, status, stopped_early, created, updated = row
+        return {
+            'debate_id': debate_id,
+            'topic': topic,
+            'config': json.loads(config),
+            'status': status,
+            'stopped_early': stopped_early,
+            'created': created,
+            'updated': updated,
+            'steps': {step: {'phase': phase, 'round_num': round_num, 'texts': json.loads(texts),
+                             'summaries': json.loads(summaries) if summaries else None,
+                             'usage': json.loads(usage) if usage else None}
+                      for step, phase, round_num, texts, summaries, usage in phases},
+        }
+
+    def find(self, topic, config):
+        """Id of the latest finished or interrupted debate on `topic` with this configuration.
+
+        Debates another session is running are skipped (see claim). Falls back
+        to the most similar finished debate (see find_similar), else None.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT debate_id FROM debates WHERE topic_key = ? AND config_key = ? "
+                "AND (status != 'running' OR updated < ?) ORDER BY updated DESC LIMIT 1",
+                (topic_key(topic), config_key(config), time.time() - self.lease_seconds)).fetchone()
+        if row:
+            return row[0]
+        matches = self.find_similar(topic, config, k=1)
+        return matches[0]['debate_id'] if matches else None
+
+    def find_similar(self, topic, config, k=5):
+        """Finished debates with this configuration whose topic is within `topic_threshold`, most similar first"""
+        if self.topic_threshold is None:
+            return []
+        matches = self._index(config_key(config)).search(topic, k, self.topic_threshold)
+        return [{'debate_id': debate_id, 'topic': matched, 'similarity': similarity}
+                for debate_id, matched, similarity in matches]
+
+    def _index(self, key):
+        """The TopicIndex of one configuration's finished debates, loaded on first use"""
+        # Imported here so numpy only loads once a similar-topic lookup needs it
+        from topic_index import TopicIndex
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = TopicIndex()
+                for debate_id, topic in self._db.execute(
+                        "SELECT debate_id, topic FROM debates WHERE config_key = ? AND status = 'complete' ORDER BY updated",
+                        (key,)):
+                    index.add(debate_id, topic)
+            return index
+
+    def list_debates(self, topic=None, limit=20):
+        """Most recently updated debates, optionally only those on `topic`"""
+        query = "SELECT debate_id, topic, status, stopped_early, updated FROM debates"
+        params = ()
+        if topic is not None:
+            query += " WHERE topic_key = ?"
+            params = (topic_key(topic),)
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY updated DESC LIMIT ?", params + (limit,)).fetchall()
+        return [{'debate_id': debate_id, 'topic': topic, 'status': status, 'stopped_early': stopped_early, 'updated': updated}
+                for debate_id, topic, status, stopped_early, updated in rows]
+
+    def debate_ids(self, status="complete"):
+        """Ids of every debate with `status`, oldest first (e.g. for an export)"""
+        with self._lock:
+            rows = self._db.execute("SELECT debate_id FROM debates WHERE status = ? ORDER BY created", (status,)).fetchall()
+        return [debate_id for debate_id, in rows]
+
+    def delete(self, debate_id):
+        with self._lock:
+            self._db.execute("DELETE FROM phases WHERE debate_id = ?", (debate_id,))
+            self._db.execute("DELETE FROM debates WHERE debate_id = ?", (debate_id,))
+            self._db.commit()
+            # Topic indexes can't drop rows; rebuild them on next use
+            self._indexes.clear()
+
+
+# Used by every orchestrator unless one is passed in explicitly.
+# Set DEBATE_STORE_DB to a file path to checkpoint debates and replay past ones.
+# DEBATE_TOPIC_THRESHOLD (e.g. 0.9) lets a reworded topic replay another one's debate; unset or "off" for exact matches only.
+_threshold = os.getenv("DEBATE_TOPIC_THRESHOLD", "off")
+DEBATE_STORE = (DebateStore(os.getenv("DEBATE_STORE_DB"), None if _threshold == "off" else float(_threshold))
+                if os.getenv("DEBATE_STORE_DB") else None)
@@ -0,0 +1,313 @@
+import os
+import time
+from collections import namedtuple
+
+# Default seconds between UI updates; text arriving in between is merged into one update
+UI_FLUSH_INTERVAL = float(os.getenv("DEBATE_UI_FLUSH_INTERVAL") or 0.05)
+
+# Events after which the UI waits on a model (a phase opens, or a side's stream ended), so buffered text is shown at once
+FLUSH_EVENTS = ("phase_start", "stream_done")
+
+# Text to append to each split-screen pane
+PaneAppend = namedtuple("PaneAppend", ["pro", "con", "verdict"])
+
+
+def merge_updates(updates):
+    """Concatenate consecutive appends (PaneAppends or transcript strings) into one"""
+    if isinstance(updates[0], str):
+        return "".join(updates)
+    return PaneAppend(*("".join(texts) for texts in zip(*updates)))
+
+
+class Panes:
+    """Whole pane texts rebuilt from PaneAppends, for consumers that want full strings"""
+
+    def __init__(self):
+        self.texts = ["", "", ""]
+
+    def apply(self, update):
+        """Add one PaneAppend; returns the (pro, con, verdict) texts"""
+        for i, text in enumerate(update):
+            if text:
+                self.texts[i] += text
+        return tuple(self.texts)
+
+
+class UpdateBuffer:
+    """Coalesces UI appends into at most one update per `flush_interval` seconds.
+
+    add() buffers appends and hands back the merged update once the interval
+    has passed since the last flush; `urgent` appends (see FLUSH_EVENTS) flush
+    at once. A consumer that can wait with a timeout should flush() when
+    due_in() runs out, so buffered text is not held until the next append.
+    flush() empties the buffer and must be called when the stream ends. An
+    interval of 0 passes every append through.
+    """
+
+    def __init__(self, flush_interval=UI_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self.pending = []
+        self.last_flush = float("-inf")
+
+    def add(self, updates, urgent=False):
+        """Buffer `updates`; returns the updates to yield now (none or one)"""
+        self.pending.extend(updates)
+        if urgent or time.monotonic() - self.last_flush >= self.flush_interval:
+            return self.flush()
+        return []
+
+    def due_in(self):
+        """Seconds until the buffered appends are due, or None if nothing is buffered"""
+        if not self.pending:
+            return None
+        return max(0.0, self.last_flush + self.flush_interval - time.monotonic())
+
+    def flush(self):
+        if not self.pending:
+            return []
+        update = merge_updates(self.pending)
+        self.pending = []
+        self.last_flush = time.monotonic()
+        return [update]
+
+
+def round_title(round_num, total_rounds, split_screen=False):
+    """Banner title and opening note for an argument round"""
+    if round_num == 1:
+        return ("ROUND 1: OPENING ARGUMENT" if split_screen else "ROUND 1: INITIAL ARGUMENTS"), ""
+    if round_num == total_rounds:
+        return (f"ROUND {round_num}: FINAL ARGUMENT" if split_screen else f"ROUND {round_num}: FINAL POLISHED ARGUMENTS"), "Most refined position..."
+    return (f"ROUND {round_num}: IMPROVED ARGUMENT" if split_screen else f"ROUND {round_num}: IMPROVED ARGUMENTS"), f"Fixing flaws from Round {round_num - 1}..."
+
+
+def agent_model(agent):
+    """How a pane header names an agent's model, with the fallbacks that may answer for it"""
+    text = f"{agent.clientType.upper()} Model {agent.model}"
+    if agent.router is not None:
+        text += " (fallback: " + ", ".join(f"{option.provider}:{option.model}" for option in agent.router.options[1:]) + ")"
+    return text
+
+
+class SplitScreenView:
+    """Builds the (pro, con, verdict) panes of the Gradio split screen.
+
+    Every pane only ever grows, so feed() returns PaneAppends: the text to add
+    to the end of each pane. A pane is a list of entries joined by newlines;
+    opening an entry appends a newline first, and streamed text extends the
+    last entry.
+    """
+
+    def __init__(self, orchestrator, topic, total_rounds):
+        self.orchestrator = orchestrator
+        self.topic = topic
+        self.total_rounds = total_rounds
+        # Whether each pane has an entry yet (the first one needs no newline before it)
+        self._opened = [False, False, False]
+
+    def _entry(self, pane, text):
+        prefix = "\n" if self._opened[pane] else ""
+        self._opened[pane] = True
+        return prefix + text
+
+    def _add(self, pro_text, con_text=None):
+        """Open a new entry in the pro and con panes"""
+        con_text = pro_text if con_text is None else con_text
+        return PaneAppend(self._entry(0, pro_text), self._entry(1, con_text), "")
+
+    def _add_verdict(self, *texts):
+        """Open one verdict-pane entry per text"""
+        return PaneAppend("", "", "".join(self._entry(2, text) for text in texts))
+
+    def _banner(self, title, note=""):
+        parts = [self._add("\n" + "="*50), self._add(title), self._add("="*50)]
+        if note:
+            parts.append(self._add(note + "\n"))
+        return [merge_updates(parts)]
+
+    def start(self):
+        """Topic header shown before the first call"""
+        agent_pro, agent_con = self.orchestrator.agent_pro, self.orchestrator.agent_con
+        header = "AI DEBATE ARENA\n"
+        header += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+        header += f"**Topic:** {self.topic}\n"
+        header += "**Pattern:** Reflection (from Andrew Ng's Agentic AI Course)\n"
+        header += "━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━\n"
+        pro_config = f"Agent Pro: {agent_model(agent_pro)}\n"
+        con_config = f"Agent Con: {agent_model(agent_con)}\n"
+        return [self._add(header + pro_config + "Preparing to debate...", header + con_config + "Preparing to debate...")]
+
+    def feed(self, event):
+        """Apply one event; returns the PaneAppends to show"""
+        if event.kind == "phase_start":
+            return self._phase_start(event)
+        if event.kind == "delta":
+            if event.side == "verdict":
+                return [PaneAppend("", "", event.text)]
+            if event.phase == "summarize":
+                return []
+            return [PaneAppend(event.text, "", "") if event.side == "pro" else PaneAppend("", event.text, "")]
+        if event.kind == "phase_done":
+            if event.phase == "verdict":
+                return [self._add_verdict("\n\n" + "="*50, "\nDebate Complete!",
+                                          "\n" + self.orchestrator.format_phase_timings())]
+            if event.phase != "summarize":
+                return [PaneAppend("\n", "\n", "")]
+        if event.kind == "early_stop":
+            return [self._add(f"\nStopping after Round {event.round_num}: {event.text}\n")]
+        return []
+
+    def _phase_start(self, event):
+        if event.phase in ("argue", "refine"):
+            title, note = round_title(event.round_num, self.total_rounds, split_screen=True)
+            updates = self._banner(title, note)
+        elif event.phase == "reflect":
+            if event.round_num == 1:
+                updates = self._banner("REFLECTION: AI Critiques Itself", "Analyzing my own biases and flaws...")
+            else:
+                updates = self._banner(f"REFLECTION {event.round_num}: Did I Improve?")
+        elif event.phase == "summarize":
+            return [self._add("\nLearning from mistakes...\n")] if event.round_num == 1 else []
+        else:
+            judge = self.orchestrator.judge
+            verdict = self._add_verdict("FINAL VERDICT", "="*50 + "\n",
+                                        f"Judge: {judge.clientType.upper()} Model {judge.model} (neutral task)\n",
+                                        "Judge is analyzing all arguments...\n", "")
+            return [merge_updates([verdict, self._add("\nAll rounds complete!")])]
+        # Open an entry on each side for the phase's streamed text
+        return [merge_updates(updates + [self._add("")])]
+
+
+# Phases whose text the transcript shows as it streams (reflections are cut short, summaries not shown)
+_STREAMED_PHASES = ("argue", "refine", "verdict")
+
+
+class TranscriptView:
+    """Builds the single-column console transcript, one line at a time.
+
+    feed() turns an event into whole lines. render() also shows argument and
+    verdict text as it streams, one side at a time. With concurrent sides Pro
+    is shown as it streams and Con's text is held back until Pro's stream is
+    done; otherwise each side is shown in turn.
+    """
+
+    def __init__(self, orchestrator, topic, total_rounds):
+        self.orchestrator = orchestrator
+        self.topic = topic
+        self.total_rounds = total_rounds
+        self._opened = False
+        # The side whose text is being shown, the sides already shown, and text held back per side
+        self._live = None
+        self._shown = []
+        self._held = {}
+
+    def append(self, lines):
+        """The text `lines` add to the end of the transcript"""
+        if not lines:
+            return ""
+        prefix = "\n" if self._opened else ""
+        self._opened = True
+        return prefix + "\n".join(lines)
+
+    def start(self):
+        """Debate header lines"""
+        return ["=" * 70, f"MULTI-ROUND DEBATE: {self.topic}", "=" * 70, ""]
+
+    def _banner(self, title):
+        return ["=" * 70, title, "=" * 70, ""]
+
+    def feed(self, event):
+        """Apply one event; returns the new transcript lines"""
+        if event.kind == "phase_start":
+            if event.phase in ("argue", "refine"):
+                return self._banner(round_title(event.round_num, self.total_rounds)[0])
+            if event.phase == "reflect":
+                title = "Self-Critique" if event.round_num == 1 else "Did We Improve?"
+                return self._banner(f"REFLECTION PHASE {event.round_num}: {title}")
+            if event.phase == "summarize":
+                next_round = event.round_num + 1
+                target = "final round" if next_round == self.total_rounds else f"Round {next_round}"
+                return [f"Extracting key insights for {target}...", ""]
+            return self._banner("FINAL VERDICT") + ["Generating final analysis..."]
+
+        if event.kind == "early_stop":
+            return [f"Stopping after Round {event.round_num}: {event.text}", ""]
+        if event.kind != "phase_done":
+            return []
+        if event.phase in ("argue", "refine"):
+            label = self._label(event.phase, event.round_num)
+            return [f"AGENT PRO{label}:", "-" * 70, event.texts['pro'], "",
+                    f"AGENT CON{label}:", "-" * 70, event.texts['con'], ""]
+        if event.phase == "reflect":
+            if event.round_num == 1:
+                heading, limit, more = "Reflects", 500, "[Reflection continues...]"
+            else:
+                heading, limit, more = f"Reflects on Round {event.round_num}", 400, "[Checking for remaining flaws...]"
+            return [f"AGENT PRO {heading}:", "-" * 70, event.texts['pro'][:limit] + "...", more, "",
+                    f"AGENT CON {heading}:", "-" * 70, event.texts['con'][:limit] + "...", more, ""]
+        if event.phase == "verdict":
+            return [event.texts['verdict']] + self._verdict_footer()
+        return []
+
+    def _label(self, phase, round_num):
+        if phase == "argue":
+            return ""
+        return " (Final)" if round_num == self.total_rounds else " (Improved)"
+
+    def _verdict_footer(self):
+        return ["", "=" * 70, "DEBATE COMPLETE!", "=" * 70, self.orchestrator.format_phase_timings()]
+
+    def render(self, event):
+        """Apply one event; returns the text it adds to the end of the transcript, streamed text included"""
+        if event.phase not in _STREAMED_PHASES or event.kind not in ("delta", "stream_done", "phase_done"):
+            return self.append(self.feed(event))
+        if event.kind == "delta":
+            return self._delta(event)
+        if event.kind == "stream_done":
+            if event.side != self._live:
+                return ""
+            # Show the side held back meanwhile, which streams on from here
+            text = self._end_side()
+            for side in ('pro', 'con'):
+                if side in self._held and side not in self._shown:
+                    text += self._open_side(event.phase, event.round_num, side)
+                    break
+            return text
+        if not self._shown:
+            return self.append(self.feed(event))
+        # The phase is done: end the side being shown, then show the ones held back
+        text = self._end_side()
+        if event.phase == "verdict":
+            text += self.append(self._verdict_footer())
+        else:
+            for side in ('pro', 'con'):
+                if side not in self._shown:
+                    text += self._open_side(event.phase, event.round_num, side) + self._end_side()
+        self._shown = []
+        return text
+
+    def _delta(self, event):
+        if self.orchestrator.concurrent and (self._live not in (None, event.side)
+                                             or (event.side == 'con' and 'pro' not in self._shown)):
+            self._held[event.side] = self._held.get(event.side, "") + event.text
+            return ""
+        # Sides stream one after the other, so the one shown so far is done
+        text = self._end_side() if self._live not in (None, event.side) else ""
+        if self._live is None:
+            text += self._open_side(event.phase, event.round_num, event.side)
+        return text + event.text
+
+    def _open_side(self, phase, round_num, side):
+        """Start showing `side`'s text, with whatever of it was held back"""
+        self._live = side
+        self._shown.append(side)
+        if side == "verdict":
+            header = "\n" if self._opened else ""
+        else:
+            header = self.append([f"AGENT {side.upper()}{self._label(phase, round_num)}:", "-" * 70, ""])
+        return header + self._held.pop(side, "")
+
+    def _end_side(self):
+        if self._live is None:
+            return ""
+        side, self._live = self._live, None
+        return "" if side == "verdict" else "\n"
@@ -0,0 +1,222 @@
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+
+# Behaviour of every fake client; change with configure()
+FAKE_SETTINGS = {
+    'latency': 0.3,             # seconds before the first token (jittered ±50%)
+    'tokens_per_second': 150,   # streaming rate after the first token; 0 = no delay
+    'output_tokens': 200,       # words per reply (capped by max_tokens)
+    'rate_limit_rate': 0.0,     # chance a request fails with 429
+    'overload_rate': 0.0,       # chance a request fails with 529
+    'retry_after': 0.1,         # retry-after header sent with simulated errors
+    'tail_rate': 0.0,           # chance a request is a slow outlier
+    'tail_latency': 5.0,        # seconds before the first token of an outlier
+    'seed': 0,
+}
+
+_WORDS = ("the", "decision", "evidence", "clearly", "shows", "that", "cost", "benefit", "risk", "because",
+          "however", "long-term", "value", "outweighs", "short-term", "convenience", "data", "suggests",
+          "flexibility", "matters", "more", "than", "price", "experience", "quality", "therefore")
+
+# Requests whose attempt count is remembered, most recent first; an older request that comes back counts from 1 again
+MAX_TRACKED_REQUESTS = 10_000
+
+
+def configure(**settings):
+    """Update FAKE_SETTINGS (e.g. configure(latency=0.05, rate_limit_rate=0.1)); returns the previous values"""
+    unknown = set(settings) - set(FAKE_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown fake provider settings: {', '.join(sorted(unknown))}")
+    previous = dict(FAKE_SETTINGS)
+    FAKE_SETTINGS.update(settings)
+    return previous
+
+
+class FakeAPIError(Exception):
+    """Shaped like the SDK status errors so the scheduler treats it the same way"""
+
+    def __init__(self, message, status_code, retry_after):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers={"retry-after": str(retry_after)})
+
+
+class RateLimitError(FakeAPIError):
+    pass
+
+
+class OverloadedError(FakeAPIError):
+    pass
+
+
+class _Reply:
+    """One deterministic reply: the same request and attempt number always produce the same outcome"""
+
+    _attempts = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, params):
+        settings = dict(FAKE_SETTINGS)
+        system = params.get('system') or ""
+        if not isinstance(system, str):
+            system = "".join(block.get('text', "") for block in system)
+        prompt = system + "".join(str(message['content']) for message in params['messages'])
+        digest = hashlib.sha256(f"{params['model']}|{prompt}".encode("utf-8")).hexdigest()
+        with self._lock:
+            attempt = self._attempts[digest] = self._attempts.pop(digest, 0) + 1
+            if len(self._attempts) > MAX_TRACKED_REQUESTS:
+                self._attempts.popitem(last=False)
+        rng = random.Random(f"{settings['seed']}:{digest}:{attempt}")
+
+        self.settings = settings
+        self.latency = settings['latency'] * rng.uniform(0.5, 1.5)
+        if rng.random() < settings['tail_rate']:
+            self.latency = settings['tail_latency']
+        self.error = None
+        roll = rng.random()
+        if roll < settings['rate_limit_rate']:
+            self.error = RateLimitError("Simulated rate limit", 429, settings['retry_after'])
+        elif roll < settings['rate_limit_rate'] + settings['overload_rate']:
+            self.error = OverloadedError("Simulated overload", 529, settings['retry_after'])
+        count = min(settings['output_tokens'], params.get('max_tokens') or settings['output_tokens'])
+        self.tokens = [rng.choice(_WORDS) + " " for _ in range(count)]
+        self.tools = params.get('tools')
+        self.usage = SimpleNamespace(input_tokens=len(prompt) // 4 + 1, output_tokens=count,
+                                     cache_read_input_tokens=0, cache_creation_input_tokens=0)
+
+    @property
+    def token_delay(self):
+        rate = self.settings['tokens_per_second']
+        return 1 / rate if rate else 0
+
+    def message(self):
+        text = "".join(self.tokens)
+        if self.tools:
+            # Forced tool use: fill every string field of the first tool's schema
+            tool = self.tools[0]
+            fields = tool['input_schema'].get('properties', {})
+            block = SimpleNamespace(type="tool_use", name=tool['name'], input={name: text for name in fields})
+        else:
+            block = SimpleNamespace(type="text", text=text)
+        return SimpleNamespace(content=[block], usage=self.usage)
+
+
+class _FakeStream:
+    """A reply streamed token by token; close() ends it early, like closing the HTTP response"""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self._closed = threading.Event()
+
+    def __enter__(self):
+        if self.reply.error:
+            time.sleep(self.reply.latency)
+            raise self.reply.error
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def close(self):
+        self._closed.set()
+
+    @property
+    def text_stream(self):
+        if self._closed.wait(self.reply.latency):
+            return
+        for i, token in enumerate(self.reply.tokens):
+            if i and self.reply.token_delay:
+                time.sleep(self.reply.token_delay)
+            if self._closed.is_set():
+                return
+            yield token
+
+    def get_final_message(self):
+        return self.reply.message()
+
+
+class _AsyncFakeStream(_FakeStream):
+    async def __aenter__(self):
+        self._aclosed = asyncio.Event()
+        if self.reply.error:
+            await asyncio.sleep(self.reply.latency)
+            raise self.reply.error
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+        return False
+
+    async def close(self):
+        self._closed.set()
+        self._aclosed.set()
+
+    @property
+    async def text_stream(self):
+        try:
+            await asyncio.wait_for(self._aclosed.wait(), self.reply.latency)
+            return
+        except asyncio.TimeoutError:
+            pass
+        for i, token in enumerate(self.reply.tokens):
+            if i and self.reply.token_delay:
+                await asyncio.sleep(self.reply.token_delay)
+            if self._closed.is_set():
+                return
+            yield token
+
+    async def get_final_message(self):
+        return self.reply.message()
+
+
+class _Messages:
+    def create(self, **params):
+        reply = _Reply(params)
+        time.sleep(reply.latency + reply.token_delay * len(reply.tokens))
+        if reply.error:
+            raise reply.error
+        return reply.message()
+
+    def stream(self, **params):
+        return _FakeStream(_Reply(params))
+
+
+class _AsyncMessages:
+    async def create(self, **params):
+        reply = _Reply(params)
+        await asyncio.sleep(reply.latency + reply.token_delay * len(reply.tokens))
+        if reply.error:
+            raise reply.error
+        return reply.message()
+
+    def stream(self, **params):
+        return _AsyncFakeStream(_Reply(params))
+
+
+class FakeClient:
+    """Offline stand-in for the Anthropic client (messages.create / messages.stream).
+
+    Selected with clientType="fake". Replies are filler text generated
+    deterministically from the request, delivered with the latency, streaming
+    rate and error mix in FAKE_SETTINGS, so benchmarks measure the engine
+    rather than the network.
+    """
+
+    def __init__(self, api_key=None, base_url=None, max_retries=0):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.messages = _Messages()
+
+
+class AsyncFakeClient(FakeClient):
+    """asyncio counterpart of FakeClient"""
+
+    def __init__(self, api_key=None, base_url=None, max_retries=0):
+        super().__init__(api_key, base_url, max_retries)
+        self.messages = _AsyncMessages()
@@ -0,0 +1,499 @@
+import asyncio
+import contextvars
+import copy
+import math
+import queue
+import threading
+import time
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+
+from cancellation import PHASE_TOKEN, CancelToken, DebateCancelled
+from client_pool import normalize_provider
+from telemetry import METRICS
+
+RouteOption = namedtuple("RouteOption", ["provider", "model", "api_key", "base_url"], defaults=(None, None))
+RouteOption.__doc__ = """One (provider, model) an agent may be served by; a missing api_key falls back to the agent's for the same provider"""
+
+# Hedged calls and streams run here, so the caller can wait on whichever answers first
+_HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=64, thread_name_prefix="debate-hedge")
+
+_STREAM_DONE = object()
+
+# Raised through as-is rather than falling back: the provider answered unusably (ValueError), or the debate was stopped
+_FINAL_ERRORS = (ValueError, DebateCancelled)
+
+# Weight of the newest sample in an option's latency average
+EWMA_WEIGHT = 0.2
+
+
+class _OptionHealth:
+    """Rolling record of one option: latency samples per call kind and recent outcomes"""
+
+    def __init__(self, window):
+        # 'call' samples are whole-call seconds, 'stream' samples are time to first token
+        self.latencies = {'call': deque(maxlen=window), 'stream': deque(maxlen=window)}
+        # Exponentially weighted average of the same samples, None until the first
+        self.ewma = {'call': None, 'stream': None}
+        self.outcomes = deque(maxlen=window)
+        self.failures_in_row = 0
+        self.down_until = 0.0
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class ProviderRouter:
+    """Routes an agent's calls across an ordered list of (provider, model) options.
+
+    Every call is timed and its outcome recorded per option. Calls go to the
+    healthy option with the lowest average latency for their kind (whole call,
+    or time to first token for streams). Options not measured yet rank after
+    the measured ones, in the configured order, so the agent's own model
+    answers until a fallback or hedge has shown another to be faster.
+    An option that fails `failures_to_trip` times in a row, or whose error
+    rate over the window reaches `error_rate`, is skipped for `cooldown`
+    seconds and then tried again.
+
+    With `hedge` on, a call still running past the option's `hedge_percentile`
+    latency (once `min_samples` are known) is duplicated on the next option,
+    and the first answer wins. Streams hedge on time to first token. A losing
+    asyncio task is cancelled; a losing thread's call answers to a CancelToken
+    of its own (PHASE_TOKEN), which is cancelled to abort its request.
+    A failed option falls back to the next one; streams only fall back before
+    their first delta.
+    """
+
+    def __init__(self, options, window=50, error_rate=0.5, failures_to_trip=3, cooldown=30.0,
+                 hedge=True, hedge_percentile=90, min_samples=5):
+        self.options = [option if isinstance(option, RouteOption) else RouteOption(*option) for option in options]
+        if not self.options:
+            raise ValueError("ProviderRouter needs at least one option")
+        self.error_rate = error_rate
+        self.failures_to_trip = failures_to_trip
+        self.cooldown = cooldown
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self._health = [_OptionHealth(window) for _ in self.options]
+        self._lock = threading.Lock()
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.fallbacks = 0
+
+    def _labels(self, index):
+        option = self.options[index]
+        return {'provider': option.provider.lower(), 'model': option.model}
+
+    def record(self, index, kind, seconds=None, error=None):
+        """Fold one finished attempt into the option's health"""
+        with self._lock:
+            health = self._health[index]
+            if error is None:
+                health.latencies[kind].append(seconds)
+                average = health.ewma[kind]
+                health.ewma[kind] = seconds if average is None else average + EWMA_WEIGHT * (seconds - average)
+                health.outcomes.append(True)
+                health.failures_in_row = 0
+                return
+            health.outcomes.append(False)
+            health.failures_in_row += 1
+            failures = health.outcomes.count(False)
+            if (health.failures_in_row >= self.failures_to_trip
+                    or (len(health.outcomes) >= 4 and failures / len(health.outcomes) >= self.error_rate)):
+                # Trip: rest the option, then give it a clean slate
+                health.down_until = time.monotonic() + self.cooldown
+                health.outcomes.clear()
+                health.failures_in_row = 0
+
+    def ranked(self, kind='call'):
+        """Option indices, best first: healthy before resting, then by average `kind` latency, unmeasured last"""
+        now = time.monotonic()
+        with self._lock:
+            def rank(index):
+                health = self._health[index]
+                average = health.ewma[kind]
+                return health.down_until > now, average is None, average or 0.0, index
+            return sorted(range(len(self.options)), key=rank)
+
+    def hedge_delay(self, index, kind='call'):
+        """Seconds after which a call on this option is hedged, or None while too few samples exist"""
+        with self._lock:
+            samples = self._health[index].latencies[kind]
+            if len(samples) < self.min_samples:
+                return None
+            return _percentile(samples, self.hedge_percentile)
+
+    def _routed(self, agent, index):
+        """A copy of `agent` that talks to option `index` (sharing its trace, cache and usage totals)"""
+        option = self.options[index]
+        routed = copy.copy(agent)
+        routed.router = None
+        routed.clientType = option.provider.lower()
+        routed.model = option.model
+        # Same provider as the agent: its key and base URL carry over unless the option sets its own
+        same_provider = normalize_provider(routed.clientType) == normalize_provider(agent.clientType)
+        if option.api_key is not None or not same_provider:
+            routed.api_key = option.api_key
+        if option.base_url is not None or not same_provider:
+            routed.base_url = option.base_url
+        return routed
+
+    def _backup(self, order, position):
+        """The option that hedges order[position]: the next one in the ranking"""
+        return order[position + 1] if self.hedge and position + 1 < len(order) else None
+
+    def _hedged(self, backup):
+        self.hedges += 1
+        METRICS.inc("debate_router_hedges_total", self._labels(backup))
+
+    def _fell_back(self, index):
+        self.fallbacks += 1
+        METRICS.inc("debate_router_fallbacks_total", self._labels(index))
+
+    def _won(self, index, primary):
+        if index != primary:
+            self.hedge_wins += 1
+
+    # Blocking calls
+
+    @staticmethod
+    def _attempt_token(agent, stack):
+        """A CancelToken for one threaded attempt, also cancelled by the caller's own while `stack` is open"""
+        token = CancelToken()
+        parent = agent._cancel_token()
+        if parent is not None:
+            stack.enter_context(parent.on_cancel(token.cancel))
+        return token
+
+    def _attempt(self, agent, fn, index, token):
+        PHASE_TOKEN.set(token)
+        return self._timed(agent, fn, index)
+
+    def _submit(self, agent, fn, index, stack):
+        """Start one attempt on a worker thread; returns its future and CancelToken"""
+        token = self._attempt_token(agent, stack)
+        # Worker threads run in the caller's context, so the calls keep their debate step (telemetry.CURRENT_STEP)
+        return _HEDGE_EXECUTOR.submit(contextvars.copy_context().run, self._attempt, agent, fn, index, token), token
+
+    def _timed(self, agent, fn, index):
+        routed = self._routed(agent, index)
+        started = time.perf_counter()
+        try:
+            result = fn(routed)
+        except _FINAL_ERRORS:
+            # The provider answered but unusably (e.g. failed validation), or the debate was cancelled
+            raise
+        except Exception as e:
+            self.record(index, 'call', error=e)
+            raise
+        self.record(index, 'call', time.perf_counter() - started)
+        return result, routed
+
+    def call(self, agent, fn):
+        """Run fn(routed agent) on the best option; returns (result, routed agent that produced it)"""
+        order = self.ranked('call')
+        error = None
+        position = 0
+        while position < len(order):
+            index, backup = order[position], self._backup(order, position)
+            position += 1
+            delay = self.hedge_delay(index) if backup is not None else None
+            if delay is None:
+                try:
+                    return self._timed(agent, fn, index)
+                except _FINAL_ERRORS:
+                    raise
+                except Exception as e:
+                    error = e
+                    self._fell_back(index)
+                    continue
+            with ExitStack() as stack:
+                future, token = self._submit(agent, fn, index, stack)
+                futures, tokens = {future: index}, {future: token}
+                pending = set(futures)
+                try:
+                    done, _ = wait(futures, timeout=delay)
+                    if not done:
+                        self._hedged(backup)
+                        future, tokens[future] = self._submit(agent, fn, backup, stack)
+                        futures[future] = backup
+                        pending.add(future)
+                        position += 1
+                    while pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            try:
+                                result = future.result()
+                            except _FINAL_ERRORS:
+                                raise
+                            except Exception as e:
+                                error = e
+                                self._fell_back(futures[future])
+                                continue
+                            self._won(futures[future], index)
+                            return result
+                finally:
+                    # Abort the losing attempt's request rather than paying for it to finish
+                    for future in pending:
+                        tokens[future].cancel()
+        raise error
+
+    def stream(self, agent, fn):
+        """Yield the deltas of fn(routed agent) from the best option; returns the routed agent that served them"""
+        order = self.ranked('stream')
+        error = None
+        position = 0
+        while position < len(order):
+            index, backup = order[position], self._backup(order, position)
+            position += 1
+            delay = self.hedge_delay(index, 'stream') if backup is not None else None
+            events = queue.Queue()
+            stack = ExitStack()
+            runs = {index: self._pump(agent, fn, index, events, stack)}
+            started = time.monotonic()
+            winner = None
+            try:
+                while winner is None and any(not run['finished'] for run in runs.values()):
+                    timeout = None
+                    if delay is not None and backup not in runs:
+                        timeout = max(0.0, delay - (time.monotonic() - started))
+                    try:
+                        source, item = events.get(timeout=timeout)
+                    except queue.Empty:
+                        self._hedged(backup)
+                        runs[backup] = self._pump(agent, fn, backup, events, stack)
+                        position += 1
+                        continue
+                    if isinstance(item, Exception):
+                        runs[source]['finished'] = True
+                        if isinstance(item, _FINAL_ERRORS):
+                            raise item
+                        error = item
+                        self._fell_back(source)
+                        continue
+                    winner, first = source, item
+                if winner is None:
+                    continue
+                self._won(winner, index)
+                for source, run in runs.items():
+                    if source != winner:
+                        run['token'].cancel()
+                item = first
+                while item is not _STREAM_DONE:
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+                    source, item = events.get()
+                    while source != winner:
+                        source, item = events.get()
+                return runs[winner]['agent']
+            finally:
+                for run in runs.values():
+                    run['token'].cancel()
+                stack.close()
+        raise error
+
+    def _pump(self, agent, fn, index, events, stack):
+        """Run one option's stream on a worker thread, putting (index, delta | exception | done) on `events`"""
+        run = {'agent': self._routed(agent, index), 'token': self._attempt_token(agent, stack), 'finished': False}
+
+        def pump():
+            PHASE_TOKEN.set(run['token'])
+            started = time.perf_counter()
+            first_token = None
+            try:
+                stream = fn(run['agent'])
+                try:
+                    for delta in stream:
+                        if first_token is None:
+                            first_token = time.perf_counter() - started
+                            self.record(index, 'stream', first_token)
+                        if run['token'].cancelled:
+                            return
+                        events.put((index, delta))
+                finally:
+                    stream.close()
+            except Exception as e:
+                if first_token is None and not isinstance(e, _FINAL_ERRORS):
+                    self.record(index, 'stream', error=e)
+                events.put((index, e))
+                return
+            events.put((index, _STREAM_DONE))
+
+        _HEDGE_EXECUTOR.submit(contextvars.copy_context().run, pump)
+        return run
+
+    # asyncio
+
+    async def _atimed(self, agent, fn, index):
+        routed = self._routed(agent, index)
+        started = time.perf_counter()
+        try:
+            result = await fn(routed)
+        except _FINAL_ERRORS:
+            raise
+        except Exception as e:
+            self.record(index, 'call', error=e)
+            raise
+        self.record(index, 'call', time.perf_counter() - started)
+        return result, routed
+
+    async def acall(self, agent, fn):
+        """Async version of call(); fn(routed agent) returns an awaitable, and losing tasks are cancelled"""
+        order = self.ranked('call')
+        error = None
+        position = 0
+        while position < len(order):
+            index, backup = order[position], self._backup(order, position)
+            position += 1
+            delay = self.hedge_delay(index) if backup is not None else None
+            tasks = {asyncio.ensure_future(self._atimed(agent, fn, index)): index}
+            pending = set(tasks)
+            try:
+                if delay is not None:
+                    done, pending = await asyncio.wait(pending, timeout=delay)
+                    if not done:
+                        self._hedged(backup)
+                        hedge = asyncio.ensure_future(self._atimed(agent, fn, backup))
+                        tasks[hedge] = backup
+                        pending.add(hedge)
+                        position += 1
+                    pending |= done
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        failure = task.exception()
+                        if failure is None:
+                            self._won(tasks[task], index)
+                            return task.result()
+                        if isinstance(failure, _FINAL_ERRORS):
+                            raise failure
+                        error = failure
+                        self._fell_back(tasks[task])
+            finally:
+                for task in pending:
+                    task.cancel()
+        raise error
+
+    async def astream(self, agent, fn, served):
+        """Async version of stream(); appends the routed agent that served the deltas to `served`"""
+        order = self.ranked('stream')
+        error = None
+        position = 0
+        while position < len(order):
+            index, backup = order[position], self._backup(order, position)
+            position += 1
+            delay = self.hedge_delay(index, 'stream') if backup is not None else None
+            events = asyncio.Queue()
+            runs = {index: self._apump(agent, fn, index, events)}
+            started = time.monotonic()
+            winner = None
+            try:
+                while winner is None and any(not run['finished'] for run in runs.values()):
+                    timeout = None
+                    if delay is not None and backup not in runs:
+                        timeout = max(0.0, delay - (time.monotonic() - started))
+                    try:
+                        source, item = await asyncio.wait_for(events.get(), timeout)
+                    except asyncio.TimeoutError:
+                        self._hedged(backup)
+                        runs[backup] = self._apump(agent, fn, backup, events)
+                        position += 1
+                        continue
+                    if isinstance(item, Exception):
+                        runs[source]['finished'] = True
+                        if isinstance(item, _FINAL_ERRORS):
+                            raise item
+                        error = item
+                        self._fell_back(source)
+                        continue
+                    winner, first = source, item
+                if winner is None:
+                    continue
+                self._won(winner, index)
+                for source, run in runs.items():
+                    if source != winner:
+                        run['task'].cancel()
+                served.append(runs[winner]['agent'])
+                item = first
+                while item is not _STREAM_DONE:
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+                    source, item = await events.get()
+                    while source != winner:
+                        source, item = await events.get()
+                return
+            finally:
+                for run in runs.values():
+                    run['task'].cancel()
+        raise error
+
+    def _apump(self, agent, fn, index, events):
+        """Run one option's stream as a task, putting (index, delta | exception | done) on `events`"""
+        run = {'agent': self._routed(agent, index), 'finished': False}
+
+        async def pump():
+            started = time.perf_counter()
+            first_token = None
+            try:
+                async for delta in fn(run['agent']):
+                    if first_token is None:
+                        first_token = time.perf_counter() - started
+                        self.record(index, 'stream', first_token)
+                    events.put_nowait((index, delta))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if first_token is None and not isinstance(e, _FINAL_ERRORS):
+                    self.record(index, 'stream', error=e)
+                events.put_nowait((index, e))
+                return
+            events.put_nowait((index, _STREAM_DONE))
+
+        run['task'] = asyncio.ensure_future(pump())
+        return run
+
+    def stats(self):
+        """Per-option health and latency, plus hedge and fallback counters"""
+        now = time.monotonic()
+        with self._lock:
+            options = []
+            for option, health in zip(self.options, self._health):
+                outcomes = len(health.outcomes)
+                options.append({
+                    'provider': option.provider,
+                    'model': option.model,
+                    'healthy': health.down_until <= now,
+                    'error_rate': health.outcomes.count(False) / outcomes if outcomes else 0.0,
+                    **{f'{kind}_p50': _percentile(samples, 50) if samples else None
+                       for kind, samples in health.latencies.items()},
+                    **{f'{kind}_p{self.hedge_percentile}': _percentile(samples, self.hedge_percentile) if samples else None
+                       for kind, samples in health.latencies.items()},
+                })
+        return {'options': options, 'hedges': self.hedges, 'hedge_wins': self.hedge_wins, 'fallbacks': self.fallbacks}
+
+
+# Routers shared across debates, so latency and health history outlive one orchestrator. Their options
+# hold API keys, so only the most recently used MAX_SHARED_ROUTERS are kept
+_ROUTERS = OrderedDict()
+_ROUTERS_LOCK = threading.Lock()
+MAX_SHARED_ROUTERS = 32
+
+
+def shared_router(options, **settings):
+    """The process-wide ProviderRouter for this exact option list, created on first use"""
+    options = tuple(option if isinstance(option, RouteOption) else RouteOption(*option) for option in options)
+    with _ROUTERS_LOCK:
+        router = _ROUTERS.get(options)
+        if router is None:
+            router = _ROUTERS[options] = ProviderRouter(options, **settings)
+            while len(_ROUTERS) > MAX_SHARED_ROUTERS:
+                _ROUTERS.popitem(last=False)
+        else:
+            _ROUTERS.move_to_end(options)
+        return router
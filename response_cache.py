@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_cache_key(provider, model, system_prompt, prompt, max_tokens, temperature=None):
+    """Content address of one completion request"""
+    payload = json.dumps([provider, model, system_prompt, prompt, max_tokens, temperature], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier cache of LLM completions keyed by make_cache_key.
+
+    The first tier is an in-memory LRU of `max_entries` responses. If `db_path`
+    is set, misses fall through to a SQLite table that survives restarts; rows
+    older than `ttl` seconds are treated as misses, and the table is trimmed to
+    the `max_db_entries` most recently used rows.
+    """
+
+    def __init__(self, max_entries=1024, db_path=None, ttl=7 * 24 * 3600, max_db_entries=100_000):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_db_entries = max_db_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+            self._db.commit()
+
+    def get(self, key):
+        """Cached response text, or None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[1]):
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and not self._expired(row[1]):
+                    self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    self._remember(key, row[0], row[1])
+                    self.hits += 1
+                    return row[0]
+                if row is not None:
+                    self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key, response):
+        """Store a completed response in every tier"""
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created, accessed) VALUES (?, ?, ?, ?)",
+                    (key, response, now, now))
+                self._db.execute(
+                    "DELETE FROM responses WHERE key IN ("
+                    "SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_db_entries,))
+                self._db.commit()
+
+    def _remember(self, key, response, created):
+        """Insert into the memory tier, evicting the least recently used entry (lock held)"""
+        self._memory[key] = (response, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _expired(self, created):
+        return bool(self.ttl) and time.time() - created > self.ttl
+
+    def clear(self):
+        """Drop every cached response"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self):
+        """Cache counters for monitoring"""
+        with self._lock:
+            return {
+                'memory_entries': len(self._memory),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+# Shared by every DebateAgent unless one is passed in explicitly.
+# Set DEBATE_CACHE_DB to a file path to keep responses across restarts.
+RESPONSE_CACHE = ResponseCache(db_path=os.getenv("DEBATE_CACHE_DB"))
@@ -0,0 +1,221 @@
+import asyncio
+import email.utils
+import random
+import threading
+import time
+
+from client_pool import normalize_provider
+
+# Conservative per-key defaults (requests / tokens per minute); override per scheduler
+DEFAULT_LIMITS = {
+    "anthropic": {"rpm": 50, "tpm": 40_000},
+    "openai": {"rpm": 500, "tpm": 30_000},
+}
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError", "OverloadedError"}
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)"""
+    return len(text) // 4 + 1
+
+
+def request_tokens(params):
+    """Tokens a request counts against TPM: estimated input plus the max_tokens it may generate"""
+    system = params.get('system') or ""
+    if not isinstance(system, str):
+        system = "".join(block.get('text', "") for block in system)
+    text = system + "".join(str(message['content']) for message in params.get('messages', []))
+    return estimate_tokens(text) + params.get('max_tokens', 0)
+
+
+def is_retryable(error):
+    """Rate limits, overloads, timeouts and 5xx are worth retrying; bad requests are not"""
+    if getattr(error, "status_code", None) in RETRYABLE_STATUS:
+        return True
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+def retry_after(error):
+    """Seconds the provider asked us to wait, from retry-after-ms / retry-after headers"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        parsed = email.utils.parsedate_to_datetime(value)
+        return max(0.0, parsed.timestamp() - time.time()) if parsed else None
+
+
+class TokenBucket:
+    """Token bucket refilled at `per_minute` units per minute, holding at most one minute's worth.
+
+    reserve() always takes the tokens, letting the level go negative, and returns
+    how long the caller must wait before its share exists. Later callers therefore
+    queue up behind earlier ones instead of racing for the next refill.
+    """
+
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        """Take `amount` units; returns the seconds to wait before using them"""
+        with self._lock:
+            now = time.monotonic()
+            rate = self.per_minute / 60
+            self.level = min(self.per_minute, self.level + (now - self.updated) * rate)
+            self.updated = now
+            self.level -= min(amount, self.per_minute)
+            return 0.0 if self.level >= 0 else -self.level / rate
+
+
+class ProviderScheduler:
+    """Gate for every provider call: rate limits, bounded concurrency and retries.
+
+    - Requests and tokens per minute are enforced per (provider, api_key) with token buckets.
+    - At most `max_in_flight` calls run at once across the process.
+    - Retryable failures (429, overloaded, 5xx, timeouts) are retried up to `max_retries`
+      times with full-jitter exponential backoff, never sooner than the provider's retry-after.
+    Streams are retried only if they fail before producing any text.
+    """
+
+    def __init__(self, limits=None, max_in_flight=32, max_retries=5, base_delay=1.0, max_delay=60.0):
+        self.limits = limits or DEFAULT_LIMITS
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._async_slots = None
+        self.retries = 0
+        self.throttled_seconds = 0.0
+
+    def _wait_time(self, clientType, api_key, tokens):
+        """Reserve one request and `tokens` tokens; returns the seconds to wait first"""
+        provider = normalize_provider(clientType)
+        limits = self.limits.get(provider) or {}
+        key = (provider, api_key)
+        with self._lock:
+            buckets = self._buckets.get(key)
+            if buckets is None:
+                buckets = self._buckets[key] = (
+                    TokenBucket(limits['rpm']) if limits.get('rpm') else None,
+                    TokenBucket(limits['tpm']) if limits.get('tpm') else None,
+                )
+        requests_bucket, tokens_bucket = buckets
+        wait = max(requests_bucket.reserve(1) if requests_bucket else 0.0,
+                   tokens_bucket.reserve(tokens) if tokens_bucket else 0.0)
+        self.throttled_seconds += wait
+        return wait
+
+    def _backoff(self, attempt, error):
+        """Delay before retry number `attempt` (0-based)"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, retry_after(error) or 0.0)
+
+    def _should_retry(self, attempt, error):
+        if attempt >= self.max_retries or not is_retryable(error):
+            return False
+        self.retries += 1
+        return True
+
+    def call(self, clientType, api_key, tokens, request):
+        """Run `request()` under the limits for (clientType, api_key), retrying transient errors"""
+        attempt = 0
+        while True:
+            time.sleep(self._wait_time(clientType, api_key, tokens))
+            with self._slots:
+                try:
+                    return request()
+                except Exception as e:
+                    if not self._should_retry(attempt, e):
+                        raise
+                    error = e
+            time.sleep(self._backoff(attempt, error))
+            attempt += 1
+
+    def stream(self, clientType, api_key, tokens, open_stream):
+        """Iterate `open_stream()` under the limits, retrying only failures before the first delta"""
+        attempt = 0
+        while True:
+            time.sleep(self._wait_time(clientType, api_key, tokens))
+            started = False
+            with self._slots:
+                try:
+                    for delta in open_stream():
+                        started = True
+                        yield delta
+                    return
+                except Exception as e:
+                    if started or not self._should_retry(attempt, e):
+                        raise
+                    error = e
+            time.sleep(self._backoff(attempt, error))
+            attempt += 1
+
+    def _async_semaphore(self):
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.max_in_flight)
+        return self._async_slots
+
+    async def acall(self, clientType, api_key, tokens, request):
+        """Async version of call(); `request()` returns an awaitable"""
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._wait_time(clientType, api_key, tokens))
+            async with self._async_semaphore():
+                try:
+                    return await request()
+                except Exception as e:
+                    if not self._should_retry(attempt, e):
+                        raise
+                    error = e
+            await asyncio.sleep(self._backoff(attempt, error))
+            attempt += 1
+
+    async def astream(self, clientType, api_key, tokens, open_stream):
+        """Async version of stream(); `open_stream()` returns an async iterator"""
+        attempt = 0
+        while True:
+            await asyncio.sleep(self._wait_time(clientType, api_key, tokens))
+            started = False
+            async with self._async_semaphore():
+                try:
+                    async for delta in open_stream():
+                        started = True
+                        yield delta
+                    return
+                except Exception as e:
+                    if started or not self._should_retry(attempt, e):
+                        raise
+                    error = e
+            await asyncio.sleep(self._backoff(attempt, error))
+            attempt += 1
+
+    def stats(self):
+        """Scheduler counters for monitoring"""
+        return {
+            'retries': self.retries,
+            'throttled_seconds': round(self.throttled_seconds, 3),
+            'max_in_flight': self.max_in_flight,
+        }
+
+
+# Shared by every DebateAgent unless one is passed in explicitly
+SCHEDULER = ProviderScheduler()
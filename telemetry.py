@@ -0,0 +1,312 @@
+import contextvars
+import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# USD per million tokens: (input, output, cache read, cache write), matched by model-name prefix
+MODEL_PRICES = {
+    "claude-opus-4": (15.0, 75.0, 1.5, 18.75),
+    "claude-sonnet-4": (3.0, 15.0, 0.3, 3.75),
+    "claude-haiku-4": (1.0, 5.0, 0.1, 1.25),
+    "gpt-4o-mini": (0.15, 0.6, 0.075, 0.0),
+    "gpt-4o": (2.5, 10.0, 1.25, 0.0),
+    "gpt-4-turbo": (10.0, 30.0, 10.0, 0.0),
+    "gpt-3.5-turbo": (0.5, 1.5, 0.5, 0.0),
+}
+
+TOKEN_KINDS = ("input_tokens", "output_tokens", "cache_read_tokens", "cache_write_tokens")
+
+
+def model_prices(model):
+    """Price tuple for a model, using the longest matching prefix, or None if unknown"""
+    matches = [prefix for prefix in MODEL_PRICES if (model or "").startswith(prefix)]
+    return MODEL_PRICES[max(matches, key=len)] if matches else None
+
+
+def estimate_cost(model, usage):
+    """Estimated USD cost of one call from its usage_record, or None for unknown models/usage"""
+    prices = model_prices(model)
+    if prices is None or not usage:
+        return None
+    return sum(usage.get(kind, 0) * price for kind, price in zip(TOKEN_KINDS, prices)) / 1_000_000
+
+
+# Label of the debate step (e.g. "reflection_1") whose provider calls run in this context; set around
+# each step's stream by the orchestrator, so calls are attributed to the step that made them
+CURRENT_STEP = contextvars.ContextVar("debate_step", default=None)
+
+
+def _span_id():
+    return uuid.uuid4().hex[:16]
+
+
+class DebateTrace:
+    """Timeline of one debate: a span per phase, and a span per provider call inside it.
+
+    Spans are plain dicts with wall-clock `start`/`end` (epoch seconds) plus the
+    measured `seconds` and `first_token_seconds`; call spans also carry token
+    counts, cost and whether the response cache served them. A call tagged with
+    the step that made it (its `phase`, from CURRENT_STEP) is attached to that
+    step's span, even if it finishes while another phase is open, as pipelined
+    steps do; an untagged call goes to whichever phase is open.
+    """
+
+    def __init__(self, topic, attributes=None):
+        self.trace_id = uuid.uuid4().hex
+        self.span_id = _span_id()
+        self.topic = topic
+        self.attributes = dict(attributes or {})
+        self.start = time.time()
+        self.end = None
+        self.phases = []
+        self.calls = []
+        # Phase spans by name, created by start_phase or by the first call tagged with the phase
+        self._spans = {}
+        self._open_phase = None
+        self._lock = threading.Lock()
+
+    def start_phase(self, phase):
+        """Open a phase span; calls recorded until end_phase belong to it"""
+        with self._lock:
+            span = self._span(phase)
+            span['start'] = time.time()
+            self._open_phase = span
+        return span
+
+    def _span(self, phase):
+        return self._spans.setdefault(phase, {'span_id': _span_id(), 'name': phase})
+
+    def end_phase(self, span, timing):
+        """Close a phase span with its phase_timings entry"""
+        span.update(end=time.time(), seconds=timing['seconds'], first_token_seconds=timing.get('first_token_seconds'))
+        with self._lock:
+            self.phases.append(span)
+            if self._open_phase is span:
+                self._open_phase = None
+        METRICS.observe("debate_phase_seconds", {'phase': span['name'].split("_")[0]}, span['seconds'])
+
+    def add_call(self, call):
+        """Record one finished provider call (see DebateAgent._record_call)"""
+        with self._lock:
+            if call.get('phase') is None and self._open_phase:
+                call['phase'] = self._open_phase['name']
+            call['parent_id'] = self._span(call['phase'])['span_id'] if call.get('phase') else self.span_id
+            call['span_id'] = _span_id()
+            self.calls.append(call)
+
+    def finish(self):
+        self.end = time.time()
+        METRICS.inc("debate_debates_total")
+        METRICS.observe("debate_seconds", {}, self.end - self.start)
+
+    def usage(self, phase=None):
+        """Summed tokens and cost of every call, or only of the calls made during `phase`"""
+        calls = [call for call in self.calls if phase is None or call['phase'] == phase]
+        usage = {kind: sum(call.get(kind) or 0 for call in calls) for kind in TOKEN_KINDS}
+        usage['calls'] = len(calls)
+        usage['cached_calls'] = sum(1 for call in calls if call['cached'])
+        usage['cost_usd'] = sum(call['cost_usd'] or 0 for call in calls)
+        return usage
+
+    def totals(self):
+        """Summed tokens and cost, plus the slowest phase"""
+        totals = self.usage()
+        totals['seconds'] = ((self.end or time.time()) - self.start)
+        slowest = max(self.phases, key=lambda span: span['seconds'], default=None)
+        totals['slowest_phase'] = slowest['name'] if slowest else None
+        return totals
+
+    def to_dict(self):
+        return {
+            'trace_id': self.trace_id,
+            'topic': self.topic,
+            'attributes': self.attributes,
+            'start': self.start,
+            'end': self.end,
+            'phases': self.phases,
+            'calls': self.calls,
+            'totals': self.totals(),
+        }
+
+    def to_otlp(self, service_name="ai-debate-arena"):
+        """The trace as an OTLP/JSON ExportTraceServiceRequest (POST it to a collector's /v1/traces)"""
+        def nanos(seconds):
+            return str(int(seconds * 1e9))
+
+        def attributes(values):
+            encoded = []
+            for key, value in values.items():
+                if value is None:
+                    continue
+                if isinstance(value, bool):
+                    encoded.append({'key': key, 'value': {'boolValue': value}})
+                elif isinstance(value, int):
+                    encoded.append({'key': key, 'value': {'intValue': str(value)}})
+                elif isinstance(value, float):
+                    encoded.append({'key': key, 'value': {'doubleValue': value}})
+                else:
+                    encoded.append({'key': key, 'value': {'stringValue': str(value)}})
+            return encoded
+
+        end = self.end or time.time()
+        spans = [{
+            'traceId': self.trace_id, 'spanId': self.span_id, 'name': "debate",
+            'startTimeUnixNano': nanos(self.start), 'endTimeUnixNano': nanos(end),
+            'attributes': attributes({'debate.topic': self.topic, **self.attributes}),
+        }]
+        for span in self.phases:
+            spans.append({
+                'traceId': self.trace_id, 'spanId': span['span_id'], 'parentSpanId': self.span_id,
+                'name': f"phase {span['name']}",
+                'startTimeUnixNano': nanos(span['start']), 'endTimeUnixNano': nanos(span['end']),
+                'attributes': attributes({'debate.first_token_seconds': span['first_token_seconds']}),
+            })
+        for call in self.calls:
+            spans.append({
+                'traceId': self.trace_id, 'spanId': call['span_id'], 'parentSpanId': call['parent_id'],
+                'name': f"llm {call['provider']}",
+                'startTimeUnixNano': nanos(call['start']), 'endTimeUnixNano': nanos(call['start'] + call['seconds']),
+                'attributes': attributes({
+                    'gen_ai.system': call['provider'],
+                    'gen_ai.request.model': call['model'],
+                    'gen_ai.usage.input_tokens': call.get('input_tokens'),
+                    'gen_ai.usage.output_tokens': call.get('output_tokens'),
+                    'debate.side': call['side'],
+                    'debate.cached': call['cached'],
+                    'debate.cache_read_tokens': call.get('cache_read_tokens'),
+                    'debate.cache_write_tokens': call.get('cache_write_tokens'),
+                    'debate.first_token_seconds': call['first_token_seconds'],
+                    'debate.cost_usd': call['cost_usd'],
+                }),
+            })
+        return {'resourceSpans': [{
+            'resource': {'attributes': attributes({'service.name': service_name})},
+            'scopeSpans': [{'scope': {'name': "debate_engine"}, 'spans': spans}],
+        }]}
+
+
+class MetricsRegistry:
+    """Process-wide counters and histograms, rendered in the Prometheus text format"""
+
+    BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+    HELP = {
+        'debate_llm_calls_total': "Provider calls, including ones served by the response cache",
+        'debate_llm_tokens_total': "Tokens reported by the providers",
+        'debate_llm_cost_usd_total': "Estimated provider spend in USD",
+        'debate_llm_call_seconds': "Wall time of a provider call",
+        'debate_llm_first_token_seconds': "Time to the first streamed token of a provider call",
+        'debate_phase_seconds': "Wall time of a debate phase",
+        'debate_seconds': "Wall time of a whole debate",
+        'debate_debates_total': "Debates completed",
+        'debate_router_hedges_total': "Duplicate requests sent to a backup option because a call ran slow",
+        'debate_router_fallbacks_total': "Calls moved to the next option after this one failed",
+        'debate_admission_wait_seconds': "Time a debate waited in the admission queue",
+        'debate_admission_rejected_total': "Debates turned away by admission control",
+    }
+
+    def __init__(self):
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((labels or {}).items()))
+
+    def inc(self, name, labels=None, value=1):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {'buckets': [0] * len(self.BUCKETS), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    histogram['buckets'][i] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def observe_call(self, call):
+        """Fold one provider call record into the call, token and cost metrics"""
+        labels = {'provider': call['provider'], 'model': call['model']}
+        self.inc("debate_llm_calls_total", {**labels, 'cached': str(call['cached']).lower()})
+        if call['cached']:
+            return
+        self.observe("debate_llm_call_seconds", labels, call['seconds'])
+        if call['first_token_seconds'] is not None:
+            self.observe("debate_llm_first_token_seconds", labels, call['first_token_seconds'])
+        for kind in TOKEN_KINDS:
+            if call.get(kind):
+                self.inc("debate_llm_tokens_total", {**labels, 'type': kind[:-len("_tokens")]}, call[kind])
+        if call['cost_usd']:
+            self.inc("debate_llm_cost_usd_total", labels, call['cost_usd'])
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        def label_text(labels, extra=()):
+            pairs = [f'{name}="{value}"' for name, value in tuple(labels) + tuple(extra)]
+            return "{" + ",".join(pairs) + "}" if pairs else ""
+
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+        described = set()
+        for (name, labels), value in counters:
+            if name not in described:
+                described.add(name)
+                lines += [f"# HELP {name} {self.HELP.get(name, name)}", f"# TYPE {name} counter"]
+            lines.append(f"{name}{label_text(labels)} {value}")
+        for (name, labels), histogram in histograms:
+            if name not in described:
+                described.add(name)
+                lines += [f"# HELP {name} {self.HELP.get(name, name)}", f"# TYPE {name} histogram"]
+            for bound, count in zip(self.BUCKETS, histogram['buckets']):
+                lines.append(f"{name}_bucket{label_text(labels, (('le', bound),))} {count}")
+            lines.append(f"{name}_bucket{label_text(labels, (('le', '+Inf'),))} {histogram['count']}")
+            lines.append(f"{name}_sum{label_text(labels)} {histogram['sum']}")
+            lines.append(f"{name}_count{label_text(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def serve_metrics(port, host="0.0.0.0", registry=None):
+    """Serve `registry.render()` at /metrics on a daemon thread; returns the server"""
+    registry = registry or METRICS
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="debate-metrics", daemon=True).start()
+    return server
+
+
+# Shared by every agent and trace
+METRICS = MetricsRegistry()
+
+# Set DEBATE_METRICS_PORT to expose /metrics from the web app
+METRICS_PORT = int(os.getenv("DEBATE_METRICS_PORT") or 0)
@@ -0,0 +1,279 @@
+import argparse
+import json
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+from batch_runner import BatchDebateRunner
+from debate_engine import PHASES, DebateAgent, DebateOrchestrator, debate_result
+
+# Rating of a player with no games, and the most one game can move it
+INITIAL_RATING = 1500
+K_FACTOR = 32
+
+# Appended to the judge's prompt, so the outcome is read from one fixed line rather than guessed from prose
+WINNER_INSTRUCTION = """
+
+        Then end with a final line giving your answer to question 1 as exactly one of:
+        WINNER: PRO
+        WINNER: CON
+        WINNER: TIE"""
+
+# The WINNER line, allowing markdown emphasis around it
+_WINNER = re.compile(r"^[\s*_#>-]*WINNER\s*:[\s*_]*(PRO|CON|TIE)\b[\s*_.]*$", re.MULTILINE | re.IGNORECASE)
+
+
+def parse_player(spec):
+    """A "provider:model" player spec as (provider, model)"""
+    provider, sep, model = spec.partition(":")
+    if not sep or not provider or not model:
+        raise ValueError(f"Player must look like provider:model, got {spec!r}")
+    return provider.lower(), model
+
+
+def verdict_winner(verdict):
+    """'pro', 'con' or 'tie' from the verdict's last WINNER line, or None if it has none"""
+    lines = _WINNER.findall(verdict or "")
+    return lines[-1].lower() if lines else None
+
+
+def expected_score(rating, opponent_rating):
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+
+
+class TournamentOrchestrator(DebateOrchestrator):
+    """A debate whose judge ends the verdict with a WINNER line (see verdict_winner)"""
+
+    def verdict_prompt(self, topic, pro_arguments, con_arguments, pro_scores=(), con_scores=()):
+        return super().verdict_prompt(topic, pro_arguments, con_arguments, pro_scores, con_scores) + WINNER_INSTRUCTION
+
+    def debate_config(self, total_rounds, phases):
+        # Stored verdicts without a WINNER line must not be replayed into a tournament
+        return {**super().debate_config(total_rounds, phases), 'verdict_format': "winner_line"}
+
+
+class Tournament:
+    """Plays models against each other over a set of topics and rates them by Elo.
+
+    Matchups are round-robin (every pair on every topic, sides alternating) or
+    Swiss (each round pairs players of similar rating who have not met yet, on
+    the next topic). Up to `concurrency` debates run at once; ratings are
+    updated as each one finishes, scored from the WINNER line the judge ends
+    its verdict with. A verdict without one is recorded as an error and not
+    rated. The judge is one fixed model that does not play, so no player
+    judges its own matches.
+
+    A model's round-1 argument depends only on the topic and its side, so it is
+    generated once and seeded into every matchup that needs it; concurrent
+    matchups wanting the same opening wait for the first one to produce it.
+    """
+
+    def __init__(self, players, topics, total_rounds=3, phases=PHASES, concurrency=4, judge=None,
+                 k_factor=K_FACTOR, adaptive=False, output_path=None):
+        if len(players) < 2:
+            raise ValueError("A tournament needs at least two players")
+        self.players = list(dict.fromkeys(players))
+        for player in self.players:
+            parse_player(player)
+        self.topics = list(topics)
+        self.total_rounds = total_rounds
+        self.phases = phases
+        self.concurrency = concurrency
+        if judge is None or judge in self.players:
+            raise ValueError("A tournament needs a judge (provider:model) that is not one of the players")
+        self.judge = judge
+        parse_player(self.judge)
+        self.k_factor = k_factor
+        self.adaptive = adaptive
+        self.output_path = output_path
+        self.ratings = {player: float(INITIAL_RATING) for player in self.players}
+        self.records = {player: {'played': 0, 'wins': 0, 'draws': 0, 'losses': 0} for player in self.players}
+        self.results = []
+        # (player, side, topic) -> Future of the opening argument
+        self._openings = {}
+        self._lock = threading.Lock()
+        self.opening_requests = 0
+        self.opening_calls = 0
+
+    def round_robin_pairings(self):
+        """Every pair of players on every topic as (pro, con, topic), alternating who argues pro"""
+        pairings = []
+        for topic_num, topic in enumerate(self.topics):
+            for i, first in enumerate(self.players):
+                for j in range(i + 1, len(self.players)):
+                    second = self.players[j]
+                    pairings.append((first, second, topic) if (i + j + topic_num) % 2 == 0 else (second, first, topic))
+        return pairings
+
+    def swiss_pairings(self, round_num, met):
+        """Pair players of similar rating who have not met yet, on this round's topic.
+
+        `met` is a set of frozenset pairs already played. With an odd number of
+        players, the one who has played most, i.e. sat out least (the lowest
+        rated among them), sits the round out.
+        """
+        topic = self.topics[(round_num - 1) % len(self.topics)]
+        unpaired = sorted(self.players, key=lambda player: -self.ratings[player])
+        if len(unpaired) % 2:
+            unpaired.remove(max(reversed(unpaired), key=lambda player: self.records[player]['played']))
+        pro_games = {player: sum(1 for result in self.results if result['pro'] == player) for player in self.players}
+        pairings = []
+        while len(unpaired) > 1:
+            first = unpaired.pop(0)
+            # The closest rated opponent not met yet, else the closest rated one
+            second = next((player for player in unpaired if frozenset((first, player)) not in met), unpaired[0])
+            unpaired.remove(second)
+            # Whoever has argued pro less often takes pro
+            pairings.append((second, first, topic) if pro_games[second] < pro_games[first] else (first, second, topic))
+        return pairings
+
+    def _agent(self, player, position):
+        provider, model = parse_player(player)
+        return DebateAgent(position=position, clientType=provider, model=model)
+
+    def opening(self, player, side, topic):
+        """A player's round-1 argument on `topic` for `side`, generated once per tournament"""
+        key = (player, side, topic)
+        with self._lock:
+            self.opening_requests += 1
+            future = self._openings.get(key)
+            owner = future is None
+            if owner:
+                future = self._openings[key] = Future()
+                self.opening_calls += 1
+        if owner:
+            try:
+                future.set_result(self._agent(player, side).generate_argument(topic, round_num=1))
+            except Exception as e:
+                with self._lock:
+                    # Let a later matchup try again
+                    del self._openings[key]
+                future.set_exception(e)
+        return future.result()
+
+    def play(self, pro, con, topic):
+        """Run one debate and return its result record (not yet rated)"""
+        start = time.perf_counter()
+        record = {'topic': topic, 'pro': pro, 'con': con, 'winner': None, 'verdict': None,
+                  'stopped_early': None, 'tokens': None, 'cost_usd': None, 'seconds': None, 'error': None}
+        try:
+            (pro_provider, pro_model), (con_provider, con_model) = parse_player(pro), parse_player(con)
+            orchestrator = TournamentOrchestrator(
+                pro_provider=pro_provider, pro_model=pro_model, con_provider=con_provider, con_model=con_model,
+                concurrent=True, adaptive=self.adaptive, judge=self._agent(self.judge, "judge"))
+            orchestrator.openings = {'pro': self.opening(pro, 'pro', topic), 'con': self.opening(con, 'con', topic)}
+            for _ in orchestrator._debate_events(topic, self.total_rounds, self.phases):
+                pass
+            result = debate_result(orchestrator.last_debate, orchestrator.phase_timings, orchestrator.last_trace)
+            totals = result['trace'].totals()
+            winner = verdict_winner(result['verdict'])
+            record.update(winner={'pro': pro, 'con': con}.get(winner), verdict=result['verdict'],
+                          stopped_early=result['stopped_early'],
+                          tokens=totals['input_tokens'] + totals['output_tokens'], cost_usd=totals['cost_usd'])
+            if winner is None:
+                record['error'] = "Verdict has no WINNER line"
+        except Exception as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+        record['seconds'] = round(time.perf_counter() - start, 3)
+        return record
+
+    def _rate(self, record):
+        """Fold a finished debate into the ratings and win/draw/loss counts"""
+        if record['error']:
+            return
+        pro, con = record['pro'], record['con']
+        score = 0.5 if record['winner'] is None else float(record['winner'] == pro)
+        expected = expected_score(self.ratings[pro], self.ratings[con])
+        self.ratings[pro] += self.k_factor * (score - expected)
+        self.ratings[con] -= self.k_factor * (score - expected)
+        for player, player_score in ((pro, score), (con, 1 - score)):
+            counts = self.records[player]
+            counts['played'] += 1
+            counts['wins' if player_score == 1 else 'losses' if player_score == 0 else 'draws'] += 1
+        record['ratings'] = {pro: round(self.ratings[pro], 1), con: round(self.ratings[con], 1)}
+
+    def _play_all(self, pairings, executor, output, round_num=None):
+        futures = [executor.submit(self.play, *pairing) for pairing in pairings]
+        for future in as_completed(futures):
+            record = future.result()
+            record['round'] = round_num
+            self._rate(record)
+            self.results.append(record)
+            if output:
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+            outcome = record['error'] or f"winner: {record['winner'] or 'draw'}"
+            print(f"[tournament] {len(self.results)} done: {record['pro']} (pro) vs {record['con']} (con) "
+                  f"on {record['topic'][:40]!r} - {outcome}")
+
+    def run(self, format="round-robin", rounds=None):
+        """Play the tournament and return the standings.
+
+        `format` is "round-robin" or "swiss"; a Swiss tournament plays `rounds`
+        rounds (default: one per topic). With `output_path` set, each result is
+        appended there as a JSON line as soon as it is rated.
+        """
+        if format not in ("round-robin", "swiss"):
+            raise ValueError(f"Unknown tournament format {format!r}")
+        output = open(self.output_path, "w", encoding="utf-8") if self.output_path else None
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="tournament") as executor:
+                if format == "round-robin":
+                    self._play_all(self.round_robin_pairings(), executor, output)
+                else:
+                    met = set()
+                    for round_num in range(1, (rounds or len(self.topics)) + 1):
+                        pairings = self.swiss_pairings(round_num, met)
+                        met.update(frozenset((pro, con)) for pro, con, _ in pairings)
+                        self._play_all(pairings, executor, output, round_num)
+        finally:
+            if output:
+                output.close()
+        return self.standings()
+
+    def standings(self):
+        """Players by rating, best first, with their records"""
+        return [{'player': player, 'rating': round(self.ratings[player], 1), **self.records[player]}
+                for player in sorted(self.players, key=lambda player: -self.ratings[player])]
+
+    def format_standings(self):
+        lines = [f"{'#':>2}  {'player':<40} {'rating':>7} {'W':>4} {'D':>4} {'L':>4}"]
+        for rank, row in enumerate(self.standings(), 1):
+            lines.append(f"{rank:>2}  {row['player']:<40} {row['rating']:>7.1f} "
+                         f"{row['wins']:>4} {row['draws']:>4} {row['losses']:>4}")
+        lines.append(f"Openings generated: {self.opening_calls} for {self.opening_requests} matchup sides")
+        return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rate models by playing debate tournaments between them")
+    parser.add_argument("topics", help="JSONL with one {\"topic\": ...} per line (as for batch_runner)")
+    parser.add_argument("players", nargs="+", help="players as provider:model, e.g. claude:claude-sonnet-4-20250514")
+    parser.add_argument("--output", help="where to write one JSON result per debate as it finishes")
+    parser.add_argument("--format", default="round-robin", choices=["round-robin", "swiss"])
+    parser.add_argument("--swiss-rounds", type=int, help="rounds of a Swiss tournament (default: one per topic)")
+    parser.add_argument("--rounds", type=int, default=3, help="rounds per debate")
+    parser.add_argument("--skip", nargs="*", default=[], choices=["reflect", "summarize"], help="phases to drop")
+    parser.add_argument("--concurrency", type=int, default=4, help="debates to run at once")
+    parser.add_argument("--judge", required=True, help="provider:model that judges every debate (not one of the players)")
+    parser.add_argument("--adaptive", action="store_true", help="stop refining debates that have converged")
+    args = parser.parse_args(argv)
+
+    tournament = Tournament(
+        args.players,
+        [config['topic'] for config in BatchDebateRunner.load_topics(args.topics)],
+        total_rounds=args.rounds,
+        phases=tuple(phase for phase in PHASES if phase not in args.skip),
+        concurrency=args.concurrency,
+        judge=args.judge,
+        adaptive=args.adaptive,
+        output_path=args.output)
+    tournament.run(args.format, args.swiss_rounds)
+    print(tournament.format_standings())
+
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    main()